@@ -0,0 +1,91 @@
+"""
+批量任务操作：逐个调用单个接口与批量执行发布、接取、完成、删除的写入耗时对比
+
+    python -m bench.batch --tasks 50
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from bench.common import add_users, session_factory, temp_database
+from core import models, tasks
+from core.auth import Principal
+from core.batch import run_batch
+from core.database import SQLITE_PRAGMAS
+from core.schemas import TaskBatchOperation, TaskCreate
+
+
+def task_body(i: int) -> TaskCreate:
+    return TaskCreate(
+        title=f"批量任务 {i}", description="描述", type="team", priority=i % 4 + 1,
+        max_accept_count=3, tags=["批量", f"组{i % 5}"],
+    )
+
+
+def elapsed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def benchmark(count: int, synchronous_modes: List[str]) -> bool:
+    ok = True
+    for synchronous in synchronous_modes:
+        with temp_database("batch", {**SQLITE_PRAGMAS, "synchronous": synchronous}) as bench_engine:
+            BenchSession = session_factory(bench_engine)
+            organizer, member = add_users(bench_engine, "organizer", "member")
+
+            timings: Dict[str, Tuple[float, float]] = {}
+
+            # 逐个调用：与单个接口相同，每项一个事务
+            single_ids: List[int] = []
+            with BenchSession() as db:
+                single = {
+                    "create": elapsed(lambda: single_ids.extend(
+                        tasks.create_task(db, task_body(i), organizer)["id"] for i in range(count)
+                    )),
+                    "accept": elapsed(lambda: [tasks.accept_task(db, task_id, member) for task_id in single_ids]),
+                    "complete": elapsed(lambda: [tasks.complete_task(db, task_id, member) for task_id in single_ids]),
+                    "delete": elapsed(lambda: [tasks.delete_task(db, task_id, organizer) for task_id in single_ids]),
+                }
+
+            batch_ids: List[int] = []
+
+            def batch(user: Principal, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                with BenchSession() as db:
+                    results = run_batch(db, [TaskBatchOperation(**operation) for operation in operations], user)
+                nonlocal ok
+                ok = ok and all(result["status_code"] == 200 for result in results)
+                return results
+
+            batched = {
+                "create": elapsed(lambda: batch_ids.extend(
+                    result["task"]["id"]
+                    for result in batch(organizer, [{"op": "create", "task": task_body(i)} for i in range(count)])
+                )),
+                "accept": elapsed(lambda: batch(member, [{"op": "accept", "task_id": i} for i in batch_ids])),
+                "complete": elapsed(lambda: batch(member, [{"op": "complete", "task_id": i} for i in batch_ids])),
+                "delete": elapsed(lambda: batch(organizer, [{"op": "delete", "task_id": i} for i in batch_ids])),
+            }
+            with BenchSession() as db:
+                remaining = db.query(models.Task).count()
+            ok = ok and remaining == 0 and len(batch_ids) == count
+
+            for name in single:
+                timings[name] = (single[name], batched[name])
+            print(f"{count} 项，synchronous={synchronous}")
+            for name, (one_by_one, together) in timings.items():
+                print(f"  {name:<9} 逐个 {one_by_one:8.1f}ms   批量 {together:7.1f}ms   {one_by_one / together:5.1f}x")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量任务操作与逐个调用的耗时对比")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument(
+        "--synchronous", action="append",
+        help="可重复；默认对比 NORMAL（WAL 下提交不 fsync）与 FULL（每次提交 fsync）",
+    )
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(args.tasks, args.synchronous or ["NORMAL", "FULL"]) else 1)
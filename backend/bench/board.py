@@ -0,0 +1,90 @@
+"""
+可接取任务看板：逐页核对看板与 SQL 分页的结果，并对比两者的延迟与增量更新耗时
+
+    python -m bench.board --tasks 100000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, insert_acceptances, insert_tasks, ms, session_factory, temp_database, timed
+from core import tasks
+from core.board import TaskBoard
+from core.schemas import TaskCreate
+
+
+def benchmark(count: int, accepted: int, limit: int, repeat: int) -> bool:
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1)
+    with temp_database("board") as bench_engine:
+        (user,) = add_users(bench_engine, "bench")
+        insert_tasks(bench_engine, (
+            {
+                "title": f"任务 {i}",
+                "priority": rng.randint(1, 4),
+                "status": rng.choices(["available", "inProgress", "completed"], [6, 2, 2])[0],
+                "created_at": str(start + timedelta(seconds=i * 30)),
+                "revision": i + 1,
+            }
+            for i in range(count)
+        ))
+        with bench_engine.begin() as conn:
+            available = [row[0] for row in conn.execute(text("SELECT id FROM tasks WHERE status = 'available'"))]
+            conn.execute(text("INSERT INTO sync_revision (id, value) VALUES (1, :value)"), {"value": count})
+        insert_acceptances(bench_engine, user.id, rng.sample(available, min(accepted, len(available))))
+
+        board = TaskBoard()
+        ok = True
+        with session_factory(bench_engine)() as db:
+            started = time.perf_counter()
+            board.refresh(db)
+            print(f"{count} 个任务，其中可接取 {len(board._keys)} 个；全量构建 {(time.perf_counter() - started) * 1000:.0f}ms")
+
+            # 从头翻到尾逐页核对，另取首页与中间一页计时
+            cursor, middle, pages = None, None, 0
+            while True:
+                expected = tasks.list_tasks(db, user, "available", limit, cursor)
+                actual = board.page(user, limit, cursor)
+                if actual != expected:
+                    print(f"第 {pages + 1} 页与 SQL 分页不一致")
+                    ok = False
+                    break
+                pages += 1
+                cursor = expected[1]
+                if pages == len(board._keys) // limit // 2:
+                    middle = cursor
+                if not cursor:
+                    break
+            print(f"逐页核对 {pages} 页")
+            print(f"{'页':<8}{'SQL p50':>12}{'看板 p50':>12}")
+            for label, page_cursor in (("首页", None), ("中间页", middle)):
+                sql = timed(lambda: tasks.list_tasks(db, user, "available", limit, page_cursor), repeat)
+                memory = timed(lambda: board.page(user, limit, page_cursor), repeat)
+                print(f"{label:<8}{ms(sql):>12}{ms(memory):>12}")
+
+            refreshes = []
+            for i in range(repeat):
+                tasks.create_task(db, TaskCreate(title=f"新任务 {i}", description="描述", type="team"), user)
+                started = time.perf_counter()
+                board.refresh(db)
+                refreshes.append(time.perf_counter() - started)
+            refreshes.sort()
+            print(f"发布一个任务后的增量更新 p50 {ms(refreshes)}")
+            if board.page(user, limit, None) != tasks.list_tasks(db, user, "available", limit, None):
+                print("增量更新后首页与 SQL 分页不一致")
+                ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="可接取任务看板与 SQL 分页的对比")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--accepted", type=int, default=200, help="基准用户接取的可接取任务数")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(args.tasks, args.accepted, args.limit, args.repeat) else 1)
@@ -0,0 +1,75 @@
+"""
+任务日历：一年内均匀分布的任务上各范围的查询耗时，并与窗口函数写法对比结果与耗时
+
+    python -m bench.calendar --tasks 100000
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, insert_acceptances, insert_tasks, ms, session_factory, temp_database, timed
+from core.calendar import CALENDAR_TOP, _calendar_query, task_calendar
+from core.database import query_plan
+
+
+def benchmark(count: int, accepted: int, repeat: int) -> None:
+    rng = random.Random(0)
+    year_start = datetime(2030, 1, 1)
+    with temp_database("calendar") as bench_engine:
+        (user,) = add_users(bench_engine, "bench")
+        insert_tasks(bench_engine, (
+            {
+                "title": f"任务 {i}",
+                "priority": rng.randint(1, 4),
+                # 截止时间在一年内均匀分布，约一成没有截止时间
+                "deadline": None if rng.random() < 0.1 else str(
+                    year_start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                ) + ".000000",
+                "status": rng.choices(["available", "inProgress", "completed"], [6, 2, 2])[0],
+            }
+            for i in range(count)
+        ))
+        insert_acceptances(bench_engine, user.id, rng.sample(range(1, count + 1), accepted))
+
+        ranges = [
+            ("一周", date(2030, 3, 4), date(2030, 3, 10)),
+            ("一个月", date(2030, 3, 1), date(2030, 3, 31)),
+            ("月视图（6 周）", date(2030, 2, 25), date(2030, 4, 7)),
+            ("一年", date(2030, 1, 1), date(2030, 12, 31)),
+        ]
+        with session_factory(bench_engine)() as db:
+            plan = query_plan(db, _calendar_query(user.id, ranges[1][1], ranges[1][2], CALENDAR_TOP))
+            print(f"{count} 个任务，接取 {accepted} 个；查询计划：" + "; ".join(plan))
+            print(f"{'范围':<16}{'天数':>6}{'任务数':>8}{'p50':>10}{'p95':>10}{'窗口函数 p50':>14}")
+
+            # 对照：同一范围扫描后用窗口函数计数、排名，需要对范围内全部任务排序
+            windowed = text(
+                "SELECT * FROM (SELECT date(deadline) AS day, count(*) OVER (PARTITION BY date(deadline)), id, "
+                "row_number() OVER (PARTITION BY date(deadline) ORDER BY priority DESC, deadline, id) AS rn "
+                "FROM tasks WHERE date(deadline) >= :start AND date(deadline) <= :end AND (status = 'available' "
+                "OR EXISTS (SELECT 1 FROM task_acceptances WHERE task_id = tasks.id AND user_id = :user_id))) "
+                "WHERE rn <= :top ORDER BY day, rn"
+            )
+            for label, start, end in ranges:
+                days = task_calendar(db, user, start, end)
+                params = {"start": start.isoformat(), "end": end.isoformat(), "top": CALENDAR_TOP, "user_id": user.id}
+                expected = [(row[0], row[1], row[2]) for row in db.execute(windowed, params)]
+                actual = [(day["date"], day["count"], task["id"]) for day in days for task in day["tasks"]]
+                if actual != expected:
+                    print(f"{label}: 与窗口函数的结果不一致")
+                indexed = timed(lambda: task_calendar(db, user, start, end), repeat)
+                window = timed(lambda: db.execute(windowed, params).all(), repeat)
+                total = sum(day["count"] for day in days)
+                print(f"{label:<16}{len(days):>6}{total:>8}{ms(indexed):>10}{ms(indexed, 0.95):>10}{ms(window):>14}")
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="任务日历查询基准")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--accepted", type=int, default=200, help="基准用户接取的任务数")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.tasks, args.accepted, args.repeat)
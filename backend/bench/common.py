@@ -0,0 +1,108 @@
+"""
+基准脚本与测试共用的部分：已迁移的临时 SQLite 数据库、批量写入的基准数据与延迟统计
+
+bench/ 下各基准（python -m bench.xxx）的固定流程是：在临时目录中新建数据库并执行迁移，用一条 executemany
+的 INSERT 写入大量任务，核对两种实现的结果后再比较耗时。
+"""
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from sqlalchemy import create_engine, text  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import sessionmaker  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.database import SQLITE_PRAGMAS, apply_sqlite_pragmas, engine_options
+from core.migrations import run_migrations
+
+# insert_tasks 未给出的列取这些值；publisher_id 为 add_users 创建的第一个用户
+TASK_DEFAULTS: Dict[str, Any] = {
+    "description": "",
+    "type": "team",
+    "priority": 2,
+    "max_accept_count": 5,
+    "status": "available",
+    "publisher_id": 1,
+}
+
+
+def migrated_engine(url: str, pragmas: Optional[Mapping[str, str]] = None) -> Engine:
+    """与应用相同的连接参数与 PRAGMA（默认 SQLITE_PRAGMAS），并执行迁移"""
+    bench_engine = create_engine(url, **engine_options(url))
+    apply_sqlite_pragmas(bench_engine, dict(SQLITE_PRAGMAS if pragmas is None else pragmas))
+    run_migrations(bench_engine)
+    return bench_engine
+
+
+@contextmanager
+def temp_database(
+    name: str = "bench", pragmas: Optional[Mapping[str, str]] = None, directory: Optional[str] = None
+) -> Iterator[Engine]:
+    """临时目录中的已迁移数据库，退出时释放连接并删除；directory 决定所在的文件系统"""
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        bench_engine = migrated_engine(f"sqlite:///{tmp}/{name}.db", pragmas)
+        try:
+            yield bench_engine
+        finally:
+            bench_engine.dispose()
+
+
+def session_factory(bench_engine: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+
+
+def add_users(bench_engine: Engine, *usernames: str) -> List[Principal]:
+    """按顺序创建用户，昵称与用户名相同"""
+    with session_factory(bench_engine)() as db:
+        users = [models.User(username=name, nickname=name, password_hash="-") for name in usernames]
+        db.add_all(users)
+        db.commit()
+        return [Principal.from_user(user) for user in users]
+
+
+def insert_tasks(bench_engine: Engine, rows: Iterable[Mapping[str, Any]]) -> int:
+    """
+    一条 executemany 写入任务，绕过 ORM；各行的列须相同，未给出的列取 TASK_DEFAULTS
+
+    created_at、deadline 等时间列以 SQLite 的文本格式给出。返回写入的行数。
+    """
+    rows = [{**TASK_DEFAULTS, **row} for row in rows]
+    if not rows:
+        return 0
+    columns = list(rows[0])
+    with bench_engine.begin() as conn:
+        conn.execute(
+            text(f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"), rows
+        )
+    return len(rows)
+
+
+def insert_acceptances(bench_engine: Engine, user_id: int, task_ids: Iterable[int]) -> None:
+    with bench_engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO task_acceptances (task_id, user_id, status) VALUES (:task_id, :user_id, 'inProgress')"),
+            [{"task_id": task_id, "user_id": user_id} for task_id in task_ids],
+        )
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """重复执行 fn，返回升序排列的各次耗时（秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    """samples 须已升序排列"""
+    return samples[min(len(samples) - 1, int(len(samples) * quantile))]
+
+
+def ms(samples: List[float], quantile: float = 0.5) -> str:
+    """某个分位的耗时，格式化为毫秒；没有样本时为 -"""
+    return f"{percentile(samples, quantile) * 1000:.2f}ms" if samples else "-"
@@ -0,0 +1,172 @@
+"""
+数据库层基准
+
+    python -m bench.database modes --requests 5000 --concurrency 500   # 对比同步/异步模式下任务列表与接取的吞吐量与延迟
+    python -m bench.database pragmas --threads 16 --write-ratio 0.2    # 逐项叠加 SQLITE_PRAGMAS 的混合读写吞吐量
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import anyio  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import create_engine, text  # pyright: ignore[reportMissingImports]
+from sqlalchemy.exc import OperationalError  # pyright: ignore[reportMissingImports]
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, insert_tasks, ms, session_factory, temp_database
+from core import tasks
+from core.database import SQLITE_PRAGMAS, DbSession, apply_sqlite_pragmas, engine_options, run_db
+
+
+async def benchmark_modes(requests: int, concurrency: int, task_count: int, write_ratio: float) -> None:
+    """两种模式下经 run_db 执行相同的请求：首页任务列表与接取任务按 write_ratio 混合，测量吞吐量与延迟"""
+    # 与 Starlette 相同，同步模式受 anyio 默认线程数限制
+    print(f"anyio 线程池上限: {anyio.to_thread.current_default_thread_limiter().total_tokens}")
+    print(f"{task_count} 个任务，{requests} 个请求（接取占 {write_ratio:.0%}），并发 {concurrency}")
+    print(f"{'模式':<8}{'吞吐量':>12}{'列表 p50':>12}{'列表 p99':>12}{'接取 p50':>12}{'接取 p99':>12}{'锁超时':>8}")
+    for mode in ("sync", "async"):
+        # 每种模式使用新的数据库与相同的请求序列
+        rng = random.Random(0)
+        with temp_database(f"modes-{mode}") as bench_engine:
+            users = add_users(bench_engine, *(f"user{i}" for i in range(100)))
+            insert_tasks(bench_engine, (
+                {"title": f"任务 {i}", "priority": rng.randint(1, 4), "max_accept_count": 20}
+                for i in range(task_count)
+            ))
+            if mode == "sync":
+                factory = session_factory(bench_engine)
+            else:
+                url = str(bench_engine.url)
+                async_engine = create_async_engine(
+                    url.replace("sqlite://", "sqlite+aiosqlite://", 1), **engine_options(url)
+                )
+                apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+                factory = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
+
+            latencies: Dict[str, List[float]] = {"list": [], "accept": []}
+            workload = [
+                ("accept" if rng.random() < write_ratio else "list", rng.choice(users), rng.randint(1, task_count))
+                for _ in range(requests)
+            ]
+
+            def accept(db: Session, task_id: int, user: Any) -> None:
+                try:
+                    tasks.accept_task(db, task_id, user)
+                except HTTPException:
+                    pass  # 重复接取与接取已满同样是一次完整的请求
+
+            async def handle(db: DbSession, kind: str, user: Any, task_id: int) -> None:
+                if kind == "list":
+                    await run_db(db, tasks.list_tasks, user, "available", 20, None)
+                else:
+                    await run_db(db, accept, task_id, user)
+
+            errors = 0
+
+            async def request(kind: str, user: Any, task_id: int) -> None:
+                nonlocal errors
+                started = time.perf_counter()
+                try:
+                    if mode == "sync":
+                        db = factory()
+                        try:
+                            await handle(db, kind, user, task_id)
+                        finally:
+                            db.close()
+                    else:
+                        async with factory() as db:
+                            await handle(db, kind, user, task_id)
+                except OperationalError:
+                    errors += 1  # 等锁超过 busy_timeout，接口会返回 500
+                    return
+                latencies[kind].append(time.perf_counter() - started)
+
+            semaphore = anyio.Semaphore(concurrency)
+
+            async def limited(*item: Any) -> None:
+                async with semaphore:
+                    await request(*item)
+
+            started = time.perf_counter()
+            async with anyio.create_task_group() as tg:
+                for item in workload:
+                    tg.start_soon(limited, *item)
+            rate = f"{requests / (time.perf_counter() - started):.0f} req/s"
+            if mode == "async":
+                await async_engine.dispose()
+
+        columns = [ms(sorted(latencies[kind]), q) for kind in ("list", "accept") for q in (0.5, 0.99)]
+        print(f"{mode:<8}{rate:>12}" + "".join(f"{column:>12}" for column in columns) + f"{errors:>8}")
+
+
+def benchmark_pragmas(directory: str, operations: int, threads: int, write_ratio: float) -> None:
+    """从 SQLite 默认配置开始逐项叠加 SQLITE_PRAGMAS，测量混合读写吞吐量与锁冲突次数"""
+    profiles = [("defaults", {})]
+    enabled: Dict[str, str] = {}
+    for name, value in SQLITE_PRAGMAS.items():
+        if value:
+            enabled = {**enabled, name: value}
+            profiles.append((f"+{name}={value}", enabled))
+
+    for index, (label, pragmas) in enumerate(profiles):
+        url = f"sqlite:///{directory}/pragmas-{index}.db"
+        bench_engine = create_engine(url, **engine_options(url))
+        apply_sqlite_pragmas(bench_engine, pragmas)
+        with bench_engine.begin() as conn:
+            conn.execute(text("CREATE TABLE bench (id INTEGER PRIMARY KEY, owner INTEGER, value TEXT)"))
+            conn.execute(text("CREATE INDEX ix_bench_owner ON bench (owner)"))
+            conn.execute(
+                text("INSERT INTO bench (owner, value) VALUES (:owner, :value)"),
+                [{"owner": i % 100, "value": "x" * 64} for i in range(5000)],
+            )
+
+        errors = 0
+
+        def work(_):
+            nonlocal errors
+            try:
+                with bench_engine.begin() as conn:
+                    owner = random.randrange(100)
+                    if random.random() < write_ratio:
+                        conn.execute(
+                            text("INSERT INTO bench (owner, value) VALUES (:owner, :value)"),
+                            {"owner": owner, "value": "y" * 64},
+                        )
+                    else:
+                        conn.execute(text("SELECT count(*) FROM bench WHERE owner = :owner"), {"owner": owner}).all()
+            except OperationalError:
+                errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(work, range(operations)))
+        rate = operations / (time.perf_counter() - started)
+        print(f"{label:<40} {rate:>8.0f} ops/s  锁冲突 {errors}")
+        bench_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="数据库性能基准")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    modes_parser = subparsers.add_parser("modes", help="对比同步/异步模式下任务列表与接取的吞吐量")
+    modes_parser.add_argument("--requests", type=int, default=5000)
+    modes_parser.add_argument("--concurrency", type=int, default=500)
+    modes_parser.add_argument("--tasks", type=int, default=10000)
+    modes_parser.add_argument("--write-ratio", type=float, default=0.2, help="请求中接取任务的比例")
+    pragmas_parser = subparsers.add_parser("pragmas", help="逐项对比 PRAGMA 对混合读写的影响")
+    pragmas_parser.add_argument("--operations", type=int, default=5000)
+    pragmas_parser.add_argument("--threads", type=int, default=16)
+    pragmas_parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "modes":
+        asyncio.run(benchmark_modes(args.requests, args.concurrency, args.tasks, args.write_ratio))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            benchmark_pragmas(tmp, args.operations, args.threads, args.write_ratio)
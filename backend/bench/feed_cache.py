@@ -0,0 +1,113 @@
+"""
+/bilibili/dynamics 预编码缓存的基准
+
+    python -m bench.feed_cache --requests 5000                 # 对比逐请求编码与预编码的吞吐量
+    python -m bench.feed_cache --file-sizes 10 10000 100000    # 对比旧版 JSON 与新格式缓存文件的加载耗时
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, List
+
+import httpx  # pyright: ignore[reportMissingImports]
+from fastapi import FastAPI, Request  # pyright: ignore[reportMissingImports]
+
+from bench.feed_stub import make_feed
+from core.feed_cache import FeedCache, FeedSnapshot, read_snapshot_file, write_snapshot_file
+from core.parser import parse_dynamics
+
+
+def sample_dynamics(count: int) -> List[Any]:
+    return [dynamic.to_dict() for dynamic in parse_dynamics(make_feed("1", count))]
+
+
+async def benchmark(requests: int, concurrency: int, items: int) -> None:
+    dynamics = sample_dynamics(items)
+    app = FastAPI()
+
+    # 原实现：加锁复制列表，由 FastAPI 逐请求编码
+    legacy_cache = list(dynamics)
+    legacy_lock = asyncio.Lock()
+
+    @app.get("/legacy")
+    async def legacy():
+        async with legacy_lock:
+            cached = legacy_cache.copy()
+        return cached
+
+    cache = FeedCache(dynamics)
+
+    @app.get("/snapshot")
+    async def snapshot(request: Request):
+        return await cache.respond(request)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path, headers in (
+            ("逐请求编码", "/legacy", {}),
+            ("预编码", "/snapshot", {"Accept-Encoding": "identity"}),
+            ("预编码 gzip", "/snapshot", {"Accept-Encoding": "gzip"}),
+            ("预编码 304", "/snapshot", {"If-None-Match": cache.snapshot.etag}),
+        ):
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with semaphore:
+                    response = await client.get(path, headers=headers)
+                    assert response.status_code in (200, 304)
+                    return int(response.headers.get("content-length", 0))
+
+            started = time.perf_counter()
+            sizes = await asyncio.gather(*(one() for _ in range(requests)))
+            elapsed = time.perf_counter() - started
+            print(f"{label:<12} {requests / elapsed:>8.0f} req/s  响应体 {sizes[0]} 字节")
+
+
+def benchmark_file(sizes: List[int]) -> None:
+    """对比旧版 JSON 缓存与新格式的启动加载耗时；损坏文件的识别由 tests/test_feed_cache.py 覆盖"""
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "legacy.json")
+        path = os.path.join(directory, "feed.bin")
+        for size in sizes:
+            dynamics = sample_dynamics(size)
+            with open(legacy_path, "w", encoding="utf-8") as f:
+                json.dump(dynamics, f, ensure_ascii=False, indent=2)
+            write_snapshot_file(FeedSnapshot.build(dynamics), path)
+
+            def best_ms(load: Callable[[], Any]) -> float:
+                timings = []
+                for _ in range(3):
+                    started = time.perf_counter()
+                    load()
+                    timings.append((time.perf_counter() - started) * 1000)
+                return min(timings)
+
+            def load_legacy() -> Any:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            legacy_ms = best_ms(load_legacy)
+            load_ms = best_ms(lambda: read_snapshot_file(path))
+            snapshot = read_snapshot_file(path)
+            assert snapshot is not None and snapshot.count == size and snapshot.valid
+            assert snapshot.dynamics == dynamics
+            print(
+                f"{size:>7} 条  旧版 JSON {os.path.getsize(legacy_path):>10} 字节 {legacy_ms:>8.2f}ms  "
+                f"新格式 {os.path.getsize(path):>10} 字节 {load_ms:>6.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="对比 /bilibili/dynamics 逐请求编码与预编码的吞吐量")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--items", type=int, default=5, help="缓存中的动态条数")
+    parser.add_argument("--file-sizes", type=int, nargs="+", help="改为对比不同条数下缓存文件的加载耗时")
+    args = parser.parse_args()
+    if args.file_sizes:
+        benchmark_file(args.file_sizes)
+    else:
+        asyncio.run(benchmark(args.requests, args.concurrency, args.items))
@@ -0,0 +1,272 @@
+"""
+本地 Bilibili 动态接口桩服务器，用于在没有外网和 Cookie 的情况下调试、压测抓取逻辑
+
+    python -m bench.feed_stub --port 8765
+    BILIBILI_API_BASE=http://127.0.0.1:8765 python -m core.fetch
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+FEED_PATH = "/x/polymer/web-dynamic/v1/feed/all"
+UPDATE_PATH = "/x/polymer/web-dynamic/v1/feed/all/update"
+
+
+def make_item(uid: str, index: int, pub_ts: int) -> Dict[str, Any]:
+    """构造一条视频类型的动态，字段与真实接口一致"""
+    return {
+        "id_str": f"{uid}{index:06d}",
+        "type": "DYNAMIC_TYPE_AV",
+        "modules": {
+            "module_author": {"mid": int(uid) if uid.isdigit() else 0, "pub_ts": pub_ts},
+            "module_dynamic": {
+                "desc": {"text": f"动态 {index}"},
+                "major": {
+                    "type": "MAJOR_TYPE_ARCHIVE",
+                    "archive": {
+                        "cover": f"https://i0.hdslb.com/bfs/archive/{uid}-{index}.jpg",
+                        "title": f"视频 {uid}-{index}",
+                        "stat": {"play": str(index * 100), "danmaku": str(index)},
+                    },
+                },
+            },
+            "module_stat": {
+                "like": {"count": index},
+                "comment": {"count": index // 2},
+                "forward": {"count": index // 3},
+            },
+        },
+    }
+
+
+def make_feed(uid: str, count: int, newest_ts: Optional[int] = None) -> Dict[str, Any]:
+    """构造一页按时间倒序的动态，发布时间间隔 60 秒"""
+    newest_ts = newest_ts or int(time.time())
+    return feed_response([make_item(uid, count - i, newest_ts - i * 60) for i in range(count)])
+
+
+def feed_response(items: List[Dict[str, Any]], has_more: bool = False) -> Dict[str, Any]:
+    return {
+        "code": 0,
+        "message": "0",
+        "data": {
+            "has_more": has_more,
+            "items": items,
+            "offset": items[-1]["id_str"] if items else "",
+            "update_baseline": items[0]["id_str"] if items else "",
+            "update_num": 0,
+        },
+    }
+
+
+def sample_items() -> List[Dict[str, Any]]:
+    """覆盖各种 major 类型、转发、纯文字等情况的样例"""
+
+    def with_major(index: int, item_type: str, major: Optional[Dict[str, Any]], desc: Any = None) -> Dict[str, Any]:
+        item = make_item("1", index, 1700000000 + index)
+        item["type"] = item_type
+        item["modules"]["module_dynamic"] = {"desc": desc, "major": major}
+        return item
+
+    rich_desc = {"text": "", "rich_text_nodes": [{"text": "富文本"}, {"orig_text": "原文"}, "字符串"]}
+    forward = with_major(90, "DYNAMIC_TYPE_FORWARD", None, {"text": "转发理由"})
+    forward["orig"] = make_item("2", 1, 1690000000)
+    return [
+        make_item("1", 1, 1700000001),
+        with_major(2, "DYNAMIC_TYPE_DRAW", {"type": "MAJOR_TYPE_DRAW", "draw": {"items": [{"src": "a.jpg"}]}}, {"text": "配图"}),
+        with_major(3, "DYNAMIC_TYPE_DRAW", {"type": "MAJOR_TYPE_DRAW", "draw": {"items": []}}, rich_desc),
+        with_major(4, "DYNAMIC_TYPE_DRAW", {"type": "MAJOR_TYPE_OPUS", "opus": {"pics": [{"url": "o.jpg"}], "summary": {"text": "摘要"}}}),
+        with_major(5, "DYNAMIC_TYPE_WORD", None, rich_desc),
+        with_major(6, 17, None, {"text": "数字类型"}),
+        with_major(7, "DYNAMIC_TYPE_ARTICLE", {"type": "MAJOR_TYPE_ARTICLE", "article": {"covers": ["c.jpg"], "title": "专栏"}}),
+        with_major(8, "DYNAMIC_TYPE_ARTICLE", {"type": "MAJOR_TYPE_ARTICLE", "article": {"covers": [{"url": "d.jpg"}], "title": "专栏2"}}),
+        with_major(9, "DYNAMIC_TYPE_PGC", {"type": "MAJOR_TYPE_PGC", "pgc": {"cover": "p.jpg", "title": "剧集", "stat": {"play": "9", "danmaku": "1"}}}),
+        with_major(10, "DYNAMIC_TYPE_LIVE", {"type": "MAJOR_TYPE_LIVE", "live": {"cover": "l.jpg", "title": "直播"}}),
+        with_major(11, "DYNAMIC_TYPE_MUSIC", {"type": "MAJOR_TYPE_MUSIC", "music": {"cover": "m.jpg", "title": "音频"}}),
+        with_major(12, "DYNAMIC_TYPE_COURSES", {"type": "MAJOR_TYPE_COURSES", "courses": {"cover": "k.jpg", "title": "课程"}}),
+        with_major(13, "DYNAMIC_TYPE_UGC_SEASON", {"type": "MAJOR_TYPE_UGC_SEASON", "ugc_season": {"cover": "u.jpg", "title": "合集", "stat": {"play": "3"}}}),
+        with_major(14, "DYNAMIC_TYPE_COMMON_SQUARE", {"type": "MAJOR_TYPE_COMMON", "common": {"cover": "s.jpg", "title": "通用"}}),
+        with_major(15, "DYNAMIC_TYPE_UNKNOWN", {"opus": {"pics": ["x.jpg"]}}),
+        with_major(16, "DYNAMIC_TYPE_AV", {"type": "MAJOR_TYPE_ARCHIVE", "archive": {"cover": "new_dyn/v.jpg", "title": "视频"}}),
+        with_major(17, "DYNAMIC_TYPE_AV", {"type": "MAJOR_TYPE_ARCHIVE", "archive": {"cover": "", "title": "无封面"}, "draw": {"items": ["f.jpg"]}}),
+        with_major(18, "DYNAMIC_TYPE_NONE", None, "不是字典"),
+        forward,
+    ]
+
+
+class FeedStub:
+    """
+    可编程的桩服务器
+
+    fixture 为录制的完整接口响应，设置后对所有 UID 原样回放；否则按 UID 生成 items_per_uid 条动态，
+    并可用 publish() 模拟发布新动态；page_size 非空时按接口的 offset 参数分页返回，publish() 也不再截断历史。
+    delay 控制响应延迟（秒），fail_rate 为返回 fail_status 的概率，均可在运行中修改。
+    测试需要确定的失败时使用 fail_next（接下来的若干个请求失败）、fail_uids（这些 UID 总是失败）
+    与 uid_delays（按 UID 的响应延迟）。bytes_sent 统计已发送的响应体字节数。
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixture: Optional[Dict[str, Any]] = None,
+        items_per_uid: int = 20,
+        delay: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_status: int = 503,
+        page_size: Optional[int] = None,
+    ):
+        self.fixture = fixture
+        self.items_per_uid = items_per_uid
+        self.page_size = page_size
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.fail_next = 0
+        self.fail_uids: Set[str] = set()
+        self.uid_delays: Dict[str, float] = {}
+        self.requests: List[Dict[str, str]] = []
+        self.bytes_sent = 0
+        self._items: Dict[str, List[Dict[str, Any]]] = {}
+        self._feeds: Dict[Tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def items(self, uid: str) -> List[Dict[str, Any]]:
+        if self.fixture is not None:
+            return self.fixture.get("data", {}).get("items", [])
+        with self._lock:
+            if uid not in self._items:
+                self._items[uid] = make_feed(uid, self.items_per_uid)["data"]["items"]
+            return self._items[uid]
+
+    def publish(self, uid: str, count: int = 1) -> None:
+        """在 uid 的动态页顶部插入 count 条新动态"""
+        items = self.items(uid)
+        with self._lock:
+            latest = int(items[0]["id_str"][len(uid):]) if items else 0
+            now = int(time.time())
+            fresh = [make_item(uid, latest + count - i, now - i) for i in range(count)]
+            self._items[uid] = fresh + items if self.page_size else (fresh + items)[: max(self.items_per_uid, count)]
+            for key in [key for key in self._feeds if key[0] == uid]:
+                del self._feeds[key]
+
+    def feed_body(self, uid: str, offset: str = "") -> bytes:
+        """offset 为上一页最后一条动态的 id_str，省略时返回第一页"""
+        key = (uid, offset if self.page_size else "")
+        if key not in self._feeds:
+            if self.fixture is not None:
+                payload = self.fixture
+            elif self.page_size:
+                items = self.items(uid)
+                start = next((i + 1 for i, item in enumerate(items) if item["id_str"] == offset), 0) if offset else 0
+                page = items[start:start + self.page_size]
+                payload = feed_response(page, has_more=start + self.page_size < len(items))
+            else:
+                payload = feed_response(self.items(uid))
+            self._feeds[key] = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return self._feeds[key]
+
+    def update_body(self, uid: str, baseline: str) -> bytes:
+        newer = [
+            item for item in self.items(uid)
+            if item.get("id_str", "").isdigit() and baseline.isdigit() and int(item["id_str"]) > int(baseline)
+        ]
+        payload = {"code": 0, "message": "0", "data": {"update_num": len(newer)}}
+        return json.dumps(payload).encode("utf-8")
+
+    def take_failure(self, uid: str) -> bool:
+        """本次请求是否应返回 fail_status"""
+        with self._lock:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                return True
+        return uid in self.fail_uids or bool(self.fail_rate and random.random() < self.fail_rate)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                stub.requests.append(params)
+                uid = params.get("host_mid", "0")
+                delay = stub.uid_delays.get(uid, stub.delay)
+                if delay:
+                    time.sleep(delay)
+                if parsed.path not in (FEED_PATH, UPDATE_PATH):
+                    self._send(404, b'{"code": -404, "message": "not found"}')
+                elif stub.take_failure(uid):
+                    self._send(stub.fail_status, b'{"code": -500, "message": "stub failure"}')
+                elif parsed.path == UPDATE_PATH:
+                    self._send(200, stub.update_body(uid, params.get("update_baseline", "")))
+                else:
+                    self._send(200, stub.feed_body(uid, params.get("offset", "")))
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # 客户端已超时断开
+                stub.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FeedStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FeedStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 Bilibili 动态接口桩服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", help="录制的接口响应 JSON 文件，省略时按 UID 生成数据")
+    parser.add_argument("--items", type=int, default=20, help="每个 UID 生成的动态条数")
+    parser.add_argument("--delay", type=float, default=0.0, help="响应延迟（秒）")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="返回错误的概率")
+    args = parser.parse_args()
+
+    fixture = None
+    if args.fixture:
+        with open(args.fixture, "r", encoding="utf-8") as f:
+            fixture = json.load(f)
+    stub = FeedStub(args.host, args.port, fixture, args.items, args.delay, args.fail_rate)
+    print(f"桩服务器已启动: {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,38 @@
+"""
+多账号并发抓取：在本地桩服务器上对比不同 BILIBILI_FETCH_CONCURRENCY 下抓取 N 个账号的耗时
+
+    python -m bench.fetch --accounts 32 --delay 0.1 --concurrency 1 4 16
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+from bench.feed_stub import FeedStub
+from core import fetch
+
+
+async def benchmark(accounts: int, delay: float, concurrency_levels: List[int]) -> None:
+    os.environ.setdefault("BILIBILI_COOKIE", "stub")
+    uids = [str(10000 + i) for i in range(accounts)]
+    with FeedStub(delay=delay) as stub:
+        client = fetch.BilibiliClient(base_url=stub.url)
+        try:
+            for concurrency in concurrency_levels:
+                fetch.FETCH_CONCURRENCY = concurrency
+                started = time.perf_counter()
+                dynamics = await fetch.fetch_bilibili_dynamics(client, uids)
+                elapsed = time.perf_counter() - started
+                print(f"{accounts} 个账号，并发 {concurrency}: {elapsed:.2f}s，合并后 {len(dynamics)} 条")
+        finally:
+            await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多账号并发抓取基准")
+    parser.add_argument("--accounts", type=int, default=32)
+    parser.add_argument("--delay", type=float, default=0.1, help="桩服务器每次响应的延迟（秒）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.accounts, args.delay, args.concurrency))
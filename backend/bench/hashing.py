@@ -0,0 +1,40 @@
+"""
+密码校验吞吐量：不同大小的进程池（0 为事件循环默认线程池）下并发登录的速度
+
+    python -m bench.hashing --sizes 0 1 2 4 --count 200 --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+
+from core.hashing import PasswordHasherPool, _hash
+
+
+async def benchmark(workers: int, count: int, concurrency: int) -> float:
+    pool = PasswordHasherPool(workers=workers, queue_limit=count)
+    hashed = _hash("benchmark-password")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with semaphore:
+            await pool.verify_and_update("benchmark-password", hashed)
+
+    try:
+        await pool.verify("benchmark-password", hashed)  # 预热子进程
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(count)))
+        return count / (time.perf_counter() - started)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="密码校验吞吐量基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1, 2, 4], help="进程池大小，0 表示线程池")
+    parser.add_argument("--count", type=int, default=200, help="每组模拟的登录次数")
+    parser.add_argument("--concurrency", type=int, default=64, help="同时发起的登录数")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        rate = asyncio.run(benchmark(size, args.count, args.concurrency))
+        print(f"workers={size}: {rate:.1f} logins/sec")
@@ -0,0 +1,53 @@
+"""
+动态解析吞吐量
+
+    python -m bench.parser                      # 用生成的混合类型数据测吞吐量
+    python -m bench.parser --fixture feed.json  # 用录制的接口响应测吞吐量
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, List
+
+from bench.feed_stub import sample_items
+from core.parser import parse_dynamics
+
+
+def benchmark(fixtures: List[str], items: int, repeat: int) -> bool:
+    if fixtures:
+        source = []
+        for path in fixtures:
+            with open(path, "r", encoding="utf-8") as f:
+                source.extend((json.load(f).get("data") or {}).get("items") or [])
+    else:
+        source = sample_items()
+    if not source:
+        print("没有可解析的动态")
+        return False
+    payload = (source * (items // len(source) + 1))[:items]
+
+    def measure(fn: Callable[[], Any]) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        return len(payload) / best
+
+    print(f"{len(payload)} 条动态（{len(source)} 条样例）")
+    for label, fn in (
+        ("parse_dynamics", lambda: parse_dynamics(payload)),
+        ("parse_dynamics + to_dict", lambda: [dynamic.to_dict() for dynamic in parse_dynamics(payload)]),
+    ):
+        print(f"{label:<26} {measure(fn):>10.0f} 条/秒")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="动态解析吞吐量基准")
+    parser.add_argument("--fixture", nargs="*", default=[], help="录制的接口响应 JSON 文件，省略时使用生成的样例")
+    parser.add_argument("--items", type=int, default=100000, help="解析的动态条数，样例不足时循环使用")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快的一次")
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(args.fixture, args.items, args.repeat) else 1)
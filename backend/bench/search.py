@@ -0,0 +1,115 @@
+"""
+任务全文搜索：合成语料上的建索引与查询耗时
+
+    python -m bench.search --tasks 100000
+"""
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from sqlalchemy import text  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, insert_tasks, ms, session_factory, temp_database
+from core.search import ELLIPSIS, MIN_INDEXED_LENGTH, _like_pattern, search_tasks, search_terms, snippet
+
+
+def benchmark(count: int, queries: Optional[List[str]], repeat: int) -> None:
+    # 词频近似 Zipf 分布：少数常见词出现在大量任务中，多数词只出现在少数任务中
+    rng = random.Random(0)
+    base = (
+        "登录 页面 样式 接口 数据库 缓存 部署 测试 文档 设计 重构 性能 推送 活动 海报 视频 剪辑 采访 招新 "
+        "报名 统计 表格 服务器 证书 备份 迁移 日志 权限 相册 直播 字幕 配音 封面 周报 例会 预算 采购 "
+        "login api deploy cache bug android ios docs poster video backup review release"
+    ).split()
+    chars = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研质"
+    vocabulary = base + list(dict.fromkeys(
+        "".join(rng.choices(chars, k=rng.choice((2, 3, 3, 4)))) for _ in range(5000)
+    ))
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    tag_pool = ["宣传", "技术", "设计", "运营", "视频", "文案", "后勤", "urgent"]
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(vocabulary, weights, k=k))
+
+    if not queries:
+        head, mid, tail = (
+            next(word for word in vocabulary[rank:] if len(word) >= MIN_INDEXED_LENGTH) for rank in (0, 60, 2000)
+        )
+        queries = [head, mid, tail, f"{mid} {tail}", vocabulary[0], f"{head} {vocabulary[1]}", "不存在的词"]
+
+    with temp_database("search") as bench_engine:
+        add_users(bench_engine, "bench")
+        rows = [
+            {
+                "title": words(3) + f" #{i}",
+                "description": "，".join(words(4) for _ in range(6)),
+                "tags": ",".join(rng.sample(tag_pool, rng.randint(0, 3))) or None,
+            }
+            for i in range(count)
+        ]
+        started = time.perf_counter()
+        insert_tasks(bench_engine, rows)
+        insert_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        with bench_engine.begin() as conn:
+            conn.execute(text("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')"))
+        rebuild_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        with bench_engine.begin() as conn:
+            conn.execute(
+                text("UPDATE tasks SET title = title || ' 更新' WHERE id = :id"),
+                [{"id": rng.randint(1, count)} for _ in range(1000)],
+            )
+        update_ms = (time.perf_counter() - started) * 1000 / 1000
+        print(f"{count} 个任务：写入（含触发器建索引）{insert_seconds:.2f}s，"
+              f"全量重建索引 {rebuild_seconds:.2f}s，单条更新 {update_ms:.3f}ms")
+
+        with session_factory(bench_engine)() as db:
+            print(f"{'查询':<24}{'命中':>8}{'首页 p50':>12}{'首页 p95':>12}{'次页 p50':>12}{'LIKE 扫描':>12}")
+            for q in queries:
+                first, second = [], []
+                next_cursor = None
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    _, next_cursor = search_tasks(db, None, q, 20, None)
+                    first.append(time.perf_counter() - started)
+                    if next_cursor:
+                        started = time.perf_counter()
+                        search_tasks(db, None, q, 20, next_cursor)
+                        second.append(time.perf_counter() - started)
+                terms = search_terms(q)
+                condition = " AND ".join(
+                    f"(title LIKE :t{i} OR description LIKE :t{i} OR tags LIKE :t{i})" for i in range(len(terms))
+                )
+                params = {f"t{i}": _like_pattern(term) for i, term in enumerate(terms)}
+                started = time.perf_counter()
+                hits = db.execute(text(f"SELECT count(*) FROM tasks WHERE {condition}"), params).scalar()
+                scan_ms = (time.perf_counter() - started) * 1000
+
+                first.sort()
+                second.sort()
+                label = q if len(q) <= 20 else q[:19] + ELLIPSIS
+                print(
+                    f"{label:<24}{hits:>8}{ms(first):>12}{ms(first, 0.95):>12}{ms(second):>12}{scan_ms:>10.2f}ms"
+                )
+            # 粗略衡量高亮的额外开销
+            sample = [r.description for r in db.execute(text("SELECT description FROM tasks LIMIT 20"))]
+            started = time.perf_counter()
+            for _ in range(100):
+                for description in sample:
+                    snippet(description, [vocabulary[60], vocabulary[2]])
+            print(f"每页 20 条摘要高亮 {(time.perf_counter() - started) / 100 * 1000:.3f}ms")
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="任务全文搜索基准")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--query", action="append",
+        help="可重复；默认按词频选取常见词、中频词、罕见词、组合、两字短词与不存在的词",
+    )
+    args = parser.parse_args()
+    benchmark(args.tasks, args.query, args.repeat)
@@ -0,0 +1,85 @@
+"""
+任务列表序列化耗时：原实现（逐个构造 TaskResponse 再按 response_model 校验）与快速路径对比
+
+    python -m bench.serialization --tasks 1000
+"""
+import argparse
+import json
+import sys
+from typing import List
+
+from fastapi.responses import JSONResponse  # pyright: ignore[reportMissingImports]
+from pydantic import TypeAdapter  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, insert_tasks, session_factory, temp_database, timed
+from core import models, serialization, tasks
+from core.schemas import TaskResponse
+from core.serialization import json_response, task_payload
+
+
+def benchmark(count: int, repeat: int) -> bool:
+    """校验原路径与快速路径输出一致，并对比每 1000 个任务的耗时"""
+    with temp_database("serialization") as bench_engine:
+        (principal,) = add_users(bench_engine, "bench")
+        insert_tasks(bench_engine, (
+            {
+                "title": f"任务 {i}", "description": "描述" * 20, "priority": i % 4 + 1,
+                "deadline": "2030-01-01 12:00:00.000000", "tags": "a,b,c",
+            }
+            for i in range(count)
+        ))
+        with session_factory(bench_engine)() as db:
+            rows = tasks.task_rows(db).all()
+            orm_tasks = db.query(models.Task).all()
+            adapter = TypeAdapter(List[TaskResponse])
+
+            def legacy_response(task: models.Task, publisher_name: str) -> TaskResponse:
+                return TaskResponse(
+                    id=task.id, title=task.title, description=task.description, type=task.type,
+                    priority=task.priority, max_accept_count=task.max_accept_count, deadline=task.deadline,
+                    tags=task.tags.split(",") if task.tags else [], status=task.status,
+                    publisher_id=task.publisher_id, publisher_name=publisher_name,
+                    accepted_count=0, created_at=task.created_at, is_accepted=False,
+                )
+
+            def current_path() -> bytes:
+                # 原实现：逐个构造 TaskResponse，FastAPI 再按 response_model 校验、转换并编码
+                responses = [legacy_response(task, principal.nickname) for task in orm_tasks]
+                validated = adapter.validate_python(responses, from_attributes=True)
+                return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+            def fast_path() -> bytes:
+                return json_response([task_payload(row, 0, False) for row in rows]).body
+
+            expected, actual = json.loads(current_path()), json.loads(fast_path())
+            if expected != actual:
+                print("输出不一致:", expected[0], actual[0], sep="\n  ")
+                return False
+
+            def best_ms(fn) -> float:
+                return timed(fn, repeat)[0] * 1000 * 1000 / count
+
+            print(f"{count} 个任务，输出一致（orjson: {'是' if serialization.orjson is not None else '否'}）")
+            print(f"仅序列化  原实现 {best_ms(current_path):7.2f}ms / 1000 个   快速路径 {best_ms(fast_path):7.2f}ms / 1000 个")
+
+            def current_list() -> bytes:
+                loaded = db.query(models.Task).all()
+                responses = [legacy_response(task, task.publisher.nickname) for task in loaded]
+                db.expire_all()
+                return JSONResponse(adapter.dump_python(adapter.validate_python(responses), mode="json")).body
+
+            def fast_list() -> bytes:
+                items, _ = tasks.list_tasks(db, principal, "all", count, None)
+                return json_response(items).body
+
+            print(f"查询+序列化 原实现 {best_ms(current_list):7.2f}ms / 1000 个   快速路径 {best_ms(fast_list):7.2f}ms / 1000 个")
+    return True
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="任务列表序列化耗时对比")
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(args.tasks, args.repeat) else 1)
@@ -0,0 +1,114 @@
+"""
+写入合并队列：并发创建、接取任务，对比逐个提交与合并提交的写入吞吐量与延迟
+
+    python -m bench.write_queue --writes 2000 --concurrency 32 --dir /data
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+
+from bench.common import add_users, percentile, session_factory, temp_database
+from core import models, tasks
+from core.database import SQLITE_PRAGMAS
+from core.schemas import TaskCreate
+from core.write_queue import WRITE_COALESCE_MS, WriteQueue, writer_engine
+
+
+def task_body(i: int) -> TaskCreate:
+    return TaskCreate(title=f"任务 {i}", description="描述", type="team", priority=i % 4 + 1,
+                      max_accept_count=3, tags=[f"组{i % 5}"])
+
+
+def benchmark(writes: int, concurrency: int, window_ms: float, synchronous_modes: List[str], directory: str) -> bool:
+    """并发创建、接取任务，对比逐个提交与合并提交的吞吐量；接取中混入重复接取，检查失败只影响各自的请求"""
+    ok = True
+    print(f"{writes} 次创建 + {writes} 次接取（含 {writes // 10} 次重复接取），并发 {concurrency}")
+    for synchronous in synchronous_modes:
+        pragmas = {**SQLITE_PRAGMAS, "synchronous": synchronous}
+        for label in ("逐个提交", "合并提交"):
+            with temp_database("writes", pragmas, directory) as bench_engine:
+                BenchSession = session_factory(bench_engine)
+                organizer, member = add_users(bench_engine, "organizer", "member")
+
+                queue_ = None
+                if label == "合并提交":
+                    queue_ = WriteQueue(writer_engine(str(bench_engine.url), pragmas), window_ms)
+
+                def call(fn: Callable[..., Any], *args: Any) -> Any:
+                    if queue_ is not None:
+                        return queue_.submit(fn, *args).result()
+                    with BenchSession() as db:
+                        return fn(db, *args)
+
+                def phase(fn: Callable[..., Any], items: List[Tuple[Any, ...]]) -> Tuple[float, List[Any]]:
+                    def timed(args: Tuple[Any, ...]) -> Tuple[float, Any]:
+                        started = time.perf_counter()
+                        try:
+                            result: Any = call(fn, *args)
+                        except Exception as exc:
+                            result = exc
+                        return time.perf_counter() - started, result
+
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                        outcomes = list(executor.map(timed, items))
+                    elapsed = time.perf_counter() - started
+                    latencies = sorted(latency for latency, _ in outcomes)
+                    print(
+                        f"  {label} {fn.__name__:<12}{len(items) / elapsed:>8.0f} 次/秒"
+                        f"  p50 {percentile(latencies, 0.5) * 1000:6.1f}ms"
+                        f"  p95 {percentile(latencies, 0.95) * 1000:6.1f}ms",
+                        end="",
+                    )
+                    if queue_ is not None and queue_.commits:
+                        print(f"  平均每次提交 {queue_.writes / queue_.commits:.1f} 个请求", end="")
+                        queue_.commits = queue_.writes = 0
+                    print()
+                    return elapsed, [result for _, result in outcomes]
+
+                _, created = phase(tasks.create_task, [(task_body(i), organizer) for i in range(writes)])
+                task_ids = [payload["id"] for payload in created if isinstance(payload, dict)]
+                accepts = [(task_id, member) for task_id in task_ids]
+                accepts += [(task_id, member) for task_id in task_ids[::10]]
+                _, accepted = phase(tasks.accept_task, accepts)
+                if queue_ is not None:
+                    queue_.shutdown()
+                    queue_.engine.dispose()
+
+                rejected = [result for result in accepted if isinstance(result, HTTPException)]
+                with BenchSession() as db:
+                    revisions = {task.revision for task in db.query(models.Task)}
+                    acceptances = db.query(models.TaskAcceptance).count()
+                expected_rejected = len(task_ids[::10])
+                if (
+                    len(task_ids) != writes
+                    or len(revisions) != writes
+                    or acceptances != writes
+                    or len(rejected) != expected_rejected
+                    or len(rejected) + sum(isinstance(result, dict) for result in accepted) != len(accepts)
+                ):
+                    print(f"  {label}: 结果异常（任务 {len(task_ids)}，版本号 {len(revisions)}，"
+                          f"接取 {acceptances}，拒绝 {len(rejected)}）")
+                    ok = False
+        print(f"  ↑ synchronous={synchronous}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="逐个提交与合并提交的并发写入吞吐量")
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=WRITE_COALESCE_MS)
+    parser.add_argument(
+        "--synchronous", action="append",
+        help="可重复；默认对比 NORMAL（WAL 下提交不 fsync）与 FULL（每次提交 fsync）",
+    )
+    parser.add_argument("--dir", default=None, help="数据库所在目录；fsync 的开销取决于该目录所在的文件系统")
+    args = parser.parse_args()
+    sys.exit(0 if benchmark(
+        args.writes, args.concurrency, args.window_ms, args.synchronous or ["NORMAL", "FULL"], args.dir
+    ) else 1)
@@ -1,31 +1,113 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status  # pyright: ignore[reportMissingImports]
 from fastapi.security import OAuth2PasswordBearer  # pyright: ignore[reportMissingImports]
 from jose import JWTError, jwt  # pyright: ignore[reportMissingImports, reportMissingModuleSource]
-from passlib.context import CryptContext  # pyright: ignore[reportMissingImports, reportMissingModuleSource]
 from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
 
-from core.database import get_db
+from core.database import DbSession, get_db, run_db
 from core import models
 from core.schemas import TokenData
 
 SECRET_KEY = os.getenv("JWT_SECRET", "hxkterminal-secret")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "120"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(frozen=True)
+class Principal:
+    """已认证用户的只读快照，缓存命中时无需查询数据库"""
+
+    id: int
+    username: str
+    nickname: Optional[str]
+    avatar: Optional[str]
+    qq: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            nickname=user.nickname,
+            avatar=user.avatar,
+            qq=user.qq,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """token -> Principal 的 LRU + TTL 缓存，条目不会超过 token 自身的过期时间"""
+
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """只清除本进程的缓存；其他 worker 中该用户的条目仍会保留到各自的 TTL 到期"""
+        with self._lock:
+            stale = [token for token, (_, principal) in self._entries.items() if principal.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """由 GET /auth/cache/status 返回，用于确认 AUTH_CACHE_SIZE 与 AUTH_CACHE_TTL 是否合适"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+principal_cache = PrincipalCache()
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -39,7 +121,11 @@ def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.username == username).first()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: DbSession = Depends(get_db)) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -54,8 +140,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
 
-    user = get_user_by_username(db, token_data.username)
+    user = await run_db(db, get_user_by_username, token_data.username)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
 
+def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
+    return db.get(models.User, user_id)
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal), db: DbSession = Depends(get_db)
+) -> models.User:
+    """需要修改用户本身的接口使用；只需要用户 id 的接口应依赖 get_current_principal"""
+    user = await run_db(db, get_user_by_id, principal.id)
+    if user is None:
+        principal_cache.invalidate_user(principal.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
@@ -0,0 +1,297 @@
+"""
+批量任务操作
+
+POST /tasks/batch 在一个事务中按顺序执行一组 create / update / delete / accept / complete / abandon，逐项返回结果。
+相邻的同类操作合为一组，每组用批量语句完成（多行 INSERT、executemany UPDATE、IN 条件的 DELETE），整批只提交一次。
+单项失败（不存在、无权限、人数已满等）不影响其他项，状态码与错误信息与对应的单个接口一致。
+与逐个调用单个接口的写入耗时对比见 bench/batch.py。
+"""
+from itertools import groupby
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, exists, func, insert, literal, select, update  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.schemas import TaskBatchOperation
+from core.tasks import (
+    add_tombstones,
+    new_task_values,
+    next_revision,
+    normalize_tags,
+    serialize_tasks,
+    set_tags_bulk,
+    task_rows,
+)
+
+# (状态码, 错误信息, 结果中返回的任务 id)
+Result = Tuple[int, Optional[str], Optional[int]]
+# (在整批中的序号, 操作, 为该操作预留的版本号)
+Item = Tuple[int, TaskBatchOperation, int]
+
+
+def _ok(task_id: Optional[int] = None) -> Result:
+    return 200, None, task_id
+
+
+def _fail(status_code: int, detail: str) -> Result:
+    return status_code, detail, None
+
+
+def _publishers(db: Session, items: List[Item]) -> Dict[int, int]:
+    task_ids = {operation.task_id for _, operation, _ in items if operation.task_id is not None}
+    return dict(db.execute(
+        select(models.Task.id, models.Task.publisher_id).where(models.Task.id.in_(task_ids))
+    ).all())
+
+
+def _accepted_ids(db: Session, items: List[Item], user_id: int) -> set:
+    task_ids = {operation.task_id for _, operation, _ in items if operation.task_id is not None}
+    return set(db.execute(
+        select(models.TaskAcceptance.task_id).where(
+            models.TaskAcceptance.task_id.in_(task_ids), models.TaskAcceptance.user_id == user_id
+        )
+    ).scalars())
+
+
+def _touch_tasks(db: Session, revisions: Dict[int, int], status) -> None:
+    """一条 executemany UPDATE 为各任务写入状态与版本号，status 可以是引用本行的表达式"""
+    table = models.Task.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("target_id"))
+        .values(status=status, revision=bindparam("target_revision")),
+        [{"target_id": task_id, "target_revision": revision} for task_id, revision in revisions.items()],
+    )
+
+
+def _create(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    results: Dict[int, Result] = {}
+    rows = []
+    for index, operation, revision in items:
+        if operation.task is None:
+            results[index] = _fail(422, "create 操作须提供 task")
+            continue
+        values, tags = new_task_values(operation.task, current_user.id)
+        rows.append((index, {**values, "revision": revision}, tags))
+    if not rows:
+        return results
+
+    task_ids = db.execute(
+        insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True),
+        [values for _, values, _ in rows],
+    ).scalars().all()
+    # SQLite 可能复用刚删除的最大 id，此时旧墓碑已不再成立
+    db.execute(delete(models.TaskTombstone).where(models.TaskTombstone.task_id.in_(task_ids)))
+    set_tags_bulk(db, {task_id: tags for task_id, (_, _, tags) in zip(task_ids, rows) if tags})
+    for task_id, (index, _, _) in zip(task_ids, rows):
+        results[index] = _ok(task_id)
+    return results
+
+
+def _update(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    results: Dict[int, Result] = {}
+    publishers = _publishers(db, items)
+    # 同一任务的多次修改按顺序合并为一行
+    merged: Dict[int, Dict[str, Any]] = {}
+    task_tags: Dict[int, List[str]] = {}
+    for index, operation, revision in items:
+        task_id = operation.task_id
+        if task_id is None or operation.changes is None:
+            results[index] = _fail(422, "update 操作须提供 task_id 与 changes")
+        elif task_id not in publishers:
+            results[index] = _fail(404, "任务不存在")
+        elif publishers[task_id] != current_user.id:
+            results[index] = _fail(403, "无权修改此任务")
+        else:
+            values = operation.changes.model_dump(exclude_unset=True)
+            if "tags" in values:
+                task_tags[task_id] = normalize_tags(values["tags"] or [])
+                values["tags"] = ",".join(task_tags[task_id]) or None
+            merged.setdefault(task_id, {"id": task_id}).update(values, revision=revision)
+            results[index] = _ok(task_id)
+    if merged:
+        db.execute(update(models.Task), list(merged.values()))
+        set_tags_bulk(db, task_tags)
+    return results
+
+
+def _delete(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    results: Dict[int, Result] = {}
+    publishers = _publishers(db, items)
+    revisions: Dict[int, int] = {}
+    for index, operation, revision in items:
+        task_id = operation.task_id
+        if task_id is None:
+            results[index] = _fail(422, "delete 操作须提供 task_id")
+        elif task_id not in publishers or task_id in revisions:
+            results[index] = _fail(404, "任务不存在")
+        elif publishers[task_id] != current_user.id:
+            results[index] = _fail(403, "无权删除此任务")
+        else:
+            revisions[task_id] = revision
+            results[index] = _ok()
+    if revisions:
+        task_ids = list(revisions)
+        db.execute(
+            delete(models.TaskAcceptance)
+            .where(models.TaskAcceptance.task_id.in_(task_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(delete(models.TaskTag).where(models.TaskTag.task_id.in_(task_ids)))
+        add_tombstones(db, revisions)
+        db.execute(
+            delete(models.Task).where(models.Task.id.in_(task_ids)).execution_options(synchronize_session=False)
+        )
+    return results
+
+
+def _accept(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    """与 tasks.accept_task 相同，容量与重复接取都在 INSERT ... SELECT 的条件中判断，只是一次处理多个任务"""
+    results: Dict[int, Result] = {}
+    task_ids = {operation.task_id for _, operation, _ in items if operation.task_id is not None}
+    accepted_count = (
+        select(func.count(models.TaskAcceptance.id))
+        .where(models.TaskAcceptance.task_id == models.Task.id)
+        .scalar_subquery()
+    )
+    already_accepted = exists().where(
+        models.TaskAcceptance.task_id == models.Task.id,
+        models.TaskAcceptance.user_id == current_user.id,
+    )
+    table = models.TaskAcceptance.__table__
+    inserted = set(db.execute(
+        insert(table)
+        .from_select(
+            ["task_id", "user_id", "status"],
+            select(models.Task.id, literal(current_user.id), literal("inProgress")).where(
+                models.Task.id.in_(task_ids),
+                accepted_count < models.Task.max_accept_count,
+                ~already_accepted,
+            ),
+        )
+        .returning(table.c.task_id)
+    ).scalars())
+
+    # 未能插入的逐项查明原因
+    existing = set(db.execute(select(models.Task.id).where(models.Task.id.in_(task_ids))).scalars())
+    mine = _accepted_ids(db, items, current_user.id)
+    revisions: Dict[int, int] = {}
+    for index, operation, revision in items:
+        task_id = operation.task_id
+        if task_id is None:
+            results[index] = _fail(422, "accept 操作须提供 task_id")
+        elif task_id in inserted and task_id not in revisions:
+            revisions[task_id] = revision
+            results[index] = _ok(task_id)
+        elif task_id not in existing:
+            results[index] = _fail(404, "任务不存在")
+        elif task_id in mine:
+            results[index] = _fail(400, "你已接取该任务")
+        else:
+            results[index] = _fail(400, "任务接取人数已满")
+    if revisions:
+        _touch_tasks(db, revisions, "inProgress")
+    return results
+
+
+def _complete(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    results: Dict[int, Result] = {}
+    mine = _accepted_ids(db, items, current_user.id)
+    revisions: Dict[int, int] = {}
+    for index, operation, revision in items:
+        if operation.task_id is None:
+            results[index] = _fail(422, "complete 操作须提供 task_id")
+        elif operation.task_id not in mine or operation.task_id in revisions:
+            results[index] = _fail(404, "你尚未接取此任务")
+        else:
+            revisions[operation.task_id] = revision
+            results[index] = _ok(operation.task_id)
+    if revisions:
+        db.execute(
+            update(models.TaskAcceptance)
+            .where(
+                models.TaskAcceptance.task_id.in_(list(revisions)),
+                models.TaskAcceptance.user_id == current_user.id,
+            )
+            .values(status="completed")
+            .execution_options(synchronize_session=False)
+        )
+        # 所有接取者都完成后任务才算完成
+        table = models.Task.__table__
+        pending = exists().where(
+            models.TaskAcceptance.task_id == table.c.id, models.TaskAcceptance.status != "completed"
+        )
+        _touch_tasks(db, revisions, case((~pending, "completed"), else_=table.c.status))
+    return results
+
+
+def _abandon(db: Session, items: List[Item], current_user: Principal) -> Dict[int, Result]:
+    results: Dict[int, Result] = {}
+    mine = _accepted_ids(db, items, current_user.id)
+    revisions: Dict[int, int] = {}
+    for index, operation, revision in items:
+        if operation.task_id is None:
+            results[index] = _fail(422, "abandon 操作须提供 task_id")
+        elif operation.task_id not in mine or operation.task_id in revisions:
+            results[index] = _fail(404, "你尚未接取此任务")
+        else:
+            revisions[operation.task_id] = revision
+            results[index] = _ok(operation.task_id)
+    if revisions:
+        db.execute(
+            delete(models.TaskAcceptance)
+            .where(
+                models.TaskAcceptance.task_id.in_(list(revisions)),
+                models.TaskAcceptance.user_id == current_user.id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # 最后一位接取者放弃后任务重新开放
+        table = models.Task.__table__
+        remaining = exists().where(models.TaskAcceptance.task_id == table.c.id)
+        _touch_tasks(db, revisions, case((~remaining, "available"), else_=table.c.status))
+    return results
+
+
+_HANDLERS: Dict[str, Callable[[Session, List[Item], Principal], Dict[int, Result]]] = {
+    "create": _create,
+    "update": _update,
+    "delete": _delete,
+    "accept": _accept,
+    "complete": _complete,
+    "abandon": _abandon,
+}
+
+
+def run_batch(db: Session, operations: List[TaskBatchOperation], current_user: Principal) -> List[Dict[str, Any]]:
+    """执行一批操作并提交，返回与 operations 一一对应的结果"""
+    # 先为每项操作预留一个版本号。这是事务中的第一条写语句，之后的读取都在写锁下进行，不会与并发写入交错
+    first = next_revision(db, len(operations)) - len(operations) + 1
+    results: Dict[int, Result] = {}
+    position = 0
+    for op, group in groupby(operations, key=attrgetter("op")):
+        items = [(position + offset, operation, first + position + offset) for offset, operation in enumerate(group)]
+        position += len(items)
+        results.update(_HANDLERS[op](db, items, current_user))
+    db.commit()
+
+    task_ids = {task_id for _, _, task_id in results.values() if task_id is not None}
+    payloads: Dict[int, Dict[str, Any]] = {}
+    if task_ids:
+        rows = task_rows(db).filter(models.Task.id.in_(task_ids)).all()
+        payloads = {payload["id"]: payload for payload in serialize_tasks(db, rows, current_user)}
+    output = []
+    for index, operation in enumerate(operations):
+        status_code, detail, task_id = results[index]
+        output.append({
+            "index": index,
+            "op": operation.op,
+            "status_code": status_code,
+            "detail": detail,
+            # 被同一批中后面的操作删除的任务不再返回
+            "task": payloads.get(task_id) if task_id is not None else None,
+        })
+    return output
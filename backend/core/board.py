@@ -0,0 +1,152 @@
+"""
+可接取任务看板的内存物化视图
+
+GET /tasks 在默认条件下（available 范围、按发布时间倒序、无其他筛选）是调用最多的接口，而它的内容只随任务写入变化。
+TaskBoard 在进程内保存全部可接取任务：按 (created_at 原始文本, id) 升序排列的键列表，每个任务预先构造好的响应字典
+（发布者名称与接取人数已展开），以及每个用户接取过的看板任务 id 集合，用于按人填充 is_accepted。
+
+视图带有版本号 revision，即它所反映的全局版本号（tasks.next_revision）。启动时全量构建，之后由写接口在提交后调用
+refresh 增量更新：只读取版本号更大的任务与墓碑。读取时只需比较视图版本号与 ETag 已读出的全局版本号，相同即直接从内存
+分页，不再执行列表查询；落后时（例如其他 worker 的写入）先增量更新。游标格式与 tasks.list_tasks 相同，两者可以混用。
+与 SQL 分页的结果与延迟对比见 bench/board.py。
+"""
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import String, cast, select  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.database import SessionLocal
+from core.pagination import encode_cursor
+from core.serialization import TaskPayload, task_payload
+from core.tasks import TASK_SORTS, TaskFilters, current_revision, decode_sort_cursor, task_rows
+
+_Key = Tuple[str, int]
+
+
+class TaskBoard:
+    """
+    可接取任务的有序索引
+
+    refresh 在数据库会话中读取变更，只在持有锁时修改内存结构，读写互不阻塞数据库 IO。
+    并发的两次 refresh 从同一版本号出发时，后完成的一次从对方推进后的版本号重新读取变更，直到看板不落后于它读到的版本号。
+    """
+
+    def __init__(self) -> None:
+        self.revision: Optional[int] = None
+        self._keys: List[_Key] = []
+        self._entries: Dict[int, Tuple[_Key, TaskPayload]] = {}
+        self._acceptors: Dict[int, Tuple[int, ...]] = {}  # 看板任务 id -> 接取者 id，只记有接取者的任务
+        self._accepted: Dict[int, Set[int]] = {}  # 用户 id -> 其接取的看板任务 id
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def serves(scope: str, filters: TaskFilters, sort: str) -> bool:
+        """该列表请求能否由看板直接返回"""
+        return (
+            scope == "available"
+            and sort == "created_at"
+            and filters in (TaskFilters(), TaskFilters(status="available"))
+        )
+
+    def is_current(self, revision: int) -> bool:
+        """看板是否已反映到全局版本号 revision"""
+        current = self.revision
+        return current is not None and current >= revision
+
+    def refresh(self, db: Session) -> None:
+        """追赶到数据库当前的全局版本号；尚未构建时全量构建"""
+        # 先读版本号再读变更：版本号之前的写入都已提交可见，之后的写入被多读到也只是提前反映
+        latest = current_revision(db)
+        while not self.is_current(latest):
+            self._catch_up(db, self.revision, latest)
+
+    def _catch_up(self, db: Session, since: Optional[int], latest: int) -> None:
+        """读取 since 之后的变更并应用；期间看板已被其他 refresh 推进时放弃本次结果，由调用方重试"""
+        task = models.Task
+        changed = task.status == "available" if since is None else task.revision > since
+        rows = task_rows(db, cast(task.created_at, String).label("sort_key")).filter(changed).all()
+        acceptors: Dict[int, List[int]] = {}
+        for task_id, user_id in db.execute(
+            select(models.TaskAcceptance.task_id, models.TaskAcceptance.user_id)
+            .join(task, task.id == models.TaskAcceptance.task_id)
+            .where(changed)
+        ):
+            acceptors.setdefault(task_id, []).append(user_id)
+        removed: List[int] = []
+        if since is not None:
+            removed = list(db.execute(
+                select(models.TaskTombstone.task_id).where(models.TaskTombstone.revision > since)
+            ).scalars())
+
+        with self._lock:
+            if self.revision != since:
+                return
+            if since is None:
+                self._keys, self._entries, self._acceptors, self._accepted = [], {}, {}, {}
+                for row in rows:
+                    self._insert(row, tuple(acceptors.get(row.id, ())), ordered=False)
+                self._keys.sort()
+            else:
+                for task_id in removed:
+                    self._discard(task_id)
+                for row in rows:
+                    self._discard(row.id)
+                    if row.status == "available":
+                        self._insert(row, tuple(acceptors.get(row.id, ())))
+            self.revision = latest
+
+    def page(
+        self, current_user: Principal, limit: int, cursor: Optional[str]
+    ) -> Tuple[List[TaskPayload], Optional[str]]:
+        """与 tasks.list_tasks(scope="available") 相同的一页与下一页游标"""
+        after_key, after_id = decode_sort_cursor(cursor, TASK_SORTS["created_at"])
+        with self._lock:
+            end = len(self._keys) if after_id is None else bisect_left(self._keys, (after_key, after_id))
+            keys = self._keys[max(0, end - limit - 1):end]
+            entries = [self._entries[task_id][1] for _, task_id in reversed(keys)]
+            accepted = self._accepted.get(current_user.id, ())
+            items = [{**payload, "is_accepted": payload["id"] in accepted} for payload in entries]
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(*keys[1])
+        return items, next_cursor
+
+    def _insert(self, row: Any, acceptors: Tuple[int, ...], ordered: bool = True) -> None:
+        """ordered 为假时只追加键，由调用方最后统一排序"""
+        key = (row.sort_key or "", row.id)
+        if ordered:
+            insort(self._keys, key)
+        else:
+            self._keys.append(key)
+        self._entries[row.id] = (key, task_payload(row, len(acceptors), False))
+        if acceptors:
+            self._acceptors[row.id] = acceptors
+            for user_id in acceptors:
+                self._accepted.setdefault(user_id, set()).add(row.id)
+
+    def _discard(self, task_id: int) -> None:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        index = bisect_left(self._keys, entry[0])
+        del self._keys[index]
+        for user_id in self._acceptors.pop(task_id, ()):
+            accepted = self._accepted[user_id]
+            accepted.discard(task_id)
+            if not accepted:
+                del self._accepted[user_id]
+
+
+task_board = TaskBoard()
+
+
+def build_task_board() -> None:
+    """启动时在独立会话中全量构建"""
+    with SessionLocal() as db:
+        task_board.refresh(db)
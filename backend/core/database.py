@@ -1,20 +1,115 @@
-from sqlalchemy import create_engine  # pyright: ignore[reportMissingImports]
-from sqlalchemy.orm import sessionmaker, declarative_base  # pyright: ignore[reportMissingImports]
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, TypeVar, Union
 
-DATABASE_URL = "sqlite:///./hxkterminal.db"
+from fastapi.concurrency import run_in_threadpool  # pyright: ignore[reportMissingImports]
+from sqlalchemy import create_engine, event  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session, sessionmaker, declarative_base  # pyright: ignore[reportMissingImports]
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hxkterminal.db")
+# sync: 同步引擎，数据库操作在线程池中执行；async: aiosqlite 异步引擎，直接在事件循环上执行
+DB_MODE = os.getenv("DB_MODE", "sync")
+
+# 每个新连接上执行的 PRAGMA，环境变量置空即跳过该项
+SQLITE_PRAGMAS: Dict[str, str] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# 默认与 Starlette 线程池（40）对齐，避免线程等待连接
+POOL_OPTIONS: Dict[str, int] = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "30")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+
+def apply_sqlite_pragmas(target: Engine, pragmas: Dict[str, str]) -> None:
+    """在引擎的 connect 事件上设置 PRAGMA；异步引擎传入其 sync_engine"""
+
+    @event.listens_for(target, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    if not url.startswith("sqlite"):
+        return dict(POOL_OPTIONS)
+    options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+    if ":memory:" not in url:
+        options.update(POOL_OPTIONS)
+    return options
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+if DATABASE_URL.startswith("sqlite"):
+    apply_sqlite_pragmas(engine, SQLITE_PRAGMAS)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # pyright: ignore[reportMissingImports]
+
+    ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(DATABASE_URL))
+    if DATABASE_URL.startswith("sqlite"):
+        apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
+elif DB_MODE != "sync":
+    raise ValueError(f"DB_MODE 只能为 sync 或 async，当前为 {DB_MODE!r}")
+
+# 依赖注入得到的会话类型取决于 DB_MODE
+DbSession = Union[Session, "AsyncSession"]
+
+T = TypeVar("T")
+
+
+async def get_db() -> AsyncIterator[DbSession]:
+    if DB_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            # 直接归还连接；若再排队等待线程池，高并发下连接池会被占满
+            db.close()
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any) -> T:
+    """
+    以 fn(session, *args) 的形式执行同步 ORM 代码
+
+    async 模式下通过 AsyncSession.run_sync 在事件循环上执行，IO 由 aiosqlite 异步完成；
+    sync 模式下放入线程池执行。业务代码因此只需写一份。
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args)
+    return await db.run_sync(fn, *args)
+
+
+def query_plan(db: Session, statement: Any) -> List[str]:
+    """
+    编译业务代码实际构造的语句（Select、DML 或 ORM Query）并返回 EXPLAIN QUERY PLAN 的各行说明
+
+    计划不依赖参数取值，全部以 NULL 代入；IN 列表按构造时的长度展开。
+    """
+    compiled = getattr(statement, "statement", statement).compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+    )
+    params = (None,) * len(compiled.positiontup or ())
+    return [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)]
+
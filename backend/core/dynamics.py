@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import bindparam, func, literal, or_, select, tuple_, update  # pyright: ignore[reportMissingImports]
+from sqlalchemy.dialects.sqlite import insert  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.database import SessionLocal
+from core.fetch import BilibiliClient, configured_uids, fetch_new_dynamics
+from core.pagination import decode_cursor, encode_cursor
+
+# 没有新动态时不会请求动态页，已同步动态的点赞、评论、转发数也就不再变化；
+# 每个 UID 每隔这么多秒跳过更新检查强制请求一次动态页，0 表示每次同步都请求
+STATS_REFRESH_INTERVAL = float(os.getenv("BILIBILI_STATS_REFRESH_INTERVAL", "1800"))
+
+_stats_refreshed_at: Dict[str, float] = {}
+
+# 与 Dynamic.to_dict() 中的统计数键一致
+STAT_KEYS = ("点赞数", "评论数", "转发数")
+
+
+def get_baselines(db: Session, uids: List[str]) -> Dict[str, Optional[str]]:
+    rows = db.query(models.BilibiliSyncState).filter(models.BilibiliSyncState.uid.in_(uids)).all()
+    known = {row.uid: row.baseline for row in rows}
+    return {uid: known.get(uid) for uid in uids}
+
+
+def store_dynamics(
+    db: Session,
+    uid: str,
+    dynamics: List[Dict[str, Any]],
+    baseline: Optional[str],
+    stats: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> int:
+    """
+    写入新动态并推进 baseline，返回新增条数
+
+    新动态插入，已存在的（如上次同步失败后重试）覆盖内容；stats 为 {动态 id: 统计数}，
+    只改写已存储动态 JSON 中的点赞、评论、转发数，不重新解析整条动态。
+    """
+    rows = [
+        {
+            "id": dynamic["动态ID"],
+            "uid": uid,
+            "pub_ts": int(dynamic.get("发布时间") or 0),
+            "data": json.dumps(dynamic, ensure_ascii=False, separators=(",", ":")),
+        }
+        for dynamic in dynamics
+        if dynamic.get("动态ID")
+    ]
+    inserted = 0
+    if rows:
+        dynamic = models.BilibiliDynamic
+        existing = set(db.execute(select(dynamic.id).where(dynamic.id.in_([row["id"] for row in rows]))).scalars())
+        inserted = len({row["id"] for row in rows} - existing)
+        stmt = insert(dynamic)
+        db.connection().execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={"data": stmt.excluded.data, "pub_ts": stmt.excluded.pub_ts},
+                where=dynamic.data != stmt.excluded.data,
+            ),
+            rows,
+        )
+    if stats:
+        dynamic = models.BilibiliDynamic
+        data = dynamic.data
+        changed = []
+        for key in STAT_KEYS:
+            path = f'$."{key}"'
+            data = func.json_set(data, path, bindparam(key))
+            changed.append(func.json_extract(dynamic.data, path).is_distinct_from(bindparam(key)))
+        db.connection().execute(
+            update(dynamic).where(dynamic.id == bindparam("dynamic_id"), or_(*changed)).values(data=data),
+            [{"dynamic_id": dynamic_id, **counts} for dynamic_id, counts in stats.items()],
+        )
+    db.execute(
+        insert(models.BilibiliSyncState)
+        .values(uid=uid, baseline=baseline)
+        .on_conflict_do_update(index_elements=["uid"], set_={"baseline": baseline})
+    )
+    return inserted
+
+
+def list_dynamics(db: Session, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """按 (发布时间, id) 倒序分页浏览历史动态"""
+    rows = _history_query(db, cursor).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].pub_ts, rows[-1].id)
+    return [json.loads(row.data) for row in rows], next_cursor
+
+
+def _history_query(db: Session, cursor: Optional[str]):
+    query = db.query(models.BilibiliDynamic.id, models.BilibiliDynamic.pub_ts, models.BilibiliDynamic.data)
+    if cursor:
+        cursor_pub_ts, cursor_id = decode_cursor(cursor, 2)
+        if not cursor_pub_ts.isdigit():
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        query = query.filter(
+            tuple_(models.BilibiliDynamic.pub_ts, models.BilibiliDynamic.id)
+            < tuple_(literal(int(cursor_pub_ts)), literal(cursor_id))
+        )
+    return query.order_by(models.BilibiliDynamic.pub_ts.desc(), models.BilibiliDynamic.id.desc())
+
+
+def load_stored_dynamics(limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    with SessionLocal() as db:
+        return list_dynamics(db, limit, cursor)
+
+
+def _load_baselines(uids: List[str]) -> Dict[str, Optional[str]]:
+    with SessionLocal() as db:
+        return get_baselines(db, uids)
+
+
+def _store_results(results: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Optional[str]]]) -> int:
+    with SessionLocal() as db:
+        inserted = sum(
+            store_dynamics(db, uid, dynamics, baseline, stats) for uid, (dynamics, stats, baseline) in results.items()
+        )
+        db.commit()
+        return inserted
+
+
+async def sync_dynamics(client: BilibiliClient, uids: Optional[List[str]] = None) -> int:
+    """
+    增量同步所有 UID 的动态到数据库
+
+    每个 UID 记录已同步的最新动态 id，先用更新检查接口判断有无新动态，有时才沿 offset 翻页请求并只解析新动态；
+    距上次请求动态页超过 BILIBILI_STATS_REFRESH_INTERVAL 秒的 UID 跳过检查直接请求，
+    请求到的页上已同步过的动态只刷新统计数。
+
+    Returns:
+        int: 新增的动态条数
+    """
+    uids = uids or configured_uids()
+    if not uids:
+        raise ValueError("未设置 BILIBILI_UIDS 环境变量，请在 .env 文件中设置 BILIBILI_UIDS（或 BILIBILI_UID）")
+    baselines = await asyncio.to_thread(_load_baselines, uids)
+    now = time.monotonic()
+    refresh_uids = {
+        uid for uid in uids
+        if uid not in _stats_refreshed_at or now - _stats_refreshed_at[uid] >= STATS_REFRESH_INTERVAL
+    }
+    results = await fetch_new_dynamics(client, baselines, refresh_uids)
+    for uid in refresh_uids & results.keys():
+        _stats_refreshed_at[uid] = now
+    inserted = await asyncio.to_thread(_store_results, results)
+    logging.info("已增量同步 %d 个账号的 B 站动态，新增 %d 条", len(results), inserted)
+    return inserted
@@ -0,0 +1,385 @@
+"""
+/bilibili/dynamics 的预编码响应缓存
+
+动态每个刷新周期最多变化一次，因此在刷新时一次性编码为 JSON 字节与 gzip 字节，并计算强 ETag；
+请求只读取当前快照的引用，不加锁、不重新编码。
+
+刷新由 FeedCache 统一调度：并发的刷新合并为一次上游请求；缓存过期后先返回旧数据并在后台刷新；
+上游连续失败时熔断一段时间，期间不再请求上游。吞吐量与缓存文件加载耗时的基准见 bench/feed_cache.py。
+"""
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from functools import cached_property
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from fastapi import Request  # pyright: ignore[reportMissingImports]
+from fastapi.responses import Response  # pyright: ignore[reportMissingImports]
+
+CACHE_MAX_AGE = int(os.getenv("BILIBILI_CACHE_MAX_AGE", "60"))
+# 快照超过该秒数视为过期，下次请求时在后台刷新
+STALE_AFTER = float(os.getenv("BILIBILI_STALE_AFTER", os.getenv("BILIBILI_REFRESH_INTERVAL", "600")))
+BREAKER_THRESHOLD = int(os.getenv("BILIBILI_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BILIBILI_BREAKER_COOLDOWN", "60"))
+CACHE_STATE_HEADER = "X-Cache-State"
+
+
+class CorruptSnapshotFile(ValueError):
+    pass
+
+
+class FeedSnapshot:
+    """
+    不可变的动态快照
+
+    body 为紧凑 JSON，etag 与条数随快照保存；解码后的列表与 gzip 在首次使用时生成并缓存。
+    从缓存文件加载的快照连 body 也延迟到首次使用时才读取并校验，启动开销与缓存大小无关。
+    """
+
+    def __init__(
+        self,
+        body: Union[bytes, Callable[[], bytes]],
+        etag: str,
+        count: int,
+        created_at: float,
+        version: int = 0,
+    ):
+        self._body = body
+        self.etag = etag
+        self.count = count
+        self.created_at = created_at
+        # 跨 worker 共享快照的版本号，0 表示仅存在于本进程
+        self.version = version
+
+    @classmethod
+    def build(
+        cls, dynamics: List[Dict[str, Any]], created_at: Optional[float] = None, version: int = 0
+    ) -> "FeedSnapshot":
+        body = json.dumps(dynamics, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        snapshot = cls(body, body_etag(body), len(dynamics), created_at or time.time(), version)
+        snapshot.__dict__["dynamics"] = list(dynamics)
+        # 刷新时就压缩好，不留到请求路径上
+        snapshot.gzip_body
+        return snapshot
+
+    def with_version(self, version: int) -> "FeedSnapshot":
+        snapshot = FeedSnapshot(self._body, self.etag, self.count, self.created_at, version)
+        # 沿用已经生成的各种表示
+        for name in ("body", "valid", "dynamics", "gzip_body"):
+            if name in self.__dict__:
+                snapshot.__dict__[name] = self.__dict__[name]
+        return snapshot
+
+    @cached_property
+    def body(self) -> bytes:
+        return self._body() if callable(self._body) else self._body
+
+    @cached_property
+    def valid(self) -> bool:
+        """body 能否读取且校验通过；从文件延迟加载时首次访问才真正读取"""
+        try:
+            self.body
+        except (CorruptSnapshotFile, OSError) as exc:
+            logging.error("B 站动态缓存文件损坏，已忽略: %s", exc)
+            return False
+        return True
+
+    @cached_property
+    def dynamics(self) -> List[Dict[str, Any]]:
+        return json.loads(self.body)
+
+    @cached_property
+    def gzip_body(self) -> bytes:
+        # mtime=0 保证相同内容压缩结果相同
+        return gzip.compress(self.body, compresslevel=9, mtime=0)
+
+    @property
+    def gzip_etag(self) -> str:
+        # 不同的内容编码须使用不同的强 ETag
+        return self.etag[:-1] + '-gzip"'
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+# 缓存文件格式：定长头部 + 紧凑 JSON。头部依次为魔数、格式版本、保留位、条数、创建时间、
+# body 长度、body 的 SHA-256
+SNAPSHOT_MAGIC = b"HXKF"
+SNAPSHOT_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIdQ32s")
+
+
+def write_snapshot_file(snapshot: FeedSnapshot, path: str) -> None:
+    """写入临时文件并 fsync 后原子替换，崩溃时旧文件保持完整"""
+    body = snapshot.body
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT_VERSION,
+        0,
+        snapshot.count,
+        snapshot.created_at,
+        len(body),
+        hashlib.sha256(body).digest(),
+    )
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    # 目录项也需落盘，rename 才算持久
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_snapshot_file(path: str) -> Optional[FeedSnapshot]:
+    """
+    只读取头部并 mmap 文件，body 在首次使用时再校验 SHA-256
+
+    Returns:
+        Optional[FeedSnapshot]: 文件不存在、头部无效或格式版本不支持时为 None
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as exc:
+        logging.warning("读取 B 站动态缓存文件失败: %s", exc)
+        return None
+    magic, format_version, _, count, created_at, length, digest = _HEADER.unpack_from(mapped)
+    if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION or _HEADER.size + length != size:
+        logging.warning("B 站动态缓存文件格式无效，已忽略: %s", path)
+        mapped.close()
+        return None
+
+    def load_body() -> bytes:
+        try:
+            body = mapped[_HEADER.size:_HEADER.size + length]
+        finally:
+            mapped.close()
+        if hashlib.sha256(body).digest() != digest:
+            raise CorruptSnapshotFile(f"{path} 校验和不匹配")
+        return body
+
+    # ETag 取自头部中的摘要，与 body_etag() 的结果相同
+    return FeedSnapshot(load_body, '"' + digest.hex()[:32] + '"', count, created_at)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().lower()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+def etag_matches(if_none_match: str, snapshot: FeedSnapshot) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return snapshot.etag in tags or snapshot.gzip_etag in tags
+
+
+class CircuitOpen(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"上游已熔断，{retry_after:.0f} 秒后重试")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败 threshold 次后进入 open 状态，cooldown 秒内直接拒绝；冷却结束后为 half_open，
+    放行一次试探请求，成功则恢复 closed，失败则重新计时。
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if self.retry_after() > 0 else "half_open"
+
+    def check(self) -> None:
+        if self.state == "open":
+            raise CircuitOpen(self.retry_after())
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+
+    def record_failure(self, exc: BaseException) -> None:
+        self.failures += 1
+        self.last_error = repr(exc)
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+def _log_background_failure(task: "asyncio.Task[Any]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning("后台刷新 B 站动态失败: %r", task.exception())
+
+
+class FeedCache:
+    """
+    持有当前快照并调度刷新
+
+    replace() 整体替换快照引用，读者无需加锁。loader 为获取最新动态的协程函数，返回动态列表或
+    已构建好的 FeedSnapshot；同一时刻最多只有一个 loader 在执行，其余调用方等待同一结果。
+    """
+
+    def __init__(
+        self,
+        dynamics: Optional[List[Dict[str, Any]]] = None,
+        loader: Optional[Callable[[], Awaitable[Union[List[Dict[str, Any]], FeedSnapshot]]]] = None,
+        created_at: Optional[float] = None,
+        stale_after: float = STALE_AFTER,
+        breaker: Optional[CircuitBreaker] = None,
+        snapshot: Optional[FeedSnapshot] = None,
+    ):
+        self.snapshot = snapshot or FeedSnapshot.build(dynamics or [], created_at)
+        self.loader = loader
+        self.stale_after = stale_after
+        self.breaker = breaker or CircuitBreaker()
+        self._inflight: Optional["asyncio.Task[FeedSnapshot]"] = None
+
+    def __bool__(self) -> bool:
+        return self.snapshot.count > 0
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.snapshot.created_at)
+
+    def state(self) -> str:
+        if not self:
+            return "empty"
+        return "stale" if self.age() > self.stale_after else "fresh"
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state(),
+            "age": round(self.age(), 1),
+            "items": self.snapshot.count,
+            "etag": self.snapshot.etag,
+            "version": self.snapshot.version,
+            "refreshing": self._running() is not None,
+            "breaker": self.breaker.state,
+            "failures": self.breaker.failures,
+            "retry_after": round(self.breaker.retry_after(), 1),
+            "last_error": self.breaker.last_error,
+        }
+
+    def replace(self, dynamics: List[Dict[str, Any]]) -> FeedSnapshot:
+        return self.set_snapshot(FeedSnapshot.build(dynamics))
+
+    def set_snapshot(self, snapshot: FeedSnapshot) -> FeedSnapshot:
+        self.snapshot = snapshot
+        return snapshot
+
+    def _running(self) -> Optional["asyncio.Task[FeedSnapshot]"]:
+        task = self._inflight
+        # 任务属于已关闭的事件循环时（如测试中）视为不存在
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _start_refresh(self) -> "asyncio.Task[FeedSnapshot]":
+        task = self._running()
+        if task is None:
+            self.breaker.check()
+            task = self._inflight = asyncio.get_running_loop().create_task(self._refresh())
+        return task
+
+    async def _refresh(self) -> FeedSnapshot:
+        if self.loader is None:
+            raise RuntimeError("FeedCache 未设置 loader")
+        try:
+            result = await self.loader()
+        except Exception as exc:
+            self.breaker.record_failure(exc)
+            raise
+        self.breaker.record_success()
+        if isinstance(result, FeedSnapshot):
+            return self.set_snapshot(result)
+        return self.replace(result)
+
+    async def refresh(self) -> FeedSnapshot:
+        """
+        刷新快照；已有刷新在进行时等待它的结果而不是再请求一次上游
+
+        Raises:
+            CircuitOpen: 熔断期间
+        """
+        # shield: 单个调用方被取消不影响其他等待者
+        return await asyncio.shield(self._start_refresh())
+
+    async def get(self) -> FeedSnapshot:
+        """有数据时立即返回（过期则在后台刷新），没有数据时等待刷新"""
+        if not self.snapshot.valid:
+            self.replace([])
+        if not self:
+            return await self.refresh()
+        if self.state() == "stale" and self._running() is None and self.breaker.state != "open":
+            self._start_refresh().add_done_callback(_log_background_failure)
+        return self.snapshot
+
+    async def respond(self, request: Request) -> Response:
+        snapshot = await self.get()
+        use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": snapshot.gzip_etag if use_gzip else snapshot.etag,
+            "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+            CACHE_STATE_HEADER: self.state(),
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, snapshot):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(snapshot.gzip_body, media_type="application/json", headers=headers)
+        return Response(snapshot.body, media_type="application/json", headers=headers)
+
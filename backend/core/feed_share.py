@@ -0,0 +1,111 @@
+"""
+多 worker 共享的 B 站动态
+
+uvicorn --workers N 时每个 worker 是独立进程。通过本地文件锁选出一个轮询 worker：只有它请求上游、
+写缓存文件，并把结果连同递增的版本号写入数据库；其余 worker 定期读取版本号，变化时重新加载。
+"""
+import json
+import logging
+import os
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import select  # pyright: ignore[reportMissingImports]
+from sqlalchemy.dialects.sqlite import insert  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.database import engine as default_engine
+from core.feed_cache import FeedSnapshot
+from core.fetch import CACHE_FILE
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 没有 fcntl，按单进程处理
+    fcntl = None
+
+LEADER_LOCK_FILE = os.getenv(
+    "BILIBILI_LEADER_LOCK", os.path.join(os.path.dirname(CACHE_FILE), "bilibili-poller.lock")
+)
+# 非轮询 worker 检查共享快照版本的间隔（秒）
+SHARED_POLL_INTERVAL = float(os.getenv("BILIBILI_SHARED_POLL_INTERVAL", "2"))
+
+_SNAPSHOT_ID = 1
+
+
+class LeaderLock:
+    """
+    非阻塞的独占文件锁，持有者即为轮询 worker
+
+    锁随进程退出由操作系统释放，其他 worker 下次调用 try_acquire() 时接任。
+    """
+
+    def __init__(self, path: str = LEADER_LOCK_FILE):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # 记录持有者 pid，便于排查
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logging.info("worker %d 成为 B 站动态轮询 worker", os.getpid())
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None and self._fd >= 0 and fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+
+def publish_snapshot(snapshot: FeedSnapshot, engine: Engine = default_engine) -> FeedSnapshot:
+    """写入共享快照并递增版本号，返回带新版本号的快照"""
+    table = models.BilibiliFeedSnapshot.__table__
+    updated_at = int(snapshot.created_at)
+    data = snapshot.body.decode("utf-8")
+    with engine.begin() as conn:
+        conn.execute(
+            insert(table)
+            .values(id=_SNAPSHOT_ID, version=1, data=data, updated_at=updated_at)
+            .on_conflict_do_update(
+                index_elements=["id"],
+                set_={"version": table.c.version + 1, "data": data, "updated_at": updated_at},
+            )
+        )
+        version = conn.execute(select(table.c.version).where(table.c.id == _SNAPSHOT_ID)).scalar_one()
+    return snapshot.with_version(version)
+
+
+def shared_snapshot_stamp(engine: Engine = default_engine) -> Tuple[int, int]:
+    """返回共享快照的 (版本号, 更新时间)，尚未发布时为 (0, 0)"""
+    table = models.BilibiliFeedSnapshot.__table__
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(table.c.version, table.c.updated_at).where(table.c.id == _SNAPSHOT_ID)
+        ).first()
+    return (row.version, row.updated_at) if row else (0, 0)
+
+
+def load_shared_snapshot(engine: Engine = default_engine) -> Optional[FeedSnapshot]:
+    table = models.BilibiliFeedSnapshot.__table__
+    with engine.connect() as conn:
+        row = conn.execute(select(table).where(table.c.id == _SNAPSHOT_ID)).first()
+    if row is None:
+        return None
+    return FeedSnapshot.build(json.loads(row.data), row.updated_at or time.time(), row.version)
@@ -1,21 +1,102 @@
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, List  # pyright: ignore[reportMissingImports]
+import random
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Tuple  # pyright: ignore[reportMissingImports]
 
-import requests  # pyright: ignore[reportMissingModuleSource]
+import httpx  # pyright: ignore[reportMissingImports]
 from dotenv import load_dotenv  # pyright: ignore[reportMissingImports]
 
-CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bilibili-dynamics.json")
+from core.feed_cache import FeedSnapshot, read_snapshot_file, write_snapshot_file
+from core.parser import parse_dynamics, parse_stats
 
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bilibili-dynamics.feed")
+# 旧版缓存（indent=2 的 JSON 列表），新格式文件不存在时读取一次
+LEGACY_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bilibili-dynamics.json")
 
-def fetch_bilibili_dynamics() -> List[Dict[str, Any]]:
+API_BASE_URL = os.getenv("BILIBILI_API_BASE", "https://api.bilibili.com")
+FEED_PATH = "/x/polymer/web-dynamic/v1/feed/all"
+UPDATE_PATH = "/x/polymer/web-dynamic/v1/feed/all/update"
+CONNECT_TIMEOUT = float(os.getenv("BILIBILI_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("BILIBILI_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("BILIBILI_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("BILIBILI_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("BILIBILI_BACKOFF_MAX", "8"))
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+FEED_SIZE = int(os.getenv("BILIBILI_FEED_SIZE", "5"))
+FETCH_CONCURRENCY = int(os.getenv("BILIBILI_FETCH_CONCURRENCY", "4"))
+UID_TIMEOUT = float(os.getenv("BILIBILI_UID_TIMEOUT", "15"))
+# 增量同步时单个 UID 最多翻的页数，积压超过这么多页时更早的新动态不再补齐
+MAX_PAGES = int(os.getenv("BILIBILI_MAX_PAGES", "10"))
+
+
+class BilibiliClient:
     """
-    获取 Bilibili 动态列表
-    
-    Returns:
-        List[Dict[str, Any]]: 动态列表，格式与 bilibili-dynamics.json 相同
+    复用连接的 Bilibili API 客户端
+
+    基于 httpx.AsyncClient，开启 HTTP/2 与 keep-alive，连接/读取均有超时；
+    网络错误、超时及 429/5xx 按带抖动的指数退避重试。base_url 可指向本地桩服务器。
     """
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=True,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max(10, FETCH_CONCURRENCY),
+                max_keepalive_connections=max(5, FETCH_CONCURRENCY),
+                keepalive_expiry=120,
+            ),
+            transport=transport,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter：在 [0, min(上限, base * 2^attempt)] 内均匀取值
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def get_json(self, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                response = await self._client.get(path, params=params, headers=headers)
+            except httpx.TransportError as exc:
+                if last_attempt:
+                    raise Exception(f"请求失败: {exc!r}") from exc
+                logging.warning("请求 B 站接口失败，第 %d 次重试: %r", attempt + 1, exc)
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if last_attempt or response.status_code not in RETRY_STATUS_CODES:
+                    raise Exception(f"请求失败: {response.status_code}")
+                logging.warning("B 站接口返回 %d，第 %d 次重试", response.status_code, attempt + 1)
+            await asyncio.sleep(self._backoff(attempt))
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def configured_uids() -> List[str]:
+    """BILIBILI_UIDS 为逗号分隔的多个 UID，未设置时回退到 BILIBILI_UID"""
+    raw = os.getenv("BILIBILI_UIDS", "") or os.getenv("BILIBILI_UID", "")
+    return list(dict.fromkeys(uid.strip() for uid in raw.split(",") if uid.strip()))
+
+
+def request_headers() -> Dict[str, str]:
     # 加载环境变量
     load_dotenv()
 
@@ -26,20 +107,32 @@ def fetch_bilibili_dynamics() -> List[Dict[str, Any]]:
     if not bilibili_cookie:
         raise ValueError("未设置 BILIBILI_COOKIE 环境变量，请在 .env 文件中设置 BILIBILI_COOKIE")
     
-    headers = {
+    return {
         "Cookie": bilibili_cookie,
         "User-Agent": bilibili_user_agent,
         "Referer": bilibili_referer,
     }
-    
-    # UP主UID
-    uid = os.getenv("BILIBILI_UID", "")
-    if not uid:
-        raise ValueError("未设置 BILIBILI_UID 环境变量，请在 .env 文件中设置 BILIBILI_UID")
-    
-    # API URL
-    api_url = "https://api.bilibili.com/x/polymer/web-dynamic/v1/feed/all"
-    
+
+
+async def fetch_uid_dynamics(
+    client: BilibiliClient,
+    uid: str,
+    headers: Dict[str, str],
+    baseline: Optional[str] = None,
+    limit: Optional[int] = None,
+    check_update: bool = True,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Optional[str]]:
+    """
+    获取单个 UID 的动态
+
+    没有 baseline 时只请求第一页。给定 baseline 时只解析比它新的动态：check_update 为真则先调用轻量的
+    更新检查接口，没有新动态就不再请求动态页；否则沿 offset 翻页，直到某页的最后一条不比 baseline 新，
+    最多 BILIBILI_MAX_PAGES 页。已请求到的页中已同步过的动态不做完整解析，只取其点赞、评论、转发数。
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Optional[str]]:
+            新动态、{动态 id: 统计数}（已同步过的动态），以及新的 baseline
+    """
     # 请求参数
     params = {
         "host_mid": uid,
@@ -47,362 +140,173 @@ def fetch_bilibili_dynamics() -> List[Dict[str, Any]]:
         "platform": "web",
         "web_location": "333.1365"
     }
-    
-    # 发送请求
-    response = requests.get(api_url, headers=headers, params=params)
-    
-    if response.status_code != 200:
-        raise Exception(f"请求失败: {response.status_code}")
-    
-    data = response.json()
-    
-    # 检查响应码
-    if data.get("code") != 0:
-        raise Exception(f"API返回错误: {data.get('message', '未知错误')}")
-    
-    # 提取动态列表
-    items = data.get("data", {}).get("items", [])
-
-    dynamics = []
-
-    for idx, item in enumerate(items[:5]):
-        modules = item.get("modules", {}) or {}
-        module_author = modules.get("module_author", {}) or {}
-        module_dynamic = modules.get("module_dynamic", {}) or {}
-        module_stat = modules.get("module_stat", {}) or {}
-        
-        # 确保module_dynamic和module_stat是字典
-        if not isinstance(module_dynamic, dict):
-            module_dynamic = {}
-        if not isinstance(module_stat, dict):
-            module_stat = {}
-        
-        # 检查是否是转发动态
-        orig = item.get("orig")
-        item_type = item.get("type", "")
-        # 处理item_type可能是字符串或数字的情况
-        if isinstance(item_type, (int, float)):
-            item_type = str(item_type)
-        
-        # 确保orig如果是字典才使用
-        if orig is None:
-            orig = {}
-        elif not isinstance(orig, dict):
-            orig = {}
-        
-        module_desc = module_dynamic.get("desc") or {}
-        
-        if orig:
-            # 如果是转发动态,从orig中获取major信息（封面、标题等）
-            orig_modules = orig.get("modules", {}) or {}
-            orig_module_dynamic = orig_modules.get("module_dynamic", {}) or {}
-            major = orig_module_dynamic.get("major", {}) or {}
-            # 但desc仍然使用当前动态的module_dynamic.desc
-            desc_source = module_desc
-        else:
-            # 普通动态
-            major = module_dynamic.get("major", {}) or {}
-            desc_source = module_desc
-        
-        # 确保desc_source始终是字典
-        if desc_source is None:
-            desc_source = {}
-        if not isinstance(desc_source, dict):
-            desc_source = {}
-        
-        # 确保major始终是字典
-        if major is None:
-            major = {}
-        if not isinstance(major, dict):
-            major = {}
-        
-        major_type = major.get("type", "")
-
-        need_debug = False
-        
-        # 提取封面
-        cover = ""
-        opus_data = {}
-        draw_data = {}
-        
-        if major_type == "MAJOR_TYPE_ARCHIVE":  # 视频
-            cover = major.get("archive", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_DRAW":  # 带图动态
-            draw_data = major.get("draw", {}) or {}
-            draw_items = draw_data.get("items", [])
-            if draw_items:
-                first_item = draw_items[0]
-                if isinstance(first_item, dict):
-                    cover = first_item.get("src", "") or first_item.get("url", "") or first_item.get("src_small", "")
-                elif isinstance(first_item, str):
-                    cover = first_item
-        elif major_type == "MAJOR_TYPE_OPUS":  # 图文动态
-            opus_data = major.get("opus", {})
-            opus_pics = opus_data.get("pics", [])
-            if opus_pics:
-                # 图片可能是对象或字符串
-                first_pic = opus_pics[0]
-                if isinstance(first_pic, dict):
-                    # 尝试多种可能的字段名
-                    cover = first_pic.get("url", "") or first_pic.get("src", "") or first_pic.get("src_small", "")
-                elif isinstance(first_pic, str):
-                    cover = first_pic
-        elif major_type == "MAJOR_TYPE_ARTICLE":  # 专栏
-            covers = major.get("article", {}).get("covers", [])
-            if covers:
-                cover = covers[0] if isinstance(covers[0], str) else covers[0].get("url", "")
-        elif major_type == "MAJOR_TYPE_PGC":  # 剧集
-            cover = major.get("pgc", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_LIVE":  # 直播
-            cover = major.get("live", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_MUSIC":  # 音频
-            cover = major.get("music", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_COURSES":  # 课程
-            cover = major.get("courses", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_UGC_SEASON":  # 合集
-            cover = major.get("ugc_season", {}).get("cover", "")
-        elif major_type == "MAJOR_TYPE_COMMON":  # 一般类型
-            cover = major.get("common", {}).get("cover", "")
-        else:
-            # 如果major_type为空或未知，尝试检查是否有opus字段
-            if "opus" in major:
-                opus_data = major.get("opus", {})
-                opus_pics = opus_data.get("pics", [])
-                if opus_pics:
-                    first_pic = opus_pics[0]
-                    if isinstance(first_pic, dict):
-                        cover = first_pic.get("url", "") or first_pic.get("src", "") or first_pic.get("src_small", "")
-                    elif isinstance(first_pic, str):
-                        cover = first_pic
-
-        is_word_type = item_type == "17" or item_type == 17 or "WORD" in str(item_type).upper()
-        is_draw_type = (item_type == "11" or item_type == 11 or 
-                        major_type == "MAJOR_TYPE_DRAW" or 
-                        "DRAW" in str(item_type).upper() or
-                        "draw" in major)
-        
-        # 如果识别为带图动态但还没有封面，尝试从major中提取
-        if is_draw_type and not cover:
-            if not draw_data:
-                draw_data = major.get("draw", {}) or {}
-            if draw_data:
-                draw_items = draw_data.get("items", [])
-                if draw_items:
-                    first_item = draw_items[0]
-                    if isinstance(first_item, dict):
-                        cover = first_item.get("src", "") or first_item.get("url", "") or first_item.get("src_small", "")
-                    elif isinstance(first_item, str):
-                        cover = first_item
-
-        cover_is_opus = "new_dyn" in cover if cover else False
-        has_opus_field = "opus" in major or bool(opus_data)
-        item_type_is_opus = "OPUS" in str(item_type).upper() if item_type else False
-        
-        is_opus = (major_type == "MAJOR_TYPE_OPUS" or has_opus_field or cover_is_opus or item_type_is_opus)
-
-        if cover_is_opus:
-            is_opus = True
-            # 如果还没有opus_data,尝试从major中查找
-            if not opus_data:
-                # 检查major中是否有opus字段
-                if "opus" in major:
-                    opus_data = major.get("opus", {})
-                else:
-                    # 尝试查找所有可能包含opus的字段
-                    for key in major.keys():
-                        if "opus" in key.lower():
-                            opus_data = major.get(key, {})
-                            break
-                    # 如果还是没有,检查整个major的结构
-                    if not opus_data:
-                        # 可能opus字段名不同,尝试直接访问可能的字段
-                        possible_keys = ["opus", "dynamic_opus", "card_opus"]
-                        for key in possible_keys:
-                            if key in major:
-                                opus_data = major.get(key, {})
-                                break
-        
-        # 提取文字内容的辅助函数
-        def extract_text_from_desc(desc_obj):
-            """从desc对象中提取文字内容"""
-            if not desc_obj or not isinstance(desc_obj, dict):
-                return ""
-            
-            # 优先使用text字段
-            text = desc_obj.get("text", "") or ""
-            if text:
-                return text
-            
-            # 如果没有text，从rich_text_nodes提取
-            rich_text_nodes = desc_obj.get("rich_text_nodes")
-            if rich_text_nodes and isinstance(rich_text_nodes, list):
-                text_parts = []
-                for node in rich_text_nodes:
-                    if isinstance(node, dict):
-                        # 优先使用text，如果没有则使用orig_text
-                        node_text = node.get("text", "") or node.get("orig_text", "")
-                        if node_text:
-                            text_parts.append(node_text)
-                    elif isinstance(node, str):
-                        text_parts.append(node)
-                if text_parts:
-                    return "".join(text_parts)
-            
-            return ""
-        
-        # 提取文字内容 (图文动态、纯文字动态、带图动态)
-        text_content = ""
-        
-        # 对于所有动态类型，优先从 module_dynamic.desc 获取文字内容
-        # 这是最可靠的方式，因为desc是动态文字内容的直接来源
-        text_content = extract_text_from_desc(module_desc)
-        
-        # 处理纯文字动态 (DYNAMIC_TYPE_WORD)
-        if is_word_type:
-            # 纯文字动态: 如果还没有获取到，尝试从desc_source获取（可能是转发动态的情况）
-            if not text_content:
-                text_content = extract_text_from_desc(desc_source)
-        
-        # 处理图文动态 (MAJOR_TYPE_OPUS)
-        elif is_opus:
-            # 图文动态: 优先使用 module_dynamic.desc（已经在上面获取）
-            # 如果没有，再尝试从 major.opus.summary.text 获取
-            if not text_content and opus_data:
-                opus_summary = opus_data.get("summary", {})
-                if isinstance(opus_summary, dict):
-                    text_content = extract_text_from_desc(opus_summary)
-                elif isinstance(opus_summary, str):
-                    text_content = opus_summary
-            
-            # 如果还是没有，尝试从desc_source获取（转发动态的情况）
-            if not text_content:
-                text_content = extract_text_from_desc(desc_source)
-        
-        # 处理带图动态 (DYNAMIC_TYPE_DRAW) - 可能也有文字描述
-        elif is_draw_type:
-            if not text_content:
-                text_content = extract_text_from_desc(desc_source)
-
-        # 提取标题 (图文动态和纯文字动态不存储标题)
-        title = ""
-        if not is_opus and not is_word_type:
-            if major_type == "MAJOR_TYPE_ARCHIVE":  # 视频
-                title = major.get("archive", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_ARTICLE":  # 专栏
-                title = major.get("article", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_PGC":  # 剧集
-                title = major.get("pgc", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_LIVE":  # 直播
-                title = major.get("live", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_MUSIC":  # 音频
-                title = major.get("music", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_COURSES":  # 课程
-                title = major.get("courses", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_UGC_SEASON":  # 合集
-                title = major.get("ugc_season", {}).get("title", "")
-            elif major_type == "MAJOR_TYPE_COMMON":  # 一般类型
-                title = major.get("common", {}).get("title", "")
-        
-        # 提取播放量和弹幕数 (图文动态和纯文字动态不存储,仅视频类型有)
-        play_count = ""
-        danmaku_count = ""
-        if not is_opus and not is_word_type:
-            if major_type == "MAJOR_TYPE_ARCHIVE":  # 视频
-                stat = major.get("archive", {}).get("stat", {})
-                play_count = stat.get("play", "")
-                danmaku_count = stat.get("danmaku", "")
-            elif major_type == "MAJOR_TYPE_PGC":  # 剧集
-                stat = major.get("pgc", {}).get("stat", {})
-                play_count = stat.get("play", "")
-                danmaku_count = stat.get("danmaku", "")
-            elif major_type == "MAJOR_TYPE_UGC_SEASON":  # 合集
-                stat = major.get("ugc_season", {}).get("stat", {})
-                play_count = stat.get("play", "")
-                danmaku_count = stat.get("danmaku", "")
-        
-        # 提取点赞数、评论数、转发数 (使用当前动态的统计数据,不是原动态的)
-        like_count = module_stat.get("like", {}).get("count", 0)
-        comment_count = module_stat.get("comment", {}).get("count", 0)
-        forward_count = module_stat.get("forward", {}).get("count", 0)
-        
-        # 提取发布时间 (使用时间戳，便于前端格式化)
-        publish_time = module_author.get("pub_ts", 0)  # UNIX 秒级时间戳
-        
-        # 构建动态信息
-        if is_word_type:
-            # 纯文字动态: 只保留文字、点赞数、评论数、转发数（无封面）
-            dynamic_info = {
-                "文字": text_content,
-                "点赞数": like_count,
-                "评论数": comment_count,
-                "转发数": forward_count,
-                "发布时间": publish_time
-            }
-        elif is_opus:
-            # 图文动态: 只保留封面、文字、点赞数、评论数、转发数
-            dynamic_info = {
-                "封面": cover,
-                "点赞数": like_count,
-                "评论数": comment_count,
-                "转发数": forward_count,
-                "发布时间": publish_time
-            }
-        elif is_draw_type:
-            # 带图动态: 保留封面、文字（如果有）、点赞数、评论数、转发数
-            dynamic_info = {
-                "封面": cover,
-                "点赞数": like_count,
-                "评论数": comment_count,
-                "转发数": forward_count,
-                "发布时间": publish_time
-            }
-            # 如果有文字内容，也添加
-            if text_content:
-                dynamic_info["文字"] = text_content
+    if baseline and check_update:
+        update = await client.get_json(UPDATE_PATH, params={**params, "update_baseline": baseline}, headers=headers)
+        if update.get("code") == 0 and not (update.get("data") or {}).get("update_num"):
+            return [], {}, baseline
+
+    known = int(baseline) if baseline and baseline.isdigit() else None
+    fresh: List[Dict[str, Any]] = []
+    stats: Dict[str, Dict[str, Any]] = {}
+    offset = ""
+    for _ in range(MAX_PAGES):
+        page_params = {**params, "offset": offset} if offset else params
+        data = await client.get_json(FEED_PATH, params=page_params, headers=headers)
+
+        # 检查响应码
+        if data.get("code") != 0:
+            raise Exception(f"API返回错误: {data.get('message', '未知错误')}")
+
+        body = data.get("data") or {}
+        items = body.get("items") or []
+        # 置顶动态可能排在前面，因此逐条比较，而不是遇到第一条旧动态就停止
+        for item in items:
+            item_id = str(item.get("id_str") or "")
+            if known is not None and item_id.isdigit() and int(item_id) <= known:
+                stats[item_id] = parse_stats(item)
+            else:
+                fresh.append(item)
+        last_id = str(items[-1].get("id_str") or "") if items else ""
+        offset = str(body.get("offset") or "")
+        if (
+            known is None
+            or (limit is not None and len(fresh) >= limit)
+            or (last_id.isdigit() and int(last_id) <= known)
+            or not body.get("has_more")
+            or not offset
+        ):
+            break
+    else:
+        logging.warning("UID %s 的新动态超过 %d 页，更早的新动态未同步", uid, MAX_PAGES)
+
+    if limit is not None:
+        fresh = fresh[:limit]
+    # 动态 id 单调递增；置顶动态可能排在前面，因此取最大值而不是第一条
+    ids = [str(item.get("id_str")) for item in fresh if str(item.get("id_str") or "").isdigit()]
+    new_baseline = max(ids + ([baseline] if baseline else []), key=int, default=baseline)
+    return [dynamic.to_dict() for dynamic in parse_dynamics(fresh)], stats, new_baseline
+
+
+async def fan_out(uids: List[str], fetch_one: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+    """
+    并发执行 fetch_one(uid)，同时进行的数量受 BILIBILI_FETCH_CONCURRENCY 限制
+
+    单个 UID 失败或超过 BILIBILI_UID_TIMEOUT 只记录日志，全部失败时才抛出异常。
+    """
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def limited(uid: str) -> Any:
+        async with semaphore:
+            return await asyncio.wait_for(fetch_one(uid), UID_TIMEOUT)
+
+    results = await asyncio.gather(*(limited(uid) for uid in uids), return_exceptions=True)
+    succeeded = {}
+    errors = []
+    for uid, result in zip(uids, results):
+        if isinstance(result, BaseException):
+            logging.warning("获取 UID %s 的动态失败: %r", uid, result)
+            errors.append(result)
         else:
-            # 其他动态: 保留所有字段（视频等）
-            dynamic_info = {
-                "封面": cover,
-                "标题": title,
-                "播放量": play_count,
-                "弹幕数": danmaku_count,
-                "点赞数": like_count,
-                "评论数": comment_count,
-                "转发数": forward_count,
-                "发布时间": publish_time
-            }
-        
-        dynamics.append(dynamic_info)
+            succeeded[uid] = result
+    if uids and len(errors) == len(uids):
+        raise errors[0]
+    return succeeded
+
+
+async def fetch_bilibili_dynamics(
+    client: Optional[BilibiliClient] = None, uids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    获取 Bilibili 动态列表
+
+    并发抓取多个 UID，按动态 ID 去重后按发布时间倒序合并为 BILIBILI_FEED_SIZE 条。
+
+    Args:
+        client: 复用的客户端；为空时临时创建并在结束后关闭
+        uids: 要抓取的 UID，为空时读取环境变量
+
+    Returns:
+        List[Dict[str, Any]]: 动态列表，格式与 bilibili-dynamics.json 相同
+    """
+    headers = request_headers()
     
-    return dynamics
+    # UP主UID
+    uids = uids or configured_uids()
+    if not uids:
+        raise ValueError("未设置 BILIBILI_UIDS 环境变量，请在 .env 文件中设置 BILIBILI_UIDS（或 BILIBILI_UID）")
+    
+    owns_client = client is None
+    if client is None:
+        client = BilibiliClient()
+    try:
+        results = await fan_out(uids, lambda uid: fetch_uid_dynamics(client, uid, headers, limit=FEED_SIZE))
+    finally:
+        if owns_client:
+            await client.aclose()
 
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for dynamics, _, _ in results.values():
+        for dynamic in dynamics:
+            merged.setdefault(dynamic.get("动态ID") or id(dynamic), dynamic)
 
-def load_cached_dynamics() -> List[Dict[str, Any]]:
-    if not os.path.exists(CACHE_FILE):
-        return []
+    dynamics = sorted(merged.values(), key=lambda dynamic: dynamic.get("发布时间") or 0, reverse=True)
+    return dynamics[:FEED_SIZE]
+
+
+async def fetch_new_dynamics(
+    client: BilibiliClient, baselines: Dict[str, Optional[str]], refresh_uids: Collection[str] = ()
+) -> Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Optional[str]]]:
+    """
+    增量抓取：baselines 为 {uid: 已同步的最新动态 id}，返回 {uid: (新动态, 已同步动态的统计数, 新 baseline)}
+
+    refresh_uids 中的 UID 跳过更新检查，直接请求动态页以刷新第一页上已同步动态的统计数。
+    失败的 UID 不出现在结果中，下次同步时从原 baseline 继续。
+    """
+    headers = request_headers()
+    return await fan_out(
+        list(baselines),
+        lambda uid: fetch_uid_dynamics(
+            client, uid, headers, baseline=baselines[uid], check_update=uid not in refresh_uids
+        ),
+    )
+
+
+def load_cached_snapshot() -> Optional[FeedSnapshot]:
+    """只读取缓存文件头部，动态内容在首次使用时才读取"""
+    snapshot = read_snapshot_file(CACHE_FILE)
+    if snapshot is not None or not os.path.exists(LEGACY_CACHE_FILE):
+        return snapshot
     try:
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+        with open(LEGACY_CACHE_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
-            if isinstance(data, list):
-                return data
+        if isinstance(data, list):
+            return FeedSnapshot.build(data, os.path.getmtime(LEGACY_CACHE_FILE))
     except Exception as exc:  # pragma: no cover
         logging.warning("读取 B 站动态缓存失败: %s", exc)
-    return []
+    return None
 
 
-def save_cached_dynamics(dynamics: List[Dict[str, Any]]) -> None:
+def load_cached_dynamics() -> List[Dict[str, Any]]:
+    snapshot = load_cached_snapshot()
+    return snapshot.dynamics if snapshot is not None and snapshot.valid else []
+
+
+def save_cached_snapshot(snapshot: FeedSnapshot) -> None:
     try:
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(dynamics, f, ensure_ascii=False, indent=2)
+        write_snapshot_file(snapshot, CACHE_FILE)
     except Exception as exc:  # pragma: no cover
         logging.error("写入 B 站动态缓存失败: %s", exc)
 
 
+def save_cached_dynamics(dynamics: List[Dict[str, Any]]) -> None:
+    save_cached_snapshot(FeedSnapshot.build(dynamics))
+
+
 if __name__ == "__main__":
     try:
-        dynamics = fetch_bilibili_dynamics()
+        dynamics = asyncio.run(fetch_bilibili_dynamics())
         save_cached_dynamics(dynamics)
         print(f"成功获取 {len(dynamics)} 条动态，已保存到 {CACHE_FILE}")
     except Exception as e:  # pragma: no cover
         print(f"错误: {e}")
-        exit(1)
\ No newline at end of file
+        exit(1)
@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from passlib.context import CryptContext  # pyright: ignore[reportMissingImports, reportMissingModuleSource]
+
+# 排在首位的方案为当前参数，其余方案的哈希在登录时自动升级
+pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", str(max(1, PASSWORD_HASH_WORKERS) * 8)))
+
+
+class PasswordPoolSaturated(Exception):
+    """哈希任务排队数已达上限，调用方应快速返回 503"""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasherPool:
+    """
+    在独立进程池中执行密码哈希，不占用事件循环与 Starlette 的共享线程池
+
+    workers 为 0 时退化为事件循环默认线程池（用于无法创建子进程的环境）。
+    排队与执行中的任务总数超过 queue_limit 时立即抛出 PasswordPoolSaturated。
+
+    应用在启动时调用 start() 创建进程池。子进程由 forkserver（不支持时为 spawn）启动：服务进程里已有 anyio 线程池等线程，
+    直接 fork 会让子进程继承其他线程持有的锁而可能死锁。
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+            )
+
+    def _get_executor(self) -> Optional[Executor]:
+        # 未经 start() 时（如基准脚本与测试）在首次使用时创建
+        self.start()
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # 仅在事件循环线程中修改计数，无需加锁
+        if self.pending >= self.queue_limit:
+            raise PasswordPoolSaturated()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(_verify, password, hashed)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """校验密码；若哈希使用的是旧方案或旧参数，同时返回按当前参数生成的新哈希"""
+        return await self._submit(_verify_and_update, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool()
+
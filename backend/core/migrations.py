@@ -0,0 +1,294 @@
+import argparse
+import logging
+import sys
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func, inspect, text  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Connection, Engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.database import engine as default_engine, query_plan
+from core.pagination import encode_cursor
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows 没有 fcntl，按单进程处理
+    fcntl = None
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def _add_hot_path_indexes(conn: Connection) -> None:
+    # 唯一索引前先清理重复接取，只保留最早的一条
+    conn.execute(text(
+        "DELETE FROM task_acceptances WHERE id NOT IN ("
+        "SELECT MIN(id) FROM task_acceptances GROUP BY task_id, user_id)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_status_created_at ON tasks (status, created_at)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_task_acceptances_task_user "
+        "ON task_acceptances (task_id, user_id)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_task_acceptances_user_task ON task_acceptances (user_id, task_id)"
+    ))
+
+
+def _create_dynamics_store(conn: Connection) -> None:
+    models.BilibiliDynamic.__table__.create(bind=conn, checkfirst=True)
+    models.BilibiliSyncState.__table__.create(bind=conn, checkfirst=True)
+
+
+def _create_feed_snapshot(conn: Connection) -> None:
+    models.BilibiliFeedSnapshot.__table__.create(bind=conn, checkfirst=True)
+
+
+def _create_task_tags(conn: Connection) -> None:
+    from core.tasks import normalize_tags
+
+    models.Tag.__table__.create(bind=conn, checkfirst=True)
+    models.TaskTag.__table__.create(bind=conn, checkfirst=True)
+    # 把逗号拼接的 tasks.tags 拆入关联表，顺带规范化原字段
+    rows = conn.execute(text("SELECT id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''")).all()
+    task_tags = {task_id: normalize_tags(tags.split(",")) for task_id, tags in rows}
+    names = sorted({name for tags in task_tags.values() for name in tags})
+    if names:
+        conn.execute(text("INSERT OR IGNORE INTO tags (name) VALUES (:name)"), [{"name": name} for name in names])
+    tag_ids = dict(conn.execute(text("SELECT name, id FROM tags")).all())
+    links = [
+        {"task_id": task_id, "tag_id": tag_ids[name]} for task_id, tags in task_tags.items() for name in tags
+    ]
+    if links:
+        conn.execute(text("INSERT OR IGNORE INTO task_tags (task_id, tag_id) VALUES (:task_id, :tag_id)"), links)
+    if task_tags:
+        conn.execute(
+            text("UPDATE tasks SET tags = :tags WHERE id = :id"),
+            [{"id": task_id, "tags": ",".join(tags) or None} for task_id, tags in task_tags.items()],
+        )
+
+
+def _create_task_search(conn: Connection) -> None:
+    for statement in models.TASK_SEARCH_DDL:
+        conn.execute(text(statement))
+    conn.execute(text("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')"))
+
+
+def _add_task_list_sort_indexes(conn: Connection) -> None:
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_status_priority ON tasks (status, priority)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_status_deadline ON tasks (status, deadline)"))
+
+
+def _add_task_deadline_day_index(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_deadline_day ON tasks (date(deadline), priority DESC, deadline, status)"
+    ))
+
+
+def _add_task_revisions(conn: Connection) -> None:
+    if "revision" not in {column["name"] for column in inspect(conn).get_columns("tasks")}:
+        conn.execute(text("ALTER TABLE tasks ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+        # 已有任务各占一个版本号，首次增量同步（since=0）会取到全部任务
+        conn.execute(text("UPDATE tasks SET revision = id"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_revision ON tasks (revision)"))
+    models.TaskTombstone.__table__.create(bind=conn, checkfirst=True)
+    models.SyncRevision.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT OR IGNORE INTO sync_revision (id, value) SELECT 1, coalesce(max(revision), 0) FROM tasks"
+    ))
+
+
+# (版本号, 名称, 升级函数)；只能追加，不能修改已发布的条目
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "hot_path_indexes", _add_hot_path_indexes),
+    (2, "dynamics_store", _create_dynamics_store),
+    (3, "feed_snapshot", _create_feed_snapshot),
+    (4, "task_tags", _create_task_tags),
+    (5, "task_search", _create_task_search),
+    (6, "task_list_sort_indexes", _add_task_list_sort_indexes),
+    (7, "task_deadline_day_index", _add_task_deadline_day_index),
+    (8, "task_revisions", _add_task_revisions),
+]
+
+def _ensure_migrations_table(conn: Connection) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR(100) NOT NULL, "
+        "applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    ))
+
+
+def _record(conn: Connection, version: int, name: str) -> None:
+    conn.execute(
+        text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (:version, :name)"),
+        {"version": version, "name": name},
+    )
+
+
+def applied_versions(engine: Engine = default_engine) -> Set[int]:
+    with engine.begin() as conn:
+        _ensure_migrations_table(conn)
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}"))}
+
+
+@contextmanager
+def _migration_lock(engine: Engine) -> Iterator[None]:
+    """多个 worker 同时启动时，SQLite 文件数据库的迁移逐个执行"""
+    database = engine.url.database
+    if fcntl is None or engine.url.get_backend_name() != "sqlite" or not database or database == ":memory:":
+        yield
+        return
+    with open(f"{database}-migrate.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_migrations(engine: Engine = default_engine) -> List[int]:
+    """
+    将数据库升级到最新版本
+
+    全新数据库直接按模型建表并标记所有迁移为已应用；已有数据库逐个执行未应用的迁移，
+    每个迁移与其版本记录在同一事务中提交。
+
+    Returns:
+        List[int]: 本次执行的迁移版本号
+    """
+    with _migration_lock(engine):
+        return _run_migrations(engine)
+
+
+def _run_migrations(engine: Engine) -> List[int]:
+    applied = applied_versions(engine)
+    if not applied:
+        with engine.begin() as conn:
+            if not inspect(conn).has_table(models.User.__tablename__):
+                models.Base.metadata.create_all(bind=conn)
+                for version, name, _ in MIGRATIONS:
+                    _record(conn, version, name)
+                logging.info("已初始化数据库结构，版本 %d", MIGRATIONS[-1][0])
+                return []
+
+    executed = []
+    for version, name, upgrade in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            _record(conn, version, name)
+        logging.info("已应用数据库迁移 %03d_%s", version, name)
+        executed.append(version)
+    # 迁移之后新增的表由模型补建，已存在的表不受影响
+    models.Base.metadata.create_all(bind=engine)
+    return executed
+
+
+def hot_queries(db: Session) -> List[Tuple[str, Any]]:
+    """
+    热点接口实际执行的语句，由各模块的查询构造函数生成，用于 EXPLAIN QUERY PLAN 检查
+
+    任务列表在 available 范围下的各筛选与排序组合由 tasks.check_list_plans 单独检查。
+    """
+    from core import calendar, dynamics, search, tasks
+
+    principal = Principal(id=1, username="", nickname=None, avatar=None, qq=None, created_at=None)
+    sort = tasks.TASK_SORTS["created_at"]
+
+    def task_page(scope: str, cursor: Optional[str] = None, tag_filter: Any = None) -> Any:
+        query = tasks._filtered_tasks(db, principal, scope, tasks.TaskFilters(), "created_at")
+        if tag_filter is not None:
+            query = query.filter(tag_filter)
+        return tasks._page_queries(query, sort, cursor)[0].limit(51)
+
+    acceptances = models.TaskAcceptance
+    return [
+        ("available_list", task_page("available")),
+        ("available_list_cursor", task_page("available", encode_cursor("2100-01-01 00:00:00", 1))),
+        ("my_list", task_page("my")),
+        ("tag_filter_all", task_page("available", tag_filter=tasks._tag_ids_filter([1, 2], "all"))),
+        ("tag_filter_any", task_page("available", tag_filter=tasks._tag_ids_filter([1, 2], "any"))),
+        ("tag_facets", db.query(models.TaskTag.tag_id, func.count())
+            .select_from(models.Task)
+            .join(models.TaskTag, models.TaskTag.task_id == models.Task.id)
+            .filter(models.Task.status == "available")
+            .group_by(models.TaskTag.tag_id)),
+        ("task_detail", tasks.task_rows(db, *tasks._acceptance_columns(models.Task.id, principal.id))
+            .filter(models.Task.id == 1)),
+        ("acceptance_counts", db.query(acceptances.task_id, func.count(acceptances.id))
+            .filter(acceptances.task_id.in_([1, 2, 3]))
+            .group_by(acceptances.task_id)),
+        ("accept", tasks._guarded_accept(1, principal.id)),
+        ("task_search", search._search_query(db, ["数据库"], None).limit(51)),
+        ("task_search_cursor", search._search_query(db, ["数据库", "索引"], encode_cursor("-1.0", 1)).limit(51)),
+        # 只含短词时走 LIKE，扫描范围由 id 下界限定
+        ("task_search_short", search._search_query(db, ["招新"], None).limit(51)),
+        ("task_calendar", calendar._calendar_query(principal.id, date(2030, 3, 1), date(2030, 3, 31), 3)),
+        ("dynamics_history", dynamics._history_query(db, encode_cursor(2000000000, "0")).limit(21)),
+    ]
+
+
+def check_query_plans(engine: Engine = default_engine) -> List[str]:
+    """
+    对热点查询执行 EXPLAIN QUERY PLAN，并检查任务列表各筛选与排序组合的索引选择
+
+    Returns:
+        List[str]: 出现全表扫描（未使用任何索引的 SCAN）或任务列表未命中排序索引的查询及其计划，
+        为空表示全部通过
+    """
+    from core.tasks import check_list_plans
+
+    problems = []
+    with Session(bind=engine) as db:
+        for name, statement in hot_queries(db):
+            plan = query_plan(db, statement)
+            if table_scans(plan):
+                problems.append(f"{name}: {'; '.join(plan)}")
+        problems.extend(check_list_plans(db))
+    return problems
+
+
+def table_scans(plan: List[str]) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN 中未使用索引的表扫描
+
+    常量行与 MATERIALIZE 出的子查询结果上的 SCAN 不算；FTS5 虚表的计划行带有 INDEX，也不算。
+    """
+    materialized = {detail.split(" ", 1)[1] for detail in plan if detail.startswith("MATERIALIZE ")}
+    return [
+        detail for detail in plan
+        if detail.startswith("SCAN ")
+        and "INDEX" not in detail
+        and "CONSTANT ROW" not in detail
+        and detail.split(" ")[1] not in materialized
+    ]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="数据库迁移工具")
+    parser.add_argument("--status", action="store_true", help="仅显示迁移状态")
+    parser.add_argument("--check-plans", action="store_true", help="检查热点查询与任务列表的查询计划")
+    args = parser.parse_args()
+
+    if args.status:
+        applied = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"[{'x' if version in applied else ' '}] {version:03d}_{name}")
+        sys.exit(0)
+
+    executed = run_migrations()
+    print(f"已应用 {len(executed)} 个迁移" if executed else "数据库已是最新版本")
+
+    if args.check_plans:
+        problems = check_query_plans()
+        for problem in problems:
+            print(f"查询计划异常: {problem}")
+        sys.exit(1 if problems else 0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey  # pyright: ignore[reportMissingImports]
+from sqlalchemy import DDL, Column, Integer, String, DateTime, Text, ForeignKey, Index, event  # pyright: ignore[reportMissingImports]
 from sqlalchemy.orm import relationship  # pyright: ignore[reportMissingImports]
 from sqlalchemy.sql import func  # pyright: ignore[reportMissingImports]
 from core.database import Base
@@ -32,10 +32,72 @@ class Task(Base):
     status = Column(String(20), default="available")
     publisher_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, server_default=func.now())
+    # 最近一次变更时的全局版本号，见 SyncRevision
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
 
     publisher = relationship("User", back_populates="tasks")
     acceptances = relationship("TaskAcceptance", back_populates="task", cascade="all, delete-orphan")
 
+    # 任务列表的每种排序各一个索引，见 tasks.TASK_SORTS
+    __table_args__ = (
+        Index("ix_tasks_status_created_at", "status", "created_at"),
+        Index("ix_tasks_status_priority", "status", "priority"),
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+        # 日历按天汇总：截止日期上的范围扫描，同一天内按优先级顺序即可取前几条，见 calendar.task_calendar
+        Index("ix_tasks_deadline_day", func.date(deadline), priority.desc(), deadline, status),
+        Index("ix_tasks_revision", "revision"),
+    )
+
+
+class TaskTombstone(Base):
+    """已删除任务的记录，增量同步据此通知客户端移除"""
+
+    __tablename__ = "task_tombstones"
+
+    task_id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_task_tombstones_revision", "revision"),
+    )
+
+
+class SyncRevision(Base):
+    """
+    任务数据的全局版本号，只有 id=1 一行
+
+    每次任务相关的写入在同一事务中递增它并写入 tasks.revision 或 task_tombstones.revision；
+    SQLite 同一时间只有一个写事务，提交顺序与版本号顺序一致。
+    """
+
+    __tablename__ = "sync_revision"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+# 任务全文索引：外部内容 FTS5 表，trigram 分词以支持中文子串匹配，由触发器与 tasks 保持同步。
+# 状态变化不触发重建，只有标题、描述、标签变化时才更新索引
+TASK_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, tags, content='tasks', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, description, tags) "
+    "VALUES (new.id, new.title, new.description, new.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags) "
+    "VALUES ('delete', old.id, old.title, old.description, old.tags); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description, tags ON tasks BEGIN "
+    "INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags) "
+    "VALUES ('delete', old.id, old.title, old.description, old.tags); "
+    "INSERT INTO tasks_fts (rowid, title, description, tags) "
+    "VALUES (new.id, new.title, new.description, new.tags); END",
+]
+
+for statement in TASK_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
 
 class TaskAcceptance(Base):
     __tablename__ = "task_acceptances"
@@ -47,4 +109,61 @@ class TaskAcceptance(Base):
     accepted_at = Column(DateTime, server_default=func.now())
 
     task = relationship("Task", back_populates="acceptances")
-    user = relationship("User", back_populates="task_acceptances")
\ No newline at end of file
+    user = relationship("User", back_populates="task_acceptances")
+
+    __table_args__ = (
+        Index("uq_task_acceptances_task_user", "task_id", "user_id", unique=True),
+        Index("ix_task_acceptances_user_task", "user_id", "task_id"),
+    )
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), unique=True, nullable=False)
+
+
+class TaskTag(Base):
+    """任务与标签的关联；tasks.tags 仍保存按输入顺序拼接的副本用于展示，过滤与统计走本表"""
+
+    __tablename__ = "task_tags"
+
+    task_id = Column(Integer, ForeignKey("tasks.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_task_tags_tag_task", "tag_id", "task_id"),
+    )
+
+class BilibiliDynamic(Base):
+    __tablename__ = "bilibili_dynamics"
+
+    id = Column(String(32), primary_key=True)  # 动态 id_str
+    uid = Column(String(32), nullable=False, index=True)
+    pub_ts = Column(Integer, nullable=False, default=0)  # UNIX 秒级时间戳
+    data = Column(Text, nullable=False)  # 解析后的动态 JSON
+    fetched_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_bilibili_dynamics_pub_ts_id", "pub_ts", "id"),
+    )
+
+
+class BilibiliSyncState(Base):
+    __tablename__ = "bilibili_sync_state"
+
+    uid = Column(String(32), primary_key=True)
+    baseline = Column(String(32))  # 已同步的最新动态 id
+    synced_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class BilibiliFeedSnapshot(Base):
+    """轮询 worker 写入的最新动态，其他 worker 按 version 判断是否需要重新加载"""
+
+    __tablename__ = "bilibili_feed_snapshot"
+
+    id = Column(Integer, primary_key=True)  # 只有 id=1 一行
+    version = Column(Integer, nullable=False, default=0)
+    data = Column(Text, nullable=False)  # 最新动态列表 JSON
+    updated_at = Column(Integer, nullable=False, default=0)  # UNIX 秒级时间戳
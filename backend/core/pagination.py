@@ -0,0 +1,24 @@
+import base64
+import binascii
+from typing import List
+
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: object) -> str:
+    """将排序键编码为不透明的游标字符串"""
+    raw = "|".join(str(value) for value in values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", size - 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = []
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    return values
@@ -0,0 +1,280 @@
+"""
+B 站动态解析
+
+按 major 类型查一张分派表得到封面、标题、播放/弹幕的提取方式，每条动态只判断一次类型，
+解析结果为 __slots__ 记录，需要输出时再调用 to_dict()。吞吐量基准见 bench/parser.py。
+"""
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Union
+
+# 只读的空字典，代替到处新建的 {} 默认值
+_EMPTY: Dict[str, Any] = {}
+
+WORD = "word"
+OPUS = "opus"
+DRAW = "draw"
+MEDIA = "media"
+
+
+def _dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else _EMPTY
+
+
+def _pick(obj: Dict[str, Any], keys: Sequence[str]) -> Any:
+    """等价于 obj.get(k1, "") or obj.get(k2, "") or ..."""
+    value: Any = ""
+    for key in keys:
+        value = obj.get(key, "")
+        if value:
+            break
+    return value
+
+
+def _first_picture(pictures: Any, keys: Sequence[str]) -> Any:
+    if not pictures:
+        return ""
+    first = pictures[0]
+    if isinstance(first, dict):
+        return _pick(first, keys)
+    if isinstance(first, str):
+        return first
+    return ""
+
+
+def _plain_cover(body: Dict[str, Any]) -> Any:
+    return body.get("cover", "")
+
+
+def _draw_cover(body: Dict[str, Any]) -> Any:
+    return _first_picture(body.get("items"), ("src", "url", "src_small"))
+
+
+def _opus_cover(body: Dict[str, Any]) -> Any:
+    return _first_picture(body.get("pics"), ("url", "src", "src_small"))
+
+
+def _article_cover(body: Dict[str, Any]) -> Any:
+    covers = body.get("covers")
+    if not covers:
+        return ""
+    return covers[0] if isinstance(covers[0], str) else covers[0].get("url", "")
+
+
+class MajorSpec(NamedTuple):
+    field: str
+    cover: Callable[[Dict[str, Any]], Any]
+    # 是否输出标题、播放量/弹幕数（仅对视频等 MEDIA 类动态生效）
+    titled: bool
+    has_stat: bool
+
+
+MAJOR_TYPES: Dict[str, MajorSpec] = {
+    "MAJOR_TYPE_ARCHIVE": MajorSpec("archive", _plain_cover, True, True),  # 视频
+    "MAJOR_TYPE_DRAW": MajorSpec("draw", _draw_cover, False, False),  # 带图动态
+    "MAJOR_TYPE_OPUS": MajorSpec("opus", _opus_cover, False, False),  # 图文动态
+    "MAJOR_TYPE_ARTICLE": MajorSpec("article", _article_cover, True, False),  # 专栏
+    "MAJOR_TYPE_PGC": MajorSpec("pgc", _plain_cover, True, True),  # 剧集
+    "MAJOR_TYPE_LIVE": MajorSpec("live", _plain_cover, True, False),  # 直播
+    "MAJOR_TYPE_MUSIC": MajorSpec("music", _plain_cover, True, False),  # 音频
+    "MAJOR_TYPE_COURSES": MajorSpec("courses", _plain_cover, True, False),  # 课程
+    "MAJOR_TYPE_UGC_SEASON": MajorSpec("ugc_season", _plain_cover, True, True),  # 合集
+    "MAJOR_TYPE_COMMON": MajorSpec("common", _plain_cover, True, False),  # 一般类型
+}
+# major 类型为空或未知但带有 opus 字段时按图文处理
+_OPUS_FALLBACK = MajorSpec("opus", _opus_cover, False, False)
+
+
+def extract_text(desc: Any) -> str:
+    """从 desc 对象中提取文字，优先 text，其次拼接 rich_text_nodes"""
+    if not desc or not isinstance(desc, dict):
+        return ""
+    text = desc.get("text", "") or ""
+    if text:
+        return text
+    nodes = desc.get("rich_text_nodes")
+    if not nodes or not isinstance(nodes, list):
+        return ""
+    parts = []
+    for node in nodes:
+        if isinstance(node, dict):
+            node_text = node.get("text", "") or node.get("orig_text", "")
+            if node_text:
+                parts.append(node_text)
+        elif isinstance(node, str):
+            parts.append(node)
+    return "".join(parts)
+
+
+class Dynamic:
+    """解析后的一条动态；kind 决定 to_dict() 输出哪些字段"""
+
+    __slots__ = ("id", "kind", "cover", "title", "text", "play", "danmaku", "like", "comment", "forward", "pub_ts")
+
+    def __init__(
+        self,
+        id: str,
+        kind: str,
+        cover: Any = "",
+        title: Any = "",
+        text: str = "",
+        play: Any = "",
+        danmaku: Any = "",
+        like: Any = 0,
+        comment: Any = 0,
+        forward: Any = 0,
+        pub_ts: Any = 0,
+    ):
+        self.id = id
+        self.kind = kind
+        self.cover = cover
+        self.title = title
+        self.text = text
+        self.play = play
+        self.danmaku = danmaku
+        self.like = like
+        self.comment = comment
+        self.forward = forward
+        self.pub_ts = pub_ts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为 bilibili-dynamics.json 中的格式"""
+        if self.kind == WORD:
+            # 纯文字动态: 只保留文字、点赞数、评论数、转发数（无封面）
+            result = {"文字": self.text}
+        elif self.kind == MEDIA:
+            # 视频等: 保留所有字段
+            result = {"封面": self.cover, "标题": self.title, "播放量": self.play, "弹幕数": self.danmaku}
+        else:
+            # 图文、带图动态: 封面 + 统计数据
+            result = {"封面": self.cover}
+        result["点赞数"] = self.like
+        result["评论数"] = self.comment
+        result["转发数"] = self.forward
+        result["发布时间"] = self.pub_ts
+        if self.kind == DRAW and self.text:
+            result["文字"] = self.text
+        result["动态ID"] = self.id
+        return result
+
+    def __repr__(self) -> str:
+        return f"Dynamic(id={self.id!r}, kind={self.kind!r})"
+
+
+def parse_item(item: Dict[str, Any]) -> Dynamic:
+    # 热路径：用 `or _EMPTY` 与内联的 isinstance 代替辅助函数调用
+    modules = item.get("modules") or _EMPTY
+    module_dynamic = modules.get("module_dynamic") or _EMPTY
+    if not isinstance(module_dynamic, dict):
+        module_dynamic = _EMPTY
+    module_stat = modules.get("module_stat") or _EMPTY
+    if not isinstance(module_stat, dict):
+        module_stat = _EMPTY
+
+    # 转发动态的封面、标题等来自原动态，文字和统计数据仍取当前动态
+    orig = item.get("orig")
+    if orig and isinstance(orig, dict):
+        major = ((orig.get("modules") or _EMPTY).get("module_dynamic") or _EMPTY).get("major") or _EMPTY
+    else:
+        major = module_dynamic.get("major") or _EMPTY
+    if not isinstance(major, dict):
+        major = _EMPTY
+    major_type = major.get("type", "")
+    if not isinstance(major_type, str):
+        major_type = ""
+
+    item_type = item.get("type", "")
+    if isinstance(item_type, (int, float)):
+        item_type = str(item_type)
+    upper_type = str(item_type).upper()
+
+    spec = MAJOR_TYPES.get(major_type)
+    if spec is None and "opus" in major:
+        spec = _OPUS_FALLBACK
+    if spec is None:
+        body = _EMPTY
+        cover = ""
+    else:
+        body = major.get(spec.field) or _EMPTY
+        cover = spec.cover(body)
+
+    is_draw = item_type == "11" or major_type == "MAJOR_TYPE_DRAW" or "DRAW" in upper_type or "draw" in major
+    if is_draw and not cover:
+        cover = _draw_cover(_dict(major.get("draw")))
+
+    if item_type == "17" or "WORD" in upper_type:
+        kind = WORD
+    elif (
+        major_type == "MAJOR_TYPE_OPUS"
+        or "opus" in major
+        or (cover and "new_dyn" in cover)
+        or (item_type and "OPUS" in upper_type)
+    ):
+        kind = OPUS
+    elif is_draw:
+        kind = DRAW
+    else:
+        kind = MEDIA
+
+    text = ""
+    title = play = danmaku = ""
+    if kind == WORD or kind == DRAW:
+        text = extract_text(module_dynamic.get("desc"))
+    elif kind == MEDIA and spec is not None:
+        if spec.titled:
+            title = body.get("title", "")
+        if spec.has_stat:
+            stat = body.get("stat") or _EMPTY
+            play = stat.get("play", "")
+            danmaku = stat.get("danmaku", "")
+
+    return Dynamic(
+        str(item.get("id_str") or ""),
+        kind,
+        cover,
+        title,
+        text,
+        play,
+        danmaku,
+        (module_stat.get("like") or _EMPTY).get("count", 0),
+        (module_stat.get("comment") or _EMPTY).get("count", 0),
+        (module_stat.get("forward") or _EMPTY).get("count", 0),
+        (modules.get("module_author") or _EMPTY).get("pub_ts", 0),
+    )
+
+
+def parse_stats(item: Dict[str, Any]) -> Dict[str, Any]:
+    """只取点赞、评论、转发数，键与 to_dict() 相同；用于刷新已解析过的动态"""
+    modules = item.get("modules") or _EMPTY
+    module_stat = modules.get("module_stat") or _EMPTY
+    if not isinstance(module_stat, dict):
+        module_stat = _EMPTY
+    return {
+        "点赞数": (module_stat.get("like") or _EMPTY).get("count", 0),
+        "评论数": (module_stat.get("comment") or _EMPTY).get("count", 0),
+        "转发数": (module_stat.get("forward") or _EMPTY).get("count", 0),
+    }
+
+
+def iter_dynamics(items: Iterable[Any]) -> Iterator[Dynamic]:
+    """逐条解析，items 可以是任意可迭代对象，不要求一次性放入内存"""
+    for item in items:
+        if isinstance(item, dict):
+            yield parse_item(item)
+
+
+def parse_dynamics(payload: Union[Dict[str, Any], Iterable[Any], str, bytes]) -> List[Dynamic]:
+    """
+    解析动态
+
+    Args:
+        payload: 完整的接口响应（JSON 字符串或已解码的 dict），或其中的 items 列表
+
+    Returns:
+        List[Dynamic]: 解析结果，顺序与 items 相同
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    if isinstance(payload, dict):
+        payload = _dict(payload.get("data")).get("items") or []
+    return list(iter_dynamics(payload))
+
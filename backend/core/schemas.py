@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field  # pyright: ignore[reportMissingImports]
@@ -86,6 +86,58 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskSearchResult(TaskResponse):
+    title_highlight: str  # HTML 转义后以 <mark> 标出命中词
+    snippet: str
+
+
+class TaskBatchOperation(BaseModel):
+    op: str = Field(..., pattern="^(create|update|delete|accept|complete|abandon)$")
+    task_id: Optional[int] = None  # create 以外的操作必填
+    task: Optional[TaskCreate] = None  # create 必填
+    changes: Optional[TaskUpdate] = None  # update 必填
+
+
+class TaskBatchRequest(BaseModel):
+    operations: List[TaskBatchOperation] = Field(..., min_length=1, max_length=100)
+
+
+class TaskBatchResult(BaseModel):
+    index: int
+    op: str
+    status_code: int
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None  # 整批提交后的任务；失败或删除时为空
+
+
+class TaskChanges(BaseModel):
+    revision: int
+    has_more: bool
+    tasks: List[TaskResponse]
+    deleted: List[int]
+
+
+class TagFacet(BaseModel):
+    name: str
+    count: int
+
+
+class CalendarTask(BaseModel):
+    id: int
+    title: str
+    type: str
+    priority: int
+    status: str
+    deadline: datetime
+    is_accepted: bool
+
+
+class CalendarDay(BaseModel):
+    date: date
+    count: int
+    tasks: List[CalendarTask]
+
+
 class TaskAcceptanceResponse(BaseModel):
     id: int
     task_id: int
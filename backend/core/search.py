@@ -0,0 +1,161 @@
+"""
+任务全文搜索
+
+基于 tasks_fts（FTS5，trigram 分词，见 models.TASK_SEARCH_DDL）。trigram 只能索引不少于 3 个字符的词，
+更短的词（如两个字的中文词）退回到 LIKE 过滤；只含短词的查询不计算相关度，按任务 id 倒序返回，
+且只在最新的 TASK_SEARCH_SHORT_WINDOW 个任务中查找，避免罕见短词扫描全表。
+高亮在 Python 中对当前页计算，两种匹配方式输出一致，并先做 HTML 转义。基准见 bench/search.py。
+"""
+import html
+import os
+import re
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import Float, and_, column, func, literal_column, or_, select, table  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.pagination import decode_cursor, encode_cursor
+from core.serialization import TaskPayload
+from core.tasks import serialize_tasks, task_rows
+
+MIN_INDEXED_LENGTH = 3  # trigram 分词能命中的最短词长
+MAX_TERMS = 8
+# 只含短词的查询按 id 范围限定在最新的这么多个任务内（任务删除后实际条数会略少）
+SHORT_TERM_WINDOW = int(os.getenv("TASK_SEARCH_SHORT_WINDOW", "5000"))
+SNIPPET_CONTEXT = 24  # 摘要中命中词前后保留的字符数
+# bm25 的列权重：标题、描述、标签
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+MARK_OPEN, MARK_CLOSE = "<mark>", "</mark>"
+ELLIPSIS = "…"
+
+tasks_fts = table("tasks_fts", column("rowid"))
+_FTS = literal_column("tasks_fts")
+
+
+def search_terms(q: str) -> List[str]:
+    terms: List[str] = []
+    for term in q.split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def match_expression(terms: List[str]) -> str:
+    """每个词作为短语加引号，避免用户输入被解析为 FTS5 语法；空格分隔即为 AND"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _term_pattern(terms: List[str]) -> "re.Pattern[str]":
+    return re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+
+
+def _mark(text: str, pattern: "re.Pattern[str]", start: int = 0, end: Optional[int] = None) -> str:
+    end = len(text) if end is None else end
+    parts, position = [], start
+    for hit in pattern.finditer(text, start, end):
+        parts.append(html.escape(text[position:hit.start()]))
+        parts.append(MARK_OPEN + html.escape(hit.group()) + MARK_CLOSE)
+        position = hit.end()
+    parts.append(html.escape(text[position:end]))
+    return "".join(parts)
+
+
+def highlight(text: str, terms: List[str]) -> str:
+    """HTML 转义后用 <mark> 包裹命中的词"""
+    return _mark(text, _term_pattern(terms))
+
+
+def snippet(text: str, terms: List[str], context: int = SNIPPET_CONTEXT) -> str:
+    """截取第一个命中词附近的片段并高亮，没有命中时取开头"""
+    pattern = _term_pattern(terms)
+    hit = pattern.search(text)
+    if hit:
+        start, end = max(0, hit.start() - context), min(len(text), hit.end() + context)
+    else:
+        start, end = 0, min(len(text), context * 2)
+    return (
+        (ELLIPSIS if start > 0 else "")
+        + _mark(text, pattern, start, end)
+        + (ELLIPSIS if end < len(text) else "")
+    )
+
+
+def search_tasks(
+    db: Session,
+    current_user: Optional[Principal],
+    q: str,
+    limit: int,
+    cursor: Optional[str],
+    status: Optional[str] = None,
+) -> Tuple[List[TaskPayload], Optional[str]]:
+    """
+    按相关度（bm25，越小越相关）与任务 id 倒序的键集分页
+
+    相关度依赖全表的词频统计，翻页期间有任务增删时分数可能略有变化，游标仍不会重复返回同一任务。
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="搜索关键词不能为空")
+    rows = _search_query(db, terms, cursor, status).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(repr(float(rows[-1].rank)), rows[-1].id)
+
+    items = serialize_tasks(db, rows, current_user)
+    for item in items:
+        item["title_highlight"] = highlight(item["title"], terms)
+        item["snippet"] = snippet(item["description"], terms)
+    return items, next_cursor
+
+
+def _search_query(db: Session, terms: List[str], cursor: Optional[str], status: Optional[str] = None):
+    """按相关度排好序的搜索查询（未加 LIMIT），附带 rank 列"""
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_LENGTH]
+
+    if indexed:
+        rank = func.bm25(_FTS, *BM25_WEIGHTS)
+        query = (
+            task_rows(db, rank.label("rank"))
+            .join(tasks_fts, tasks_fts.c.rowid == models.Task.id)
+            .filter(_FTS.op("MATCH")(match_expression(indexed)))
+        )
+        order_by = (rank, models.Task.id.desc())
+    else:
+        # 相关度恒为 0，只按 id 排序，SQLite 才能沿主键倒序扫描并在取满一页后停止；
+        # 命中很少时扫描范围由 id 下界限定，而不是整张表
+        rank = literal_column("0.0", Float)
+        newest = select(func.max(models.Task.id)).scalar_subquery()
+        query = task_rows(db, rank.label("rank")).filter(models.Task.id > newest - SHORT_TERM_WINDOW)
+        order_by = (models.Task.id.desc(),)
+    for term in terms:
+        if len(term) < MIN_INDEXED_LENGTH:
+            pattern = _like_pattern(term)
+            query = query.filter(or_(
+                models.Task.title.like(pattern, escape="\\"),
+                models.Task.description.like(pattern, escape="\\"),
+                models.Task.tags.like(pattern, escape="\\"),
+            ))
+    if status:
+        query = query.filter(models.Task.status == status)
+
+    if cursor:
+        cursor_rank, cursor_id = decode_cursor(cursor, 2)
+        try:
+            after_rank, after_id = float(cursor_rank), int(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+        if indexed:
+            query = query.filter(or_(rank > after_rank, and_(rank == after_rank, models.Task.id < after_id)))
+        else:
+            query = query.filter(models.Task.id < after_id)
+    return query.order_by(*order_by)
+
@@ -0,0 +1,82 @@
+"""
+任务增量同步
+
+每次任务相关的写入都会取一个新的全局版本号（tasks.next_revision）记在 tasks.revision 上，删除的任务留下
+task_tombstones 记录。接取、完成、放弃改变的是任务的 accepted_count、status 与 is_accepted，同样更新任务的版本号，
+因此客户端只需同步任务：保存上次得到的 revision，之后只取版本号更大的任务与墓碑。
+
+列表接口的 ETag 由当前全局版本号与用户 id 组成（is_accepted 因人而异），版本号未变时返回 304。
+"""
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request, Response  # pyright: ignore[reportMissingImports]
+from sqlalchemy import select  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.tasks import current_revision, serialize_tasks, task_rows
+
+CHANGES_PAGE_SIZE = 200
+CHANGES_PAGE_SIZE_MAX = 500
+
+
+def task_changes(db: Session, current_user: Principal, since: int, limit: int) -> Dict[str, Any]:
+    """
+    返回版本号大于 since 的任务与已删除任务 id，按版本号顺序最多 limit 项
+
+    revision 为客户端下次请求应传入的 since；has_more 为真时应立即继续请求。
+    """
+    # 同一会话内的查询处于同一读事务，版本号与变更内容是同一时刻的快照
+    latest = current_revision(db)
+    if since > latest:
+        raise HTTPException(status_code=410, detail="同步版本已失效，请重新获取完整列表")
+
+    rows = (
+        task_rows(db, models.Task.revision)
+        .filter(models.Task.revision > since)
+        .order_by(models.Task.revision)
+        .limit(limit + 1)
+        .all()
+    )
+    tombstones = db.execute(
+        select(models.TaskTombstone.task_id, models.TaskTombstone.revision)
+        .where(models.TaskTombstone.revision > since)
+        .order_by(models.TaskTombstone.revision)
+        .limit(limit + 1)
+    ).all()
+
+    # 两路按版本号归并，取前 limit 项；每个版本号只属于一个任务或墓碑
+    revisions = sorted([row.revision for row in rows] + [row.revision for row in tombstones])
+    has_more = len(revisions) > limit
+    revision = revisions[limit - 1] if has_more else latest
+    return {
+        "revision": revision,
+        "has_more": has_more,
+        "tasks": serialize_tasks(db, [row for row in rows if row.revision <= revision], current_user),
+        "deleted": [row.task_id for row in tombstones if row.revision <= revision],
+    }
+
+
+def list_etag(db: Session, current_user: Principal) -> str:
+    return revision_etag(current_revision(db), current_user)
+
+
+def revision_etag(revision: int, current_user: Principal) -> str:
+    return f'"tasks-{revision}-{current_user.id}"'
+
+
+def list_headers(etag: str) -> Dict[str, str]:
+    # 内容因用户而异，只允许客户端缓存，且每次使用前须重新验证
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """If-None-Match 与 etag 匹配（弱比较）时返回 304 响应"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers=list_headers(etag))
+    return None
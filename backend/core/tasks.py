@@ -0,0 +1,581 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import String, case, cast, delete, exists, func, insert, literal, or_, select, update  # pyright: ignore[reportMissingImports]
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # pyright: ignore[reportMissingImports]
+from sqlalchemy.exc import IntegrityError  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+from sqlalchemy.sql.expression import UnaryExpression  # pyright: ignore[reportMissingImports]
+from sqlalchemy.sql.operators import custom_op  # pyright: ignore[reportMissingImports]
+
+from core import models
+from core.auth import Principal
+from core.database import query_plan
+from core.pagination import decode_cursor, encode_cursor
+from core.schemas import TaskCreate, TaskUpdate
+from core.serialization import TASK_FIELDS, TaskPayload, task_payload
+
+
+# 任务接口直接查询这些列，避免加载 ORM 对象再转换一遍
+TASK_COLUMNS = tuple(getattr(models.Task, field) for field in TASK_FIELDS) + (
+    models.User.nickname.label("publisher_nickname"),
+    models.User.username.label("publisher_username"),
+)
+
+
+def task_rows(db: Session, *columns):
+    """任务列与发布者名称的查询，columns 为额外附加的列"""
+    return db.query(*TASK_COLUMNS, *columns).outerjoin(
+        models.User, models.User.id == models.Task.publisher_id
+    )
+
+
+def get_acceptance_stats(db: Session, task_id: int, user_id: Optional[int]) -> Tuple[int, bool]:
+    """单条查询返回任务的接取人数及指定用户是否已接取，不加载 acceptances 集合"""
+    count, accepted = db.query(*_acceptance_columns(task_id, user_id)).one()
+    return count, bool(accepted)
+
+
+def _acceptance_columns(task_id, user_id: Optional[int]):
+    accepted_count = (
+        select(func.count(models.TaskAcceptance.id))
+        .where(models.TaskAcceptance.task_id == task_id)
+        .scalar_subquery()
+    )
+    is_accepted = exists().where(
+        models.TaskAcceptance.task_id == task_id,
+        models.TaskAcceptance.user_id == user_id,
+    )
+    return accepted_count.label("accepted_count"), is_accepted.label("is_accepted")
+
+
+def serialize_task(db: Session, task_id: int, current_user: Optional[Principal]) -> TaskPayload:
+    """任务、发布者与接取状态一条查询取回"""
+    row = (
+        task_rows(db, *_acceptance_columns(models.Task.id, current_user.id if current_user else None))
+        .filter(models.Task.id == task_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return task_payload(row, row.accepted_count, bool(row.is_accepted))
+
+
+def serialize_tasks(db: Session, rows: List[Any], current_user: Optional[Principal]) -> List[TaskPayload]:
+    """批量序列化：接取人数与当前用户接取状态各用一条查询解决，rows 来自 task_rows()"""
+    if not rows:
+        return []
+    task_ids = [row[0] for row in rows]
+    counts = dict(
+        db.query(models.TaskAcceptance.task_id, func.count(models.TaskAcceptance.id))
+        .filter(models.TaskAcceptance.task_id.in_(task_ids))
+        .group_by(models.TaskAcceptance.task_id)
+        .all()
+    )
+    accepted_ids = set()
+    if current_user:
+        accepted_ids = {
+            task_id
+            for (task_id,) in db.query(models.TaskAcceptance.task_id).filter(
+                models.TaskAcceptance.task_id.in_(task_ids),
+                models.TaskAcceptance.user_id == current_user.id,
+            )
+        }
+    return [task_payload(row, counts.get(row[0], 0), row[0] in accepted_ids) for row in rows]
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """去掉空白与重复的标签，保留输入顺序；标签以逗号拼接存储，因此逗号也作为分隔符"""
+    names: List[str] = []
+    for tag in tags:
+        for name in tag.split(","):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def set_task_tags(db: Session, task_id: int, names: List[str]) -> None:
+    """用 names 替换任务的标签关联，不存在的标签随之创建"""
+    set_tags_bulk(db, {task_id: names})
+
+
+def set_tags_bulk(db: Session, task_tags: Dict[int, List[str]]) -> None:
+    """set_task_tags 的批量版本：task_tags 为 任务 id -> 标签，所有任务共用同一组语句"""
+    if not task_tags:
+        return
+    db.execute(delete(models.TaskTag).where(models.TaskTag.task_id.in_(list(task_tags))))
+    names = sorted({name for tags in task_tags.values() for name in tags})
+    if not names:
+        return
+    db.execute(
+        sqlite_insert(models.Tag).values([{"name": name} for name in names]).on_conflict_do_nothing(
+            index_elements=["name"]
+        )
+    )
+    tag_ids = dict(db.execute(select(models.Tag.name, models.Tag.id).where(models.Tag.name.in_(names))).all())
+    db.execute(
+        insert(models.TaskTag),
+        [{"task_id": task_id, "tag_id": tag_ids[name]} for task_id, tags in task_tags.items() for name in tags],
+    )
+
+
+def _tag_filter(db: Session, names: List[str], match: str):
+    """
+    返回按标签过滤任务 id 的条件，标签都不存在而无法命中时返回 None
+
+    match 为 all 时任务须带有全部标签（AND），any 时带有任一标签即可（OR）。
+    通过 task_tags 的 (tag_id, task_id) 索引求出任务 id 集合，不扫描 tasks.tags。
+    """
+    tag_ids = db.execute(select(models.Tag.id).where(models.Tag.name.in_(names))).scalars().all()
+    if not tag_ids or (match == "all" and len(tag_ids) < len(names)):
+        return None
+    return _tag_ids_filter(tag_ids, match)
+
+
+def _tag_ids_filter(tag_ids: List[int], match: str):
+    task_ids = select(models.TaskTag.task_id).where(models.TaskTag.tag_id.in_(tag_ids))
+    if match == "all" and len(tag_ids) > 1:
+        task_ids = task_ids.group_by(models.TaskTag.task_id).having(func.count() == len(tag_ids))
+    return models.Task.id.in_(task_ids)
+
+
+def tag_facets(db: Session) -> List[Dict[str, Any]]:
+    """各标签下可接取任务的数量，按数量倒序"""
+    count = func.count().label("count")
+    rows = (
+        db.query(models.Tag.name, count)
+        .select_from(models.Task)
+        .join(models.TaskTag, models.TaskTag.task_id == models.Task.id)
+        .join(models.Tag, models.Tag.id == models.TaskTag.tag_id)
+        .filter(models.Task.status == "available")
+        .group_by(models.TaskTag.tag_id)
+        .order_by(count.desc(), models.Tag.name)
+        .all()
+    )
+    return [{"name": name, "count": count} for name, count in rows]
+
+
+def next_revision(db: Session, count: int = 1) -> int:
+    """
+    在当前事务中把全局版本号递增 count，返回递增后的值；(返回值 - count, 返回值] 归调用方使用
+
+    每个版本号只对应一个任务或墓碑，增量同步按版本号分页时不会把同一版本拆到两页。
+    """
+    table = models.SyncRevision.__table__
+    return db.execute(
+        sqlite_insert(table)
+        .values(id=1, value=count)
+        .on_conflict_do_update(index_elements=["id"], set_={"value": table.c.value + count})
+        .returning(table.c.value)
+    ).scalar_one()
+
+
+def current_revision(db: Session) -> int:
+    return db.execute(select(models.SyncRevision.value).where(models.SyncRevision.id == 1)).scalar() or 0
+
+
+def _touch_task(db: Session, task_id: int, **values: Any) -> None:
+    """更新任务并记录新的版本号；接取状态的变化同样记在任务上，它决定了 accepted_count 与 is_accepted"""
+    db.execute(
+        update(models.Task)
+        .where(models.Task.id == task_id)
+        .values(revision=next_revision(db), **values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def touch_published_tasks(db: Session, user_id: int) -> None:
+    """发布者名称变化后，为其发布的任务各分配新的版本号"""
+    task_ids = db.execute(select(models.Task.id).where(models.Task.publisher_id == user_id)).scalars().all()
+    if not task_ids:
+        return
+    last = next_revision(db, len(task_ids))
+    db.execute(
+        update(models.Task),
+        [
+            {"id": task_id, "revision": revision}
+            for task_id, revision in zip(task_ids, range(last - len(task_ids) + 1, last + 1))
+        ],
+    )
+
+
+def add_tombstones(db: Session, revisions: Dict[int, int]) -> None:
+    """为已删除的任务记录墓碑，revisions 为 任务 id -> 版本号"""
+    tombstone = sqlite_insert(models.TaskTombstone)
+    db.execute(
+        tombstone.on_conflict_do_update(
+            index_elements=["task_id"], set_={"revision": tombstone.excluded.revision, "deleted_at": func.now()}
+        ),
+        [{"task_id": task_id, "revision": revision} for task_id, revision in revisions.items()],
+    )
+
+
+def get_task_or_404(db: Session, task_id: int) -> models.Task:
+    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return task
+
+
+@dataclass(frozen=True)
+class TaskFilters:
+    """任务列表的筛选条件，均可省略；status 省略时 available 范围只返回可接取的任务"""
+
+    type: Optional[str] = None
+    status: Optional[str] = None
+    priority_min: Optional[int] = None
+    priority_max: Optional[int] = None
+    deadline_from: Optional[datetime] = None
+    deadline_to: Optional[datetime] = None
+    tags: Tuple[str, ...] = ()
+    match: str = "all"
+
+
+@dataclass(frozen=True)
+class TaskSort:
+    column: Any
+    descending: bool
+    numeric: bool = False
+    nulls_last: bool = False  # 仅用于升序：没有值的任务排在最后
+
+
+# 每种排序在 available 范围下由 (status, 排序列) 复合索引提供顺序，SQLite 索引隐含 rowid 作为末列
+TASK_SORTS: Dict[str, TaskSort] = {
+    "created_at": TaskSort(models.Task.created_at, descending=True),
+    "priority": TaskSort(models.Task.priority, descending=True, numeric=True),
+    "deadline": TaskSort(models.Task.deadline, descending=False, nulls_last=True),
+}
+
+
+def task_list_index(sort: str) -> str:
+    """available 范围下应命中的索引名，与 models.Task 的 __table_args__ 对应"""
+    return f"ix_tasks_status_{sort}"
+
+
+def _residual(column):
+    """一元 + 让 SQLite 不把该条件用于索引查找，只在沿排序索引扫描时逐行过滤"""
+    return UnaryExpression(column, operator=custom_op("+"), type_=column.type)
+
+
+def _filtered_tasks(db: Session, current_user: Principal, scope: str, filters: TaskFilters, sort: str):
+    """
+    筛选条件中只有排序列上的范围参与索引查找，其余条件都作为扫描时的过滤
+
+    没有统计信息时，SQLite 倾向于选择约束最多的索引，再用临时 B 树排序；固定使用排序索引，
+    取满一页即可停止。type 只有两个取值，也不单独建索引。
+    """
+    sort_column = TASK_SORTS[sort].column
+    query = task_rows(db, cast(sort_column, String).label("sort_key"))
+
+    def column(attribute):
+        return attribute if attribute is sort_column else _residual(attribute)
+
+    if scope == "my":
+        query = query.join(
+            models.TaskAcceptance, models.TaskAcceptance.task_id == models.Task.id
+        ).filter(models.TaskAcceptance.user_id == current_user.id)
+        if filters.status:
+            query = query.filter(models.Task.status == filters.status)
+    else:
+        query = query.filter(models.Task.status == (filters.status or "available"))
+    if filters.type:
+        query = query.filter(column(models.Task.type) == filters.type)
+    if filters.priority_min is not None:
+        query = query.filter(column(models.Task.priority) >= filters.priority_min)
+    if filters.priority_max is not None:
+        query = query.filter(column(models.Task.priority) <= filters.priority_max)
+    if filters.deadline_from is not None:
+        query = query.filter(column(models.Task.deadline) >= filters.deadline_from)
+    if filters.deadline_to is not None:
+        query = query.filter(column(models.Task.deadline) <= filters.deadline_to)
+    return query
+
+
+def decode_sort_cursor(cursor: Optional[str], sort: TaskSort) -> Tuple[Optional[str], Optional[int]]:
+    """解析列表游标为 (排序值, id)，没有游标时均为 None"""
+    if not cursor:
+        return None, None
+    after_key, cursor_id = decode_cursor(cursor, 2)
+    if (
+        not cursor_id.isdigit()
+        or (after_key == "" and not sort.nulls_last)
+        or (sort.numeric and after_key and not after_key.lstrip("-").isdigit())
+    ):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    return after_key, int(cursor_id)
+
+
+def _page_queries(query, sort: TaskSort, cursor: Optional[str], bounded: bool = False) -> List[Any]:
+    """
+    按顺序返回组成一页的查询
+
+    nulls_last 的排序分两段：先按 (列, id) 翻完有值的任务，再按 id 翻没有值的任务；
+    两段都能沿索引顺序扫描。游标的排序值为空串表示已进入第二段。bounded 表示查询已带有该列的范围条件。
+    """
+    after_key, after_id = decode_sort_cursor(cursor, sort)
+    queries = []
+    if not (sort.nulls_last and after_key == ""):
+        page = query
+        if after_id is not None:
+            # 写成 列 >= v AND (列 > v OR id > i) 而不是行值比较，规划器才会把它当作索引上的范围，
+            # 与筛选条件叠加时不至于退回到更短的索引
+            value = int(after_key) if sort.numeric else literal(after_key, String)
+            if sort.descending:
+                page = page.filter(sort.column <= value, or_(sort.column < value, models.Task.id < after_id))
+            else:
+                page = page.filter(sort.column >= value, or_(sort.column > value, models.Task.id > after_id))
+        elif sort.nulls_last and not bounded:
+            page = page.filter(sort.column.isnot(None))
+        if sort.descending:
+            page = page.order_by(sort.column.desc(), models.Task.id.desc())
+        else:
+            page = page.order_by(sort.column, models.Task.id)
+        queries.append(page)
+    if sort.nulls_last and not bounded:
+        page = query.filter(sort.column.is_(None))
+        if after_key == "":
+            page = page.filter(models.Task.id > after_id)
+        queries.append(page.order_by(sort.column, models.Task.id))
+    return queries
+
+
+def _bounded(sort: str, filters: TaskFilters) -> bool:
+    """排序列上已有范围条件时，没有值的任务不可能命中"""
+    if sort == "deadline":
+        return filters.deadline_from is not None or filters.deadline_to is not None
+    if sort == "priority":
+        return filters.priority_min is not None or filters.priority_max is not None
+    return False
+
+
+def list_tasks(
+    db: Session,
+    current_user: Principal,
+    scope: str,
+    limit: int,
+    cursor: Optional[str],
+    filters: Optional[TaskFilters] = None,
+    sort: str = "created_at",
+) -> Tuple[List[TaskPayload], Optional[str]]:
+    """按 sort 排序（id 为次序）的键集分页，返回当前页与下一页游标"""
+    filters = filters or TaskFilters()
+    if (
+        filters.priority_min is not None and filters.priority_max is not None
+        and filters.priority_min > filters.priority_max
+    ):
+        raise HTTPException(status_code=400, detail="优先级范围无效")
+    if filters.deadline_from and filters.deadline_to and filters.deadline_from > filters.deadline_to:
+        raise HTTPException(status_code=400, detail="截止时间范围无效")
+
+    spec = TASK_SORTS[sort]
+    # 排序值（sort_key）以数据库原始文本编入游标，避免 DATETIME 绑定格式与 CURRENT_TIMESTAMP 不一致
+    query = _filtered_tasks(db, current_user, scope, filters, sort)
+    names = normalize_tags(filters.tags)
+    if names:
+        tag_filter = _tag_filter(db, names, filters.match)
+        if tag_filter is None:
+            return [], None
+        query = query.filter(tag_filter)
+
+    rows: List[Any] = []
+    for page in _page_queries(query, spec, cursor, _bounded(sort, filters)):
+        rows += page.limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].sort_key or "", rows[-1].id)
+
+    return serialize_tasks(db, rows, current_user), next_cursor
+
+
+def check_list_plans(db: Session) -> List[str]:
+    """
+    对 available 范围下每种筛选与排序组合的实际查询执行 EXPLAIN QUERY PLAN
+
+    Returns:
+        List[str]: 未命中预期复合索引或需要临时 B 树排序的组合及其计划，为空表示全部通过
+    """
+    principal = Principal(id=0, username="", nickname=None, avatar=None, qq=None, created_at=None)
+    problems = []
+    for sort, spec in TASK_SORTS.items():
+        for filters in (
+            TaskFilters(type=task_type, priority_min=priority, priority_max=priority, deadline_from=deadline,
+                        deadline_to=deadline)
+            for task_type in (None, "team")
+            for priority in (None, 2)
+            for deadline in (None, datetime(2030, 1, 1))
+        ):
+            query = _filtered_tasks(db, principal, "available", filters, sort)
+            expected = task_list_index(sort)
+            pages = [
+                page
+                for cursor in (None, encode_cursor("1", 1)) + ((encode_cursor("", 1),) if spec.nulls_last else ())
+                for page in _page_queries(query, spec, cursor, _bounded(sort, filters))
+            ]
+            for page in pages:
+                plan = query_plan(db, page.limit(51))
+                uses_index = any(f"INDEX {expected} " in f"{detail} " for detail in plan)
+                if not uses_index or any("TEMP B-TREE FOR ORDER BY" in detail for detail in plan):
+                    problems.append(f"sort={sort} {filters}: 预期 {expected}，实际 {'; '.join(plan)}")
+    return problems
+
+
+def new_task_values(task: TaskCreate, publisher_id: int) -> Tuple[Dict[str, Any], List[str]]:
+    """新任务的列值与规范化后的标签"""
+    tags = normalize_tags(task.tags)
+    values = {
+        "title": task.title,
+        "description": task.description,
+        "type": task.type,
+        "priority": task.priority,
+        # 个人任务只能由一人接取
+        "max_accept_count": 1 if task.type == "personal" else task.max_accept_count,
+        "deadline": task.deadline,
+        "tags": ",".join(tags) or None,
+        "publisher_id": publisher_id,
+    }
+    return values, tags
+
+
+def create_task(db: Session, task: TaskCreate, current_user: Principal) -> TaskPayload:
+    values, tags = new_task_values(task, current_user.id)
+    db_task = models.Task(**values, revision=next_revision(db))
+    db.add(db_task)
+    db.flush()
+    # SQLite 可能复用刚删除的最大 id，此时旧墓碑已不再成立
+    db.execute(delete(models.TaskTombstone).where(models.TaskTombstone.task_id == db_task.id))
+    set_task_tags(db, db_task.id, tags)
+    db.commit()
+    return serialize_task(db, db_task.id, current_user)
+
+
+def get_task(db: Session, task_id: int, current_user: Principal) -> TaskPayload:
+    return serialize_task(db, task_id, current_user)
+
+
+def update_task(db: Session, task_id: int, task_update: TaskUpdate, current_user: Principal) -> TaskPayload:
+    task = get_task_or_404(db, task_id)
+    if task.publisher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="无权修改此任务")
+
+    for field, value in task_update.model_dump(exclude_unset=True).items():
+        if field == "tags":
+            tags = normalize_tags(value or [])
+            task.tags = ",".join(tags) or None
+            set_task_tags(db, task.id, tags)
+        else:
+            setattr(task, field, value)
+    task.revision = next_revision(db)
+
+    db.add(task)
+    db.commit()
+    return serialize_task(db, task_id, current_user)
+
+
+def delete_task(db: Session, task_id: int, current_user: Principal) -> None:
+    task = get_task_or_404(db, task_id)
+    if task.publisher_id != current_user.id:
+        raise HTTPException(status_code=403, detail="无权删除此任务")
+    # 先批量删除接取记录与标签关联，避免级联删除时逐条加载
+    db.query(models.TaskAcceptance).filter(models.TaskAcceptance.task_id == task.id).delete(
+        synchronize_session=False
+    )
+    db.execute(delete(models.TaskTag).where(models.TaskTag.task_id == task.id))
+    add_tombstones(db, {task.id: next_revision(db)})
+    db.delete(task)
+    db.commit()
+
+
+def _guarded_accept(task_id: int, user_id: int):
+    """未满且未接取过时才插入接取记录的 INSERT ... SELECT"""
+    accepted_count = (
+        select(func.count(models.TaskAcceptance.id))
+        .where(models.TaskAcceptance.task_id == task_id)
+        .scalar_subquery()
+    )
+    already_accepted = exists().where(
+        models.TaskAcceptance.task_id == task_id,
+        models.TaskAcceptance.user_id == user_id,
+    )
+    return insert(models.TaskAcceptance).from_select(
+        ["task_id", "user_id", "status"],
+        select(models.Task.id, literal(user_id), literal("inProgress")).where(
+            models.Task.id == task_id,
+            accepted_count < models.Task.max_accept_count,
+            ~already_accepted,
+        ),
+    )
+
+
+def accept_task(db: Session, task_id: int, current_user: Principal) -> TaskPayload:
+    """
+    接取任务
+
+    容量与重复接取的判断都放在同一条 INSERT ... SELECT 的条件里，由数据库在持有写锁时原子地求值，
+    并发接取不会超出 max_accept_count。插入失败后再查询具体原因。
+    """
+    try:
+        inserted = db.execute(_guarded_accept(task_id, current_user.id)).rowcount
+    except IntegrityError:
+        inserted = 0
+    if not inserted:
+        db.rollback()
+        task = get_task_or_404(db, task_id)
+        _, is_accepted = get_acceptance_stats(db, task.id, current_user.id)
+        if is_accepted:
+            raise HTTPException(status_code=400, detail="你已接取该任务")
+        raise HTTPException(status_code=400, detail="任务接取人数已满")
+
+    _touch_task(db, task_id, status="inProgress")
+    db.commit()
+    return serialize_task(db, task_id, current_user)
+
+
+def complete_task(db: Session, task_id: int, current_user: Principal) -> TaskPayload:
+    completed = db.execute(
+        update(models.TaskAcceptance)
+        .where(
+            models.TaskAcceptance.task_id == task_id,
+            models.TaskAcceptance.user_id == current_user.id,
+        )
+        .values(status="completed")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not completed:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="你尚未接取此任务")
+
+    # 所有接取者都完成后任务才算完成
+    pending = exists().where(
+        models.TaskAcceptance.task_id == task_id,
+        models.TaskAcceptance.status != "completed",
+    )
+    _touch_task(db, task_id, status=case((~pending, "completed"), else_=models.Task.status))
+    db.commit()
+    return serialize_task(db, task_id, current_user)
+
+
+def abandon_task(db: Session, task_id: int, current_user: Principal) -> TaskPayload:
+    abandoned = db.execute(
+        delete(models.TaskAcceptance)
+        .where(
+            models.TaskAcceptance.task_id == task_id,
+            models.TaskAcceptance.user_id == current_user.id,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not abandoned:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="你尚未接取此任务")
+
+    # 最后一位接取者放弃后任务重新开放
+    remaining = exists().where(models.TaskAcceptance.task_id == task_id)
+    _touch_task(db, task_id, status=case((~remaining, "available"), else_=models.Task.status))
+    db.commit()
+    return serialize_task(db, task_id, current_user)
+
@@ -0,0 +1,181 @@
+"""
+写入合并队列
+
+SQLite 同一时刻只有一个写事务，WAL 下每次提交还要写一次日志帧（synchronous=FULL 时再 fsync）。各请求各自提交时，
+并发写入在 busy_timeout 里轮流等锁，吞吐量受限于每秒能完成的提交次数。
+
+DB_WRITE_MODE=coalesce 时，任务的写接口改由唯一的写线程执行：写线程取到一个请求后，再等待 DB_WRITE_COALESCE_MS
+毫秒收集随后到达的请求（最多 DB_WRITE_COALESCE_MAX 个），在同一个 BEGIN IMMEDIATE 事务中依次执行，最后只提交一次。
+每个请求的会话以 join_transaction_mode="create_savepoint" 绑定到写线程的连接上，业务代码里的 commit / rollback
+只释放或回滚该请求自己的 SAVEPOINT：某个请求抛出异常时只撤销它自己的修改，同组其余请求照常提交。
+结果在整组提交成功后才交还各自的调用方；提交失败时同组请求都得到该异常，与单独提交失败时相同。
+
+写线程使用独立的同步引擎，与 DB_MODE 无关。DATABASE_URL 须为 SQLite 文件（:memory: 数据库无法跨连接共享）。
+逐个提交与合并提交的写入吞吐量对比见 bench/write_queue.py。
+"""
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
+
+from core.database import DATABASE_URL, SQLITE_PRAGMAS, DbSession, apply_sqlite_pragmas, run_db
+
+# direct: 每个请求在自己的会话中提交；coalesce: 交给写线程合并提交
+DB_WRITE_MODE = os.getenv("DB_WRITE_MODE", "direct")
+WRITE_COALESCE_MS = float(os.getenv("DB_WRITE_COALESCE_MS", "2"))
+WRITE_COALESCE_MAX = int(os.getenv("DB_WRITE_COALESCE_MAX", "64"))
+
+
+def writer_engine(url: str, pragmas: Optional[Dict[str, str]] = None) -> Engine:
+    """
+    写线程专用的引擎
+
+    pysqlite 默认在第一条 DML 前才隐式 BEGIN，SAVEPOINT 不在它的事务管理之内；这里关闭其事务管理，
+    由 SQLAlchemy 的 begin 事件显式发出 BEGIN IMMEDIATE，开始时即取得写锁。
+    """
+    if not url.startswith("sqlite") or ":memory:" in url:
+        raise ValueError(f"写入合并只支持 SQLite 文件数据库，当前为 {url!r}")
+    target = create_engine(url, connect_args={"check_same_thread": False}, pool_size=1, max_overflow=0)
+    apply_sqlite_pragmas(target, SQLITE_PRAGMAS if pragmas is None else pragmas)
+
+    @event.listens_for(target, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(target, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return target
+
+
+@dataclass
+class _Write:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: "Future[Any]" = field(default_factory=Future)
+
+    def settle(self, ok: bool, value: Any) -> None:
+        """交还结果或异常；已经有结果的 future 保持不变"""
+        if self.future.done():
+            return
+        try:
+            if ok:
+                self.future.set_result(value)
+            else:
+                self.future.set_exception(value)
+        except InvalidStateError:
+            pass
+
+
+class WriteQueue:
+    """
+    在单个写线程中按组执行 fn(session, *args)，每组一个事务、一次提交
+
+    window_ms 为 0 时不等待，只合并写线程忙于上一组期间排队的请求。
+    commits / writes 为已提交的组数与请求数，两者之比即平均每组的请求数。
+    """
+
+    def __init__(self, target: Engine, window_ms: float = WRITE_COALESCE_MS, max_batch: int = WRITE_COALESCE_MAX):
+        self.engine = target
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self.commits = 0
+        self.writes = 0
+        self._queue: "queue.SimpleQueue[Optional[_Write]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+        write = _Write(fn, args)
+        self._queue.put(write)
+        return write.future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # 与线程池中的 run_db 一样，请求被取消时写入仍会完成，不会停在半途
+        return await asyncio.shield(asyncio.wrap_future(self.submit(fn, *args)))
+
+    def shutdown(self) -> None:
+        """执行完已排队的请求后停止写线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            writes, stopping = self._collect(first)
+            try:
+                self._execute(writes)
+            except Exception as exc:
+                # 写线程只有一个，它退出后所有写请求都会永远等待；本组尚未得到结果的请求收到该异常，线程继续运行
+                logging.exception("写入合并队列执行失败: %s", exc)
+                for write in writes:
+                    write.settle(False, exc)
+
+    def _collect(self, first: _Write) -> Tuple[List[_Write], bool]:
+        writes = [first]
+        deadline = time.monotonic() + self.window
+        while len(writes) < self.max_batch:
+            try:
+                write = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if write is None:
+                return writes, True
+            writes.append(write)
+        return writes, False
+
+    def _execute(self, writes: List[_Write]) -> None:
+        outcomes: List[Tuple[bool, Any]] = []
+        try:
+            with self.engine.connect() as conn, conn.begin():
+                for write in writes:
+                    with Session(bind=conn, join_transaction_mode="create_savepoint", autoflush=False) as db:
+                        try:
+                            outcomes.append((True, write.fn(db, *write.args)))
+                        except Exception as exc:
+                            # 关闭会话时回滚到该请求的 SAVEPOINT
+                            outcomes.append((False, exc))
+        except Exception as exc:
+            # BEGIN IMMEDIATE 或提交失败：整组都没有生效
+            for write in writes:
+                write.settle(False, exc)
+            return
+
+        self.commits += 1
+        self.writes += len(writes)
+        for write, (ok, value) in zip(writes, outcomes):
+            write.settle(ok, value)
+
+
+write_queue: Optional[WriteQueue] = None
+if DB_WRITE_MODE == "coalesce":
+    write_queue = WriteQueue(writer_engine(DATABASE_URL))
+elif DB_WRITE_MODE != "direct":
+    raise ValueError(f"DB_WRITE_MODE 只能为 direct 或 coalesce，当前为 {DB_WRITE_MODE!r}")
+
+
+async def run_write(db: DbSession, fn: Callable[..., Any], *args: Any) -> Any:
+    """执行写操作 fn(session, *args)：coalesce 模式下交给写线程合并提交，否则与 run_db 相同"""
+    if write_queue is None:
+        return await run_db(db, fn, *args)
+    return await write_queue.run(fn, *args)
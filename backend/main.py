@@ -1,36 +1,62 @@
 import asyncio
 import logging
+import math
 import os
+import time
+from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from fastapi.middleware.cors import CORSMiddleware  # pyright: ignore[reportMissingImports]
 
-from fastapi import Depends, FastAPI, HTTPException, Query, status  # pyright: ignore[reportMissingImports]
-from fastapi.responses import FileResponse  # pyright: ignore[reportMissingImports]
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status  # pyright: ignore[reportMissingImports]
+from fastapi.responses import FileResponse, JSONResponse  # pyright: ignore[reportMissingImports]
 from fastapi.security import OAuth2PasswordRequestForm  # pyright: ignore[reportMissingImports]
 from fastapi.staticfiles import StaticFiles  # pyright: ignore[reportMissingImports]
+from sqlalchemy.exc import IntegrityError  # pyright: ignore[reportMissingImports]
 from sqlalchemy.orm import Session  # pyright: ignore[reportMissingImports]
 
-from core import database, models
+from core import batch, calendar, models, search, sync, tasks
 from core.auth import (
+    Principal,
     create_access_token,
+    get_current_principal,
     get_current_user,
     get_user_by_username,
-    hash_password,
-    verify_password,
+    principal_cache,
 )
-from core.database import get_db
-from core.fetch import fetch_bilibili_dynamics, load_cached_dynamics, save_cached_dynamics
+from core.board import build_task_board, task_board
+from core.database import DbSession, get_db, run_db
+from core.hashing import PasswordPoolSaturated, password_hasher
+from core.migrations import run_migrations
+from core.pagination import NEXT_CURSOR_HEADER
+from core.dynamics import load_stored_dynamics, sync_dynamics
+from core.feed_cache import CACHE_STATE_HEADER, CircuitOpen, FeedCache, FeedSnapshot
+from core.feed_share import (
+    SHARED_POLL_INTERVAL,
+    LeaderLock,
+    load_shared_snapshot,
+    publish_snapshot,
+    shared_snapshot_stamp,
+)
+from core.fetch import FEED_SIZE, BilibiliClient, load_cached_snapshot, save_cached_snapshot
 from core.schemas import (
+    CalendarDay,
     PasswordChange,
+    TaskBatchRequest,
+    TaskBatchResult,
+    TaskChanges,
+    TagFacet,
     TaskCreate,
     TaskResponse,
+    TaskSearchResult,
     TaskUpdate,
     Token,
     UserCreate,
     UserProfileUpdate,
     UserPublic,
 )
+from core.serialization import json_response, user_payload
+from core.write_queue import run_write, write_queue
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s - %(message)s")
 
@@ -39,12 +65,36 @@ STATIC_DIR = BASE_DIR / "static"
 FAVICON_PATH = STATIC_DIR / "HXK-Terminal.png"
 
 POLL_INTERVAL = int(os.getenv("BILIBILI_REFRESH_INTERVAL", "600"))
+AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+TASK_PAGE_SIZE = int(os.getenv("TASK_PAGE_SIZE", "50"))
+TASK_PAGE_SIZE_MAX = 200
+DYNAMICS_PAGE_SIZE_MAX = 100
+
+bilibili_client = BilibiliClient()
+# 多 worker 时只有持有该锁的 worker 请求上游
+feed_leader = LeaderLock()
+
 
-bilibili_cache: List[Dict[str, Any]] = load_cached_dynamics()
-cache_lock = asyncio.Lock()
+async def load_latest_dynamics() -> FeedSnapshot:
+    if not feed_leader.try_acquire():
+        # 由轮询 worker 负责抓取，这里只读取它发布的共享快照
+        shared = await asyncio.to_thread(load_shared_snapshot)
+        return shared or bilibili_cache.snapshot
+    await sync_dynamics(bilibili_client)
+    data, _ = await asyncio.to_thread(load_stored_dynamics, FEED_SIZE)
+    snapshot = FeedSnapshot.build(data)
+    await asyncio.to_thread(save_cached_snapshot, snapshot)
+    snapshot = await asyncio.to_thread(publish_snapshot, snapshot)
+    logging.info("已刷新 B 站动态：%d 条，版本 %d", len(data), snapshot.version)
+    return snapshot
+
+
+# 启动时只读取缓存文件头部，不解析内容
+bilibili_cache = FeedCache(loader=load_latest_dynamics, snapshot=load_cached_snapshot())
 
 app = FastAPI(debug=True)
-models.Base.metadata.create_all(bind=database.engine)
+if AUTO_MIGRATE:
+    run_migrations()
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 app.add_middleware(
@@ -55,63 +105,173 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", CACHE_STATE_HEADER],
 )
 
 
+@app.exception_handler(PasswordPoolSaturated)
+async def password_pool_saturated_handler(request, exc):
+    return JSONResponse(status_code=503, content={"detail": "服务繁忙，请稍后重试"}, headers={"Retry-After": "1"})
+
+
+def save_user(db: Session, user: models.User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 async def refresh_bilibili_dynamics() -> List[Dict[str, Any]]:
-    data = await asyncio.to_thread(fetch_bilibili_dynamics)
-    async with cache_lock:
-        bilibili_cache.clear()
-        bilibili_cache.extend(data)
-    await asyncio.to_thread(save_cached_dynamics, data)
-    logging.info("已刷新 B 站动态：%d 条", len(data))
-    return data
+    # 与请求触发的刷新共用同一次上游请求
+    return (await bilibili_cache.refresh()).dynamics
 
 
 async def refresh_bilibili_dynamics_periodically():
+    """
+    每个 worker 都运行：轮询 worker 每 POLL_INTERVAL 秒请求一次上游并发布共享快照，
+    其余 worker 在共享快照版本变化时重新加载，并在轮询 worker 退出后尝试接任
+    """
+    next_attempt = 0.0
     while True:
         try:
-            await refresh_bilibili_dynamics()
+            version, updated_at = await asyncio.to_thread(shared_snapshot_stamp)
+            # 接任时沿用上一个轮询 worker 的进度，避免重复请求上游
+            if feed_leader.try_acquire() and time.time() >= max(updated_at + POLL_INTERVAL, next_attempt):
+                next_attempt = time.time() + POLL_INTERVAL
+                await refresh_bilibili_dynamics()
+            elif version and version != bilibili_cache.snapshot.version:
+                shared = await asyncio.to_thread(load_shared_snapshot)
+                if shared:
+                    bilibili_cache.set_snapshot(shared)
+        except CircuitOpen as exc:
+            logging.warning("跳过本次 B 站动态刷新: %s", exc)
         except Exception as exc:  # pragma: no cover
             logging.exception("刷新 B 站动态失败: %s", exc)
-        await asyncio.sleep(POLL_INTERVAL)
-
-
-def serialize_task(task: models.Task, current_user: Optional[models.User]) -> TaskResponse:
-    tags = task.tags.split(",") if task.tags else []
-    accepted_count = len(task.acceptances)
-    is_accepted = False
-    if current_user:
-        is_accepted = any(acc.user_id == current_user.id for acc in task.acceptances)
-
-    publisher_name = task.publisher.nickname or task.publisher.username if task.publisher else "未知"
-
-    return TaskResponse(
-        id=task.id,
-        title=task.title,
-        description=task.description,
-        type=task.type,
-        priority=task.priority,
-        max_accept_count=task.max_accept_count,
-        deadline=task.deadline,
-        tags=tags,
-        status=task.status,
-        publisher_id=task.publisher_id,
-        publisher_name=publisher_name,
-        accepted_count=accepted_count,
-        created_at=task.created_at,
-        is_accepted=is_accepted,
-    )
+        await asyncio.sleep(SHARED_POLL_INTERVAL)
 
 
 @app.on_event("startup")
 async def on_startup():
+    password_hasher.start()
     if not bilibili_cache:
         try:
             await refresh_bilibili_dynamics()
         except Exception as exc:
             logging.warning("初始化 B 站动态失败，将使用缓存（若存在）：%s", exc)
     asyncio.create_task(refresh_bilibili_dynamics_periodically())
+    try:
+        await asyncio.to_thread(build_task_board)
+    except Exception as exc:
+        logging.warning("构建任务看板失败，将在首次请求时重试：%s", exc)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    password_hasher.shutdown()
+    if write_queue is not None:
+        await asyncio.to_thread(write_queue.shutdown)
+    await bilibili_client.aclose()
+    feed_leader.release()
+
+
+# 以下同步函数由接口经一次 run_db 调用：sync 模式下每次 run_db 都要进出一次线程池，
+# 一个请求的数据库操作应合并到一次调用中
+
+
+def refresh_task_board(db: Session) -> bool:
+    """把任务看板追赶到数据库当前版本；失败时只记录日志，列表请求改走 SQL 查询"""
+    try:
+        task_board.refresh(db)
+    except Exception as exc:
+        logging.warning("更新任务看板失败: %s", exc)
+        return False
+    return True
+
+
+def write_task(db: Session, fn, *args):
+    """执行写操作 fn（其自身提交）后追赶看板"""
+    result = fn(db, *args)
+    refresh_task_board(db)
+    return result
+
+
+async def run_task_write(db: DbSession, fn, *args):
+    """执行任务写操作，提交后把变更同步到任务看板，同一 worker 的后续列表请求无需再查询"""
+    if write_queue is None:
+        return await run_db(db, write_task, fn, *args)
+    # 合并写入时由写线程执行并提交，提交后再在本 worker 的会话中追赶看板
+    result = await run_write(db, fn, *args)
+    await run_db(db, refresh_task_board)
+    return result
+
+
+def page_response(items: List[Any], next_cursor: Optional[str], etag: str) -> Response:
+    headers = sync.list_headers(etag)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(items, headers)
+
+
+def read_unless_modified(db: Session, request: Request, current_user: Principal, fn, *args) -> Response:
+    """
+    读取全局版本号，与 If-None-Match 匹配时返回 304，否则执行 fn(db, *args) 并附带 ETag 返回
+
+    fn 返回列表，或 (列表, 下一页游标)。
+    """
+    etag = sync.list_etag(db, current_user)
+    if cached := sync.not_modified(request, etag):
+        return cached
+    result = fn(db, *args)
+    items, next_cursor = result if isinstance(result, tuple) else (result, None)
+    return page_response(items, next_cursor, etag)
+
+
+def list_task_page(
+    db: Session,
+    request: Request,
+    current_user: Principal,
+    scope: str,
+    limit: int,
+    cursor: Optional[str],
+    filters: tasks.TaskFilters,
+    sort: str,
+) -> Response:
+    revision = tasks.current_revision(db)
+    etag = sync.revision_etag(revision, current_user)
+    if cached := sync.not_modified(request, etag):
+        return cached
+    # 看板落后于数据库（启动时构建失败或其他 worker 的写入）时先增量追赶；仍然落后或追赶失败时改走 SQL，
+    # 不能以 ETag 对应的版本号返回旧内容
+    if task_board.serves(scope, filters, sort) and (
+        task_board.is_current(revision) or (refresh_task_board(db) and task_board.is_current(revision))
+    ):
+        items, next_cursor = task_board.page(current_user, limit, cursor)
+    else:
+        items, next_cursor = tasks.list_tasks(db, current_user, scope, limit, cursor, filters, sort)
+    return page_response(items, next_cursor, etag)
+
+
+def register_user(db: Session, user: UserCreate, password_hash: str) -> Optional[models.User]:
+    """用户名已存在时返回 None"""
+    if get_user_by_username(db, user.username):
+        return None
+    db_user = models.User(
+        username=user.username, nickname=user.nickname or user.username, password_hash=password_hash
+    )
+    try:
+        save_user(db, db_user)
+    except IntegrityError:
+        # 并发注册同一用户名
+        db.rollback()
+        return None
+    return db_user
+
+
+def save_profile(db: Session, user: models.User, nickname_changed: bool) -> None:
+    if nickname_changed:
+        # 任务中的发布者名称随之变化，与资料在同一事务中提交
+        tasks.touch_published_tasks(db, user.id)
+    save_user(db, user)
+    refresh_task_board(db)
 
 
 @app.get("/")
@@ -127,274 +287,258 @@ async def favicon():
 
 
 @app.post("/auth/register", response_model=Token)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    if get_user_by_username(db, user.username):
+async def register(user: UserCreate, db: DbSession = Depends(get_db)):
+    # 先计算哈希，查重与写入合并为一次数据库调用
+    password_hash = await password_hasher.hash(user.password)
+    db_user = await run_db(db, register_user, user, password_hash)
+    if db_user is None:
         raise HTTPException(status_code=400, detail="用户名已存在")
-    db_user = models.User(
-        username=user.username,
-        nickname=user.nickname or user.username,
-        password_hash=hash_password(user.password),
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
     access_token = create_access_token({"sub": db_user.username})
     return Token(access_token=access_token)
 
 
 @app.post("/auth/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: DbSession = Depends(get_db)):
+    user = await run_db(db, get_user_by_username, form_data.username)
+    if not user:
+        raise HTTPException(status_code=400, detail="用户名或密码错误")
+    valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=400, detail="用户名或密码错误")
+    if new_hash:
+        user.password_hash = new_hash
+        await run_db(db, save_user, user)
     access_token = create_access_token({"sub": user.username})
     return Token(access_token=access_token)
 
 
 @app.get("/auth/me", response_model=UserPublic)
-def get_profile(current_user: models.User = Depends(get_current_user)):
-    return UserPublic(
-        id=current_user.id,
-        username=current_user.username,
-        nickname=current_user.nickname,
-        avatar=current_user.avatar,
-        qq=current_user.qq,
-        created_at=current_user.created_at,
-    )
+async def get_profile(current_user: Principal = Depends(get_current_principal)):
+    return json_response(user_payload(current_user))
 
 
 @app.put("/auth/me", response_model=UserPublic)
-def update_profile(
+async def update_profile(
     profile: UserProfileUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    if profile.nickname is not None:
+    nickname_changed = profile.nickname is not None and profile.nickname != current_user.nickname
+    if nickname_changed:
         current_user.nickname = profile.nickname
     if profile.avatar is not None:
         current_user.avatar = profile.avatar
     if profile.qq is not None:
         current_user.qq = profile.qq
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return UserPublic(
-        id=current_user.id,
-        username=current_user.username,
-        nickname=current_user.nickname,
-        avatar=current_user.avatar,
-        qq=current_user.qq,
-        created_at=current_user.created_at,
-    )
+    await run_db(db, save_profile, current_user, nickname_changed)
+    principal_cache.invalidate_user(current_user.id)
+    return json_response(user_payload(current_user))
 
 
 @app.post("/auth/change-password", status_code=204)
-def change_password(
+async def change_password(
     payload: PasswordChange,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    if not verify_password(payload.old_password, current_user.password_hash):
+    if not await password_hasher.verify(payload.old_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="原密码不正确")
-    current_user.password_hash = hash_password(payload.new_password)
-    db.add(current_user)
-    db.commit()
+    current_user.password_hash = await password_hasher.hash(payload.new_password)
+    await run_db(db, save_user, current_user)
+    principal_cache.invalidate_user(current_user.id)
+
+
+@app.get("/auth/cache/status")
+async def get_auth_cache_status(current_user: Principal = Depends(get_current_principal)):
+    return principal_cache.stats()
 
 
+# 任务接口保留 response_model 用于生成 OpenAPI，实际返回已编码的 JSON，跳过 FastAPI 的二次校验
 @app.get("/tasks", response_model=List[TaskResponse])
-def list_tasks(
+async def list_tasks(
+    request: Request,
     scope: str = Query("available", pattern="^(available|my)$"),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    tag: Optional[List[str]] = Query(None, description="可重复传入多个标签"),
+    match: str = Query("all", pattern="^(all|any)$", description="all: 包含全部标签；any: 包含任一标签"),
+    task_type: Optional[str] = Query(None, alias="type", pattern="^(personal|team)$"),
+    task_status: Optional[str] = Query(
+        None, alias="status", pattern="^(available|inProgress|completed)$",
+        description="available 范围下默认为 available；my 范围下默认不限",
+    ),
+    priority_min: Optional[int] = Query(None, ge=1, le=4),
+    priority_max: Optional[int] = Query(None, ge=1, le=4),
+    deadline_from: Optional[datetime] = Query(None),
+    deadline_to: Optional[datetime] = Query(None),
+    sort: str = Query(
+        "created_at", pattern="^(created_at|priority|deadline)$",
+        description="created_at、priority 为降序；deadline 为升序，无截止时间的排在最后",
+    ),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    if scope == "my":
-        tasks = (
-            db.query(models.Task)
-            .join(models.TaskAcceptance)
-            .filter(models.TaskAcceptance.user_id == current_user.id)
-            .order_by(models.Task.created_at.desc())
-            .all()
-        )
-    else:
-        tasks = (
-            db.query(models.Task)
-            .filter(models.Task.status == "available")
-            .order_by(models.Task.created_at.desc())
-            .all()
-        )
-    return [serialize_task(task, current_user) for task in tasks]
+    filters = tasks.TaskFilters(
+        type=task_type,
+        status=task_status,
+        priority_min=priority_min,
+        priority_max=priority_max,
+        deadline_from=deadline_from,
+        deadline_to=deadline_to,
+        tags=tuple(tag or ()),
+        match=match,
+    )
+    return await run_db(db, list_task_page, request, current_user, scope, limit, cursor, filters, sort)
+
+
+@app.get("/tasks/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    task_status: Optional[str] = Query(None, alias="status", pattern="^(available|inProgress|completed)$"),
+    limit: int = Query(TASK_PAGE_SIZE, ge=1, le=TASK_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return await run_db(
+        db, read_unless_modified, request, current_user,
+        search.search_tasks, current_user, q, limit, cursor, task_status,
+    )
+
+
+@app.get("/tasks/tags", response_model=List[TagFacet])
+async def list_task_tags(
+    request: Request,
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return await run_db(db, read_unless_modified, request, current_user, tasks.tag_facets)
+
+
+@app.get("/tasks/calendar", response_model=List[CalendarDay])
+async def task_calendar(
+    request: Request,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to", description="含当天，与 from 相差不超过一年"),
+    top: int = Query(calendar.CALENDAR_TOP, ge=1, le=calendar.CALENDAR_TOP_MAX, description="每天返回的任务数"),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return await run_db(
+        db, read_unless_modified, request, current_user, calendar.task_calendar, current_user, start, end, top
+    )
+
+
+@app.get("/tasks/changes", response_model=TaskChanges)
+async def task_changes(
+    since: int = Query(0, ge=0, description="上次同步返回的 revision，首次同步传 0"),
+    limit: int = Query(sync.CHANGES_PAGE_SIZE, ge=1, le=sync.CHANGES_PAGE_SIZE_MAX),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return json_response(await run_db(db, sync.task_changes, current_user, since, limit))
 
 
 @app.post("/tasks", response_model=TaskResponse)
-def create_task(
+async def create_task(
     task: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    max_accept = task.max_accept_count
-    if task.type == "personal":
-        max_accept = 1
-
-    db_task = models.Task(
-        title=task.title,
-        description=task.description,
-        type=task.type,
-        priority=task.priority,
-        max_accept_count=max_accept,
-        deadline=task.deadline,
-        tags=",".join(task.tags) if task.tags else None,
-        publisher_id=current_user.id,
-    )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
-    return serialize_task(db_task, current_user)
+    return json_response(await run_task_write(db, tasks.create_task, task, current_user))
+
+
+@app.post("/tasks/batch", response_model=List[TaskBatchResult])
+async def batch_tasks(
+    batch_request: TaskBatchRequest,
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    return json_response(await run_task_write(db, batch.run_batch, batch_request.operations, current_user))
 
 
 @app.get("/tasks/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="任务不存在")
-    return serialize_task(task, current_user)
+    return json_response(await run_db(db, tasks.get_task, task_id, current_user))
 
 
 @app.put("/tasks/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="任务不存在")
-    if task.publisher_id != current_user.id:
-        raise HTTPException(status_code=403, detail="无权修改此任务")
-
-    for field, value in task_update.model_dump(exclude_unset=True).items():
-        if field == "tags" and value is not None:
-            setattr(task, "tags", ",".join(value))
-        else:
-            setattr(task, field, value)
-
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    return serialize_task(task, current_user)
+    return json_response(await run_task_write(db, tasks.update_task, task_id, task_update, current_user))
 
 
 @app.delete("/tasks/{task_id}", status_code=204)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="任务不存在")
-    if task.publisher_id != current_user.id:
-        raise HTTPException(status_code=403, detail="无权删除此任务")
-    db.delete(task)
-    db.commit()
+    await run_task_write(db, tasks.delete_task, task_id, current_user)
 
 
 @app.post("/tasks/{task_id}/accept", response_model=TaskResponse)
-def accept_task(
+async def accept_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="任务不存在")
-
-    if any(acc.user_id == current_user.id for acc in task.acceptances):
-        raise HTTPException(status_code=400, detail="你已接取该任务")
-
-    if len(task.acceptances) >= task.max_accept_count:
-        raise HTTPException(status_code=400, detail="任务接取人数已满")
-
-    acceptance = models.TaskAcceptance(task_id=task.id, user_id=current_user.id)
-    task.status = "inProgress"
-    db.add(acceptance)
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    return serialize_task(task, current_user)
+    return json_response(await run_task_write(db, tasks.accept_task, task_id, current_user))
 
 
 @app.post("/tasks/{task_id}/complete", response_model=TaskResponse)
-def complete_task(
+async def complete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    acceptance = (
-        db.query(models.TaskAcceptance)
-        .filter(
-            models.TaskAcceptance.task_id == task_id,
-            models.TaskAcceptance.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not acceptance:
-        raise HTTPException(status_code=404, detail="你尚未接取此任务")
-    acceptance.status = "completed"
-    db.add(acceptance)
-
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if task:
-        if all(acc.status == "completed" for acc in task.acceptances):
-            task.status = "completed"
-        db.add(task)
-
-    db.commit()
-    if task:
-        db.refresh(task)
-        return serialize_task(task, current_user)
-    raise HTTPException(status_code=404, detail="任务不存在")
+    return json_response(await run_task_write(db, tasks.complete_task, task_id, current_user))
 
 
 @app.post("/tasks/{task_id}/abandon", response_model=TaskResponse)
-def abandon_task(
+async def abandon_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    acceptance = (
-        db.query(models.TaskAcceptance)
-        .filter(
-            models.TaskAcceptance.task_id == task_id,
-            models.TaskAcceptance.user_id == current_user.id,
-        )
-        .first()
-    )
-    if not acceptance:
-        raise HTTPException(status_code=404, detail="你尚未接取此任务")
+    return json_response(await run_task_write(db, tasks.abandon_task, task_id, current_user))
 
-    db.delete(acceptance)
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if task:
-        if not task.acceptances or len(task.acceptances) <= 1:
-            task.status = "available"
-        db.add(task)
 
-    db.commit()
-    if task:
-        db.refresh(task)
-        return serialize_task(task, current_user)
-    raise HTTPException(status_code=404, detail="任务不存在")
+@app.get("/bilibili/dynamics")
+async def get_bilibili_dynamics(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=DYNAMICS_PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None),
+):
+    # 带分页参数时从数据库浏览历史，否则返回内存中的最新动态
+    if limit is not None or cursor:
+        items, next_cursor = await asyncio.to_thread(load_stored_dynamics, limit or FEED_SIZE, cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return items
+    try:
+        return await bilibili_cache.respond(request)
+    except CircuitOpen as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="B 站动态暂不可用，请稍后重试",
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+    except Exception as exc:
+        logging.warning("获取 B 站动态失败: %r", exc)
+        raise HTTPException(status_code=502, detail="获取 B 站动态失败")
 
 
-@app.get("/bilibili/dynamics")
-async def get_bilibili_dynamics():
-    async with cache_lock:
-        cached = bilibili_cache.copy()
-    if cached:
-        return cached
-    return await refresh_bilibili_dynamics()
\ No newline at end of file
+@app.get("/bilibili/dynamics/status")
+async def get_bilibili_dynamics_status():
+    return bilibili_cache.status()
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""
+测试共用的 fixture：每个测试使用临时目录下独立的、已执行迁移的 SQLite 文件数据库
+
+    cd backend && python -m pytest -q
+"""
+import os
+from typing import Callable, Dict, Iterator, List
+
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi.testclient import TestClient  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+from sqlalchemy.orm import Session, sessionmaker  # pyright: ignore[reportMissingImports]
+
+from bench import common
+from core.auth import Principal, create_access_token
+
+
+@pytest.fixture
+def engine(tmp_path) -> Iterator[Engine]:
+    test_engine = common.migrated_engine(f"sqlite:///{tmp_path}/test.db")
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: Engine) -> sessionmaker:
+    return common.session_factory(engine)
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker) -> Iterator[Session]:
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def add_users(engine: Engine) -> Callable[[int], List[Principal]]:
+    """add_users(n) 创建 n 个用户并返回其 Principal，用户名不与之前创建的重复"""
+    created = 0
+
+    def add(count: int) -> List[Principal]:
+        nonlocal created
+        names = [f"user{created + i}" for i in range(count)]
+        created += count
+        return common.add_users(engine, *names)
+
+    return add
+
+
+@pytest.fixture
+def client(session_factory: sessionmaker, monkeypatch) -> Iterator[TestClient]:
+    """
+    接口测试用的客户端：get_db 改为测试数据库的会话
+
+    不运行 startup（不启动哈希进程池与 B 站动态轮询）；任务看板与认证缓存在每个测试中重新开始。
+    """
+    # 导入 main 时不迁移默认的 hxkterminal.db
+    os.environ.setdefault("DB_AUTO_MIGRATE", "0")
+    import main
+    from core.board import TaskBoard
+    from core.database import get_db
+
+    def test_db() -> Iterator[Session]:
+        with session_factory() as session:
+            yield session
+
+    main.app.dependency_overrides[get_db] = test_db
+    monkeypatch.setattr(main, "task_board", TaskBoard())
+    main.principal_cache.clear()
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.pop(get_db, None)
+        main.principal_cache.clear()
+
+
+@pytest.fixture
+def auth_headers() -> Callable[[Principal], Dict[str, str]]:
+    """auth_headers(user) 返回该用户的 Authorization 请求头"""
+
+    def headers(user: Principal) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {create_access_token({'sub': user.username})}"}
+
+    return headers
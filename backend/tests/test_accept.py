@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+
+from core import models, tasks
+from core.database import query_plan
+from core.migrations import check_query_plans, hot_queries
+from core.schemas import TaskCreate
+
+
+def publish(db, publisher, **fields):
+    values = {"title": "任务", "description": "描述", "type": "team", "max_accept_count": 3, **fields}
+    return tasks.create_task(db, TaskCreate(**values), publisher)
+
+
+@pytest.mark.parametrize("capacity", [1, 5, 20, 60])
+def test_concurrent_accepts_never_exceed_capacity(session_factory, add_users, capacity):
+    principals = add_users(40)
+    with session_factory() as db:
+        task_id = publish(db, principals[0], max_accept_count=capacity)["id"]
+
+    barrier = threading.Barrier(len(principals))
+    outcomes = []
+    lock = threading.Lock()
+
+    def attempt(principal):
+        barrier.wait(timeout=10)
+        with session_factory() as db:
+            try:
+                tasks.accept_task(db, task_id, principal)
+                outcome = "accepted"
+            except HTTPException as exc:
+                outcome = exc.detail
+        with lock:
+            outcomes.append(outcome)
+
+    with ThreadPoolExecutor(max_workers=len(principals)) as executor:
+        list(executor.map(attempt, principals))
+
+    with session_factory() as db:
+        user_ids = [
+            user_id for (user_id,) in
+            db.query(models.TaskAcceptance.user_id).filter(models.TaskAcceptance.task_id == task_id)
+        ]
+        accepted_count, _ = tasks.get_acceptance_stats(db, task_id, None)
+    expected = min(capacity, len(principals))
+    assert outcomes.count("accepted") == expected
+    assert outcomes.count("任务接取人数已满") == len(principals) - expected
+    assert len(user_ids) == len(set(user_ids)) == accepted_count == expected
+
+
+def test_duplicate_accept_is_rejected(db, add_users):
+    publisher, user = add_users(2)
+    task_id = publish(db, publisher)["id"]
+
+    accepted = tasks.accept_task(db, task_id, user)
+    assert accepted["is_accepted"] and accepted["accepted_count"] == 1
+    with pytest.raises(HTTPException) as exc:
+        tasks.accept_task(db, task_id, user)
+    assert exc.value.status_code == 400 and exc.value.detail == "你已接取该任务"
+    assert tasks.get_acceptance_stats(db, task_id, user.id) == (1, True)
+
+
+def test_full_task_is_rejected(db, add_users):
+    publisher, first, second, third = add_users(4)
+    task_id = publish(db, publisher, max_accept_count=2)["id"]
+
+    tasks.accept_task(db, task_id, first)
+    tasks.accept_task(db, task_id, second)
+    with pytest.raises(HTTPException) as exc:
+        tasks.accept_task(db, task_id, third)
+    assert exc.value.status_code == 400 and exc.value.detail == "任务接取人数已满"
+    assert tasks.get_acceptance_stats(db, task_id, third.id) == (2, False)
+
+
+def test_personal_task_takes_one_acceptor(db, add_users):
+    publisher, first, second = add_users(3)
+    task_id = publish(db, publisher, type="personal", max_accept_count=5)["id"]
+
+    tasks.accept_task(db, task_id, first)
+    with pytest.raises(HTTPException) as exc:
+        tasks.accept_task(db, task_id, second)
+    assert exc.value.detail == "任务接取人数已满"
+
+
+def test_missing_task_is_404(db, add_users):
+    (user,) = add_users(1)
+    with pytest.raises(HTTPException) as exc:
+        tasks.accept_task(db, 12345, user)
+    assert exc.value.status_code == 404
+
+
+def test_query_plans_have_no_table_scans(engine):
+    assert check_query_plans(engine) == []
+
+
+@pytest.mark.parametrize("name, index", [
+    ("available_list", "ix_tasks_status_created_at"),
+    ("available_list_cursor", "ix_tasks_status_created_at"),
+    ("my_list", "ix_task_acceptances_user_task"),
+    ("accept", "uq_task_acceptances_task_user"),
+    ("acceptance_counts", "uq_task_acceptances_task_user"),
+    ("task_calendar", "ix_tasks_deadline_day"),
+    ("dynamics_history", "ix_bilibili_dynamics_pub_ts_id"),
+])
+def test_hot_queries_use_expected_index(db, name, index):
+    statement = dict(hot_queries(db))[name]
+    plan = query_plan(db, statement)
+    assert any(f"INDEX {index} " in f"{detail} " for detail in plan), plan
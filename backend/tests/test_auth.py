@@ -0,0 +1,42 @@
+import time
+
+from core.auth import Principal, PrincipalCache
+
+
+def principal(user_id):
+    return Principal(id=user_id, username=f"user{user_id}", nickname="昵称", avatar=None, qq=None, created_at=None)
+
+
+def test_stats_count_hits_misses_and_entries():
+    cache = PrincipalCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.put("a", principal(1))
+    cache.put("b", principal(2))
+    assert cache.get("a") == principal(1)
+    cache.put("c", principal(3))  # 淘汰最久未使用的 b
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "ttl": 60, "hits": 1, "misses": 2}
+
+
+def test_entries_expire_with_the_token_and_on_invalidate():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.put("expired", principal(1), token_exp=time.time() - 1)
+    cache.put("a", principal(1))
+    cache.put("b", principal(1))
+    cache.put("c", principal(2))
+    assert cache.get("expired") is None
+    cache.invalidate_user(1)
+    assert cache.get("a") is None and cache.get("c") == principal(2)
+    assert cache.stats()["size"] == 1
+
+
+def test_cache_status_requires_login(client, add_users, auth_headers):
+    (user,) = add_users(1)
+    headers = auth_headers(user)
+    assert client.get("/auth/cache/status").status_code == 401
+
+    response = client.get("/auth/cache/status", headers=headers)
+    assert response.status_code == 200
+    # 本次请求的认证未命中缓存，之后写入一项
+    assert response.json()["size"] == 1 and response.json()["misses"] == 1
+    assert client.get("/auth/cache/status", headers=headers).json()["hits"] == 1
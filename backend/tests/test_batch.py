@@ -0,0 +1,129 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from core import batch, models, tasks
+from core.schemas import TaskBatchOperation, TaskCreate
+
+
+def body(title="任务", **fields):
+    return TaskCreate(**{"title": title, "description": "描述", "type": "team", "max_accept_count": 2, **fields})
+
+
+def run(db, user, *operations):
+    return batch.run_batch(db, [TaskBatchOperation(**operation) for operation in operations], user)
+
+
+def outcomes(results):
+    return [(result["status_code"], result["detail"]) for result in results]
+
+
+def test_failed_items_match_single_endpoints_and_keep_the_rest(db, add_users):
+    organizer, member, other = add_users(3)
+    full = tasks.create_task(db, body("已满", max_accept_count=1), organizer)["id"]
+    tasks.accept_task(db, full, other)
+    open_ = tasks.create_task(db, body("可接取"), organizer)["id"]
+
+    results = run(
+        db, member,
+        {"op": "accept", "task_id": full},
+        {"op": "accept", "task_id": 9999},
+        {"op": "accept", "task_id": open_},
+        {"op": "accept", "task_id": open_},
+        {"op": "abandon", "task_id": full},
+        {"op": "update", "task_id": open_, "changes": {"title": "改名"}},
+        {"op": "delete", "task_id": open_},
+        {"op": "complete", "task_id": open_},
+    )
+    assert outcomes(results) == [
+        (400, "任务接取人数已满"),
+        (404, "任务不存在"),
+        (200, None),
+        (400, "你已接取该任务"),
+        (404, "你尚未接取此任务"),
+        (403, "无权修改此任务"),
+        (403, "无权删除此任务"),
+        (200, None),
+    ]
+    db.expire_all()
+    assert tasks.get_acceptance_stats(db, open_, member.id) == (1, True)
+    assert results[-1]["task"]["status"] == "completed" and results[-1]["task"]["is_accepted"]
+
+
+def test_each_item_takes_its_own_revision(db, add_users):
+    (organizer,) = add_users(1)
+    before = tasks.current_revision(db)
+    results = run(
+        db, organizer,
+        {"op": "create", "task": body("一")},
+        {"op": "create", "task": body("二")},
+        {"op": "create", "task": body("三")},
+    )
+    created = [result["task"]["id"] for result in results]
+    results = run(db, organizer, {"op": "update", "task_id": created[0], "changes": {"priority": 4}},
+                  {"op": "delete", "task_id": created[1]})
+
+    assert tasks.current_revision(db) == before + 5
+    revisions = dict(db.query(models.Task.id, models.Task.revision).all())
+    tombstones = dict(db.query(models.TaskTombstone.task_id, models.TaskTombstone.revision).all())
+    assert revisions == {created[0]: before + 4, created[2]: before + 3}
+    assert tombstones == {created[1]: before + 5}
+
+
+@pytest.mark.parametrize("op", ["complete", "abandon"])
+def test_repeated_task_ids_apply_once(db, add_users, op):
+    organizer, member = add_users(2)
+    task_id = tasks.create_task(db, body(), organizer)["id"]
+    tasks.accept_task(db, task_id, member)
+    before = tasks.current_revision(db)
+
+    results = run(db, member, {"op": op, "task_id": task_id}, {"op": op, "task_id": task_id})
+    assert outcomes(results) == [(200, None), (404, "你尚未接取此任务")]
+    # 只有第一项生效，任务取第一项预留的版本号
+    db.expire_all()
+    assert db.get(models.Task, task_id).revision == before + 1
+
+
+def test_batch_rolls_back_as_a_whole(db, add_users, monkeypatch):
+    organizer, member = add_users(2)
+    task_id = tasks.create_task(db, body(), organizer)["id"]
+    before = tasks.current_revision(db)
+
+    def fail(*args):
+        raise RuntimeError("模拟中途失败")
+
+    monkeypatch.setitem(batch._HANDLERS, "abandon", fail)
+    with pytest.raises(RuntimeError):
+        run(
+            db, member,
+            {"op": "create", "task": body("不应保留")},
+            {"op": "accept", "task_id": task_id},
+            {"op": "abandon", "task_id": task_id},
+        )
+    db.rollback()
+
+    assert db.query(models.Task).count() == 1
+    assert tasks.get_acceptance_stats(db, task_id, member.id) == (0, False)
+    assert tasks.current_revision(db) == before
+
+
+def test_concurrent_batches_respect_capacity(session_factory, add_users):
+    organizer, *members = add_users(9)
+    with session_factory() as db:
+        task_ids = [tasks.create_task(db, body(f"任务 {i}", max_accept_count=3), organizer)["id"] for i in range(5)]
+
+    barrier = threading.Barrier(len(members))
+
+    def accept_all(member):
+        barrier.wait(timeout=10)
+        with session_factory() as db:
+            return run(db, member, *({"op": "accept", "task_id": task_id} for task_id in task_ids))
+
+    with ThreadPoolExecutor(max_workers=len(members)) as executor:
+        results = list(executor.map(accept_all, members))
+
+    with session_factory() as db:
+        for position, task_id in enumerate(task_ids):
+            accepted = sum(result[position]["status_code"] == 200 for result in results)
+            assert accepted == tasks.get_acceptance_stats(db, task_id, None)[0] == 3
@@ -0,0 +1,117 @@
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from bench.common import insert_acceptances, insert_tasks
+from core import tasks
+from core.board import TaskBoard
+from core.schemas import TaskCreate, TaskUpdate
+from core.tasks import TaskFilters
+
+
+@pytest.fixture
+def users(engine, add_users):
+    rng = random.Random(0)
+    principals = add_users(3)
+    start = datetime(2030, 1, 1)
+    count = 120
+    insert_tasks(engine, (
+        {
+            "title": f"任务 {i}",
+            # 每三个任务发布时间相同，由 id 决定次序
+            "created_at": str(start + timedelta(minutes=i // 3)),
+            "status": rng.choices(["available", "inProgress", "completed"], [6, 2, 2])[0],
+        }
+        for i in range(count)
+    ))
+    for principal in principals[1:]:
+        insert_acceptances(engine, principal.id, rng.sample(range(1, count + 1), 30))
+    return principals
+
+
+def all_pages(list_page, user, limit):
+    pages, cursor = [], None
+    while True:
+        page = list_page(user, limit, cursor)
+        pages.append(page)
+        cursor = page[1]
+        if not cursor:
+            return pages
+
+
+def assert_matches_sql(db, board, users, limit=7):
+    def sql_page(user, limit, cursor):
+        return tasks.list_tasks(db, user, "available", limit, cursor)
+
+    db.expire_all()
+    for user in users:
+        assert all_pages(board.page, user, limit) == all_pages(sql_page, user, limit)
+
+
+def body(title):
+    return TaskCreate(title=title, description="描述", type="team", max_accept_count=2)
+
+
+def test_pages_match_sql(db, users):
+    board = TaskBoard()
+    board.refresh(db)
+    for limit in (1, 7, 50, 200):
+        assert_matches_sql(db, board, users, limit)
+
+
+def test_refresh_follows_writes(db, users):
+    organizer, first, second = users
+    board = TaskBoard()
+    board.refresh(db)
+
+    created = tasks.create_task(db, body("新任务"), organizer)["id"]
+    other = tasks.create_task(db, body("另一个"), organizer)["id"]
+    tasks.update_task(db, 1, TaskUpdate(title="改名", priority=4), organizer)
+    tasks.accept_task(db, created, first)
+    tasks.accept_task(db, created, second)  # 接满后不再可接取
+    tasks.accept_task(db, other, first)
+    tasks.complete_task(db, other, first)
+    tasks.delete_task(db, 2, organizer)
+    assert not board.is_current(tasks.current_revision(db))
+
+    board.refresh(db)
+    assert board.is_current(tasks.current_revision(db))
+    assert_matches_sql(db, board, users)
+
+    tasks.abandon_task(db, created, second)  # 重新变为可接取
+    board.refresh(db)
+    assert_matches_sql(db, board, users)
+
+
+def test_concurrent_refreshes_converge(session_factory, users):
+    organizer, first, _ = users
+    board = TaskBoard()
+    with session_factory() as db:
+        board.refresh(db)
+
+    def write(index):
+        with session_factory() as db:
+            task_id = tasks.create_task(db, body(f"并发 {index}"), organizer)["id"]
+            if index % 2:
+                tasks.accept_task(db, task_id, first)
+            board.refresh(db)
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    with session_factory() as db:
+        assert board.is_current(tasks.current_revision(db))
+        assert_matches_sql(db, board, users)
+
+
+def test_serves_only_the_default_listing():
+    assert TaskBoard.serves("available", TaskFilters(), "created_at")
+    assert TaskBoard.serves("available", TaskFilters(status="available"), "created_at")
+    assert not TaskBoard.serves("my", TaskFilters(), "created_at")
+    assert not TaskBoard.serves("available", TaskFilters(), "deadline")
+    assert not TaskBoard.serves("available", TaskFilters(priority_min=3), "created_at")
@@ -0,0 +1,74 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import text  # pyright: ignore[reportMissingImports]
+
+from bench.common import insert_acceptances, insert_tasks
+from core.calendar import task_calendar
+
+# 对照实现：窗口函数对范围内的任务按天计数、排名
+WINDOWED = text(
+    "SELECT * FROM (SELECT date(deadline) AS day, count(*) OVER (PARTITION BY date(deadline)), id, "
+    "row_number() OVER (PARTITION BY date(deadline) ORDER BY priority DESC, deadline, id) AS rn "
+    "FROM tasks WHERE date(deadline) >= :start AND date(deadline) <= :end AND (status = 'available' "
+    "OR EXISTS (SELECT 1 FROM task_acceptances WHERE task_id = tasks.id AND user_id = :user_id))) "
+    "WHERE rn <= :top ORDER BY day, rn"
+)
+
+
+@pytest.fixture
+def users(engine, add_users):
+    rng = random.Random(0)
+    principals = add_users(2)
+    start = datetime(2030, 3, 1)
+    count = 2000
+    insert_tasks(engine, (
+        {
+            "title": f"任务 {i}",
+            "priority": rng.randint(1, 4),
+            # 截止时间取整点，同一天内常有优先级与截止时间都相同的任务，由 id 决定次序
+            "deadline": None if rng.random() < 0.1 else str(start + timedelta(hours=rng.randrange(60 * 24))) + ".000000",
+            "status": rng.choices(["available", "inProgress", "completed"], [6, 2, 2])[0],
+        }
+        for i in range(count)
+    ))
+    for principal in principals:
+        insert_acceptances(engine, principal.id, rng.sample(range(1, count + 1), 150))
+    return principals
+
+
+@pytest.mark.parametrize("start, end, top", [
+    (date(2030, 3, 1), date(2030, 3, 1), 3),
+    (date(2030, 3, 4), date(2030, 3, 10), 3),
+    (date(2030, 2, 20), date(2030, 4, 10), 1),
+    (date(2030, 3, 1), date(2030, 4, 29), 10),
+])
+def test_matches_window_function(db, users, start, end, top):
+    for user in users:
+        days = task_calendar(db, user, start, end, top)
+        params = {"start": start.isoformat(), "end": end.isoformat(), "top": top, "user_id": user.id}
+        expected = [tuple(row[:3]) for row in db.execute(WINDOWED, params)]
+        actual = [(day["date"], day["count"], task["id"]) for day in days for task in day["tasks"]]
+        assert actual == expected
+
+
+def test_is_accepted_is_per_user(db, users):
+    first, second = users
+    accepted = {
+        task_id for (task_id,) in db.execute(
+            text("SELECT task_id FROM task_acceptances WHERE user_id = :user_id"), {"user_id": first.id}
+        )
+    }
+    for day in task_calendar(db, first, date(2030, 3, 1), date(2030, 4, 29), 10):
+        for task in day["tasks"]:
+            assert task["is_accepted"] == (task["id"] in accepted)
+            assert task["status"] == "available" or task["is_accepted"]
+
+
+def test_rejects_invalid_range(db, users):
+    with pytest.raises(HTTPException):
+        task_calendar(db, users[0], date(2030, 3, 2), date(2030, 3, 1))
+    with pytest.raises(HTTPException):
+        task_calendar(db, users[0], date(2030, 1, 1), date(2031, 1, 2))
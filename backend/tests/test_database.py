@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from core import tasks
+from core.schemas import TaskCreate
+
+
+@pytest.fixture
+def run_db_calls(monkeypatch):
+    """记录接口调用 run_db 的次数；sync 模式下每次调用都要进出一次线程池"""
+    import main
+    from core import database, write_queue
+
+    calls = []
+
+    async def counted(db, fn, *args):
+        calls.append(fn.__name__)
+        return await database.run_db(db, fn, *args)
+
+    # 写接口经 write_queue.run_write 间接调用 run_db
+    for module in (main, write_queue):
+        monkeypatch.setattr(module, "run_db", counted)
+    return calls
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("get", "/tasks", None),
+    ("get", "/tasks?sort=priority&type=team", None),
+    ("get", "/tasks/search?q=任务", None),
+    ("get", "/tasks/tags", None),
+    ("get", f"/tasks/calendar?from={date(2030, 1, 1)}&to={date(2030, 1, 31)}", None),
+    ("get", "/tasks/changes?since=0", None),
+    ("get", "/tasks/1", None),
+    ("post", "/tasks", {"title": "新任务", "description": "描述", "type": "team"}),
+    ("put", "/tasks/1", {"priority": 4}),
+    ("post", "/tasks/1/accept", None),
+    ("post", "/tasks/batch", {"operations": [{"op": "accept", "task_id": 1}]}),
+    ("put", "/auth/me", {"nickname": "新昵称"}),
+])
+def test_each_endpoint_makes_one_run_db_call(client, db, add_users, auth_headers, run_db_calls, method, path, body):
+    (user,) = add_users(1)
+    tasks.create_task(db, TaskCreate(title="任务", description="描述", type="team", tags=["标签"]), user)
+    headers = auth_headers(user)
+    client.get("/auth/me", headers=headers)  # 认证结果进入缓存，之后的请求不再查询用户
+
+    run_db_calls.clear()
+    response = getattr(client, method)(path, headers=headers, **({"json": body} if body else {}))
+    assert response.status_code == 200, response.text
+    assert len(run_db_calls) == 1, run_db_calls
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from bench.feed_stub import FeedStub
+from core import fetch, models
+from core.dynamics import store_dynamics
+from core.fetch import BilibiliClient, fetch_uid_dynamics
+
+UID = "7"
+
+
+@pytest.fixture
+def stub():
+    with FeedStub(items_per_uid=8, page_size=5) as server:
+        yield server
+
+
+def sync(stub, baseline=None, check_update=True):
+    """抓取一次并返回 (新动态, 统计数, 新 baseline, 本次的请求列表)"""
+
+    async def run():
+        client = BilibiliClient(base_url=stub.url)
+        try:
+            return await fetch_uid_dynamics(client, UID, {}, baseline=baseline, check_update=check_update)
+        finally:
+            await client.aclose()
+
+    before = len(stub.requests)
+    dynamics, stats, new_baseline = asyncio.run(run())
+    return dynamics, stats, new_baseline, stub.requests[before:]
+
+
+def stored(db):
+    db.expire_all()
+    return {row.id: json.loads(row.data) for row in db.query(models.BilibiliDynamic)}
+
+
+def test_first_sync_reads_one_page(stub):
+    dynamics, stats, baseline, requests = sync(stub)
+    ids = [item["id_str"] for item in stub.items(UID)]
+    assert [dynamic["动态ID"] for dynamic in dynamics] == ids[:5]
+    assert stats == {} and baseline == ids[0]
+    assert len(requests) == 1
+
+
+def test_follows_offset_until_the_baseline(stub, db):
+    dynamics, stats, baseline, _ = sync(stub)
+    store_dynamics(db, UID, dynamics, baseline, stats)
+
+    stub.publish(UID, 12)
+    dynamics, stats, new_baseline, requests = sync(stub, baseline)
+    ids = [item["id_str"] for item in stub.items(UID)]
+    # 12 条新动态分布在三页上，第三页的最后一条已同步过，不再翻页
+    assert [dynamic["动态ID"] for dynamic in dynamics] == ids[:12]
+    assert sorted(stats) == sorted(ids[12:15]) and new_baseline == ids[0]
+    assert [request.get("offset") for request in requests] == [None, None, ids[4], ids[9]]
+    assert requests[0]["update_baseline"] == baseline
+
+    assert store_dynamics(db, UID, dynamics, new_baseline, stats) == 12
+    assert len(stored(db)) == 17
+    # 没有新动态时只调用更新检查
+    assert sync(stub, new_baseline)[:3] == ([], {}, new_baseline)
+
+
+def test_stops_after_max_pages(stub, monkeypatch):
+    monkeypatch.setattr(fetch, "MAX_PAGES", 2)
+    _, _, baseline, _ = sync(stub)
+    stub.publish(UID, 12)
+    dynamics, stats, new_baseline, requests = sync(stub, baseline)
+    assert len(dynamics) == 10 and stats == {}
+    assert new_baseline == stub.items(UID)[0]["id_str"]
+    assert len(requests) == 3  # 更新检查与两页
+
+
+def test_refresh_updates_stats_without_reparsing(stub, db):
+    dynamics, stats, baseline, _ = sync(stub)
+    store_dynamics(db, UID, dynamics, baseline, stats)
+    before = stored(db)
+
+    item = stub.items(UID)[0]
+    item["modules"]["module_stat"]["like"]["count"] = 999
+    stub.publish(UID)
+    dynamics, stats, baseline, requests = sync(stub, baseline, check_update=False)
+    # 跳过更新检查，只请求第一页：一条新动态，其余四条只取统计数
+    assert len(requests) == 1 and "update_baseline" not in requests[0]
+    assert len(dynamics) == 1 and len(stats) == 4
+    assert stats[item["id_str"]] == {"点赞数": 999, "评论数": 4, "转发数": 2}
+
+    store_dynamics(db, UID, dynamics, baseline, stats)
+    after = stored(db)
+    assert after[item["id_str"]] == {**before[item["id_str"]], "点赞数": 999}
+    assert list(after[item["id_str"]]) == list(before[item["id_str"]])
+    unchanged = [dynamic_id for dynamic_id in before if dynamic_id != item["id_str"]]
+    assert all(after[dynamic_id] == before[dynamic_id] for dynamic_id in unchanged)
+
+
+def test_stub_serves_pages():
+    with FeedStub(items_per_uid=7, page_size=3) as stub:
+        ids = [item["id_str"] for item in stub.items(UID)]
+        first = json.loads(stub.feed_body(UID))["data"]
+        last = json.loads(stub.feed_body(UID, ids[5]))["data"]
+    assert [item["id_str"] for item in first["items"]] == ids[:3] and first["has_more"]
+    assert first["offset"] == ids[2]
+    assert [item["id_str"] for item in last["items"]] == ids[6:] and not last["has_more"]
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import FastAPI, Request  # pyright: ignore[reportMissingImports]
+from fastapi.testclient import TestClient  # pyright: ignore[reportMissingImports]
+
+from bench.feed_stub import FeedStub
+from core.feed_cache import (
+    CACHE_STATE_HEADER,
+    CircuitBreaker,
+    CircuitOpen,
+    FeedCache,
+    FeedSnapshot,
+    read_snapshot_file,
+    write_snapshot_file,
+)
+from core.fetch import BilibiliClient, fetch_bilibili_dynamics
+
+
+class FakeLoader:
+    """可控的 loader：记录调用次数，release 之前一直挂起，fail 为真时抛出异常"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("上游不可用")
+        return [{"动态ID": str(self.calls)}]
+
+
+def stale_cache(loader, **options):
+    """已有一条动态、但早已过期的缓存"""
+    return FeedCache([{"动态ID": "0"}], loader=loader, created_at=time.time() - 60, stale_after=1, **options)
+
+
+def test_cold_start_requests_upstream_once(monkeypatch):
+    monkeypatch.setenv("BILIBILI_COOKIE", "stub")
+
+    async def run(stub):
+        client = BilibiliClient(base_url=stub.url, max_retries=0)
+        try:
+            cache = FeedCache(loader=lambda: fetch_bilibili_dynamics(client, ["1"]))
+            return await asyncio.gather(*(cache.get() for _ in range(50)))
+        finally:
+            await client.aclose()
+
+    with FeedStub(delay=0.1) as stub:
+        snapshots = asyncio.run(run(stub))
+    assert len(stub.requests) == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots) and snapshots[0].count > 0
+
+
+def test_stale_snapshot_is_served_while_refreshing():
+    loader = FakeLoader()
+    cache = stale_cache(loader)
+
+    async def run():
+        loader.gate.clear()
+        stale = cache.snapshot
+        snapshots = await asyncio.gather(*(cache.get() for _ in range(20)))
+        # 旧数据立即返回，后台只有一次刷新
+        assert all(snapshot is stale for snapshot in snapshots)
+        assert cache.status()["refreshing"] and loader.calls == 1
+        loader.gate.set()
+        refreshed = await cache.refresh()
+        assert loader.calls == 1 and refreshed is cache.snapshot
+        return refreshed
+
+    assert asyncio.run(run()).dynamics == [{"动态ID": "1"}]
+    assert cache.state() == "fresh"
+
+
+def test_breaker_opens_after_consecutive_failures():
+    loader = FakeLoader()
+    loader.fail = True
+    cache = stale_cache(loader, breaker=CircuitBreaker(threshold=2, cooldown=60))
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.refresh()
+        assert cache.breaker.state == "open" and cache.breaker.failures == 2
+        with pytest.raises(CircuitOpen) as excinfo:
+            await cache.refresh()
+        assert 0 < excinfo.value.retry_after <= 60
+        # 熔断期间仍返回旧数据，也不在后台刷新
+        snapshot = await cache.get()
+        assert snapshot.dynamics == [{"动态ID": "0"}] and not cache.status()["refreshing"]
+
+    asyncio.run(run())
+    assert loader.calls == 2
+    assert "上游不可用" in cache.status()["last_error"]
+
+
+def test_half_open_probe_closes_or_reopens():
+    loader = FakeLoader()
+    loader.fail = True
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    cache = stale_cache(loader, breaker=breaker)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.refresh()
+        breaker.opened_at -= breaker.cooldown  # 冷却结束
+        assert breaker.state == "half_open"
+        with pytest.raises(RuntimeError):
+            await cache.refresh()
+        assert breaker.state == "open"  # 试探失败，重新计时
+
+        breaker.opened_at -= breaker.cooldown
+        loader.fail = False
+        await cache.refresh()
+
+    asyncio.run(run())
+    assert breaker.state == "closed" and breaker.failures == 0 and breaker.last_error is None
+    assert cache.state() == "fresh" and loader.calls == 3
+
+
+def test_respond_sets_etag_and_honours_if_none_match():
+    cache = FeedCache([{"动态ID": "1", "标题": "视频"}])
+    app = FastAPI()
+
+    @app.get("/feed")
+    async def feed(request: Request):
+        return await cache.respond(request)
+
+    client = TestClient(app)
+    plain = client.get("/feed", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200 and plain.json() == [{"动态ID": "1", "标题": "视频"}]
+    assert plain.headers["ETag"] == cache.snapshot.etag and plain.headers[CACHE_STATE_HEADER] == "fresh"
+
+    compressed = client.get("/feed", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["ETag"] == cache.snapshot.gzip_etag
+    assert compressed.json() == plain.json()
+
+    for etag in (plain.headers["ETag"], "W/" + compressed.headers["ETag"], "*"):
+        assert client.get("/feed", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/feed", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+DYNAMICS = [{"动态ID": str(i), "标题": f"视频 {i}", "点赞数": i} for i in range(50)]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "feed.bin")
+    write_snapshot_file(FeedSnapshot.build(DYNAMICS, created_at=1234.5), path)
+    return path
+
+
+def test_snapshot_file_round_trip(snapshot_path):
+    snapshot = read_snapshot_file(snapshot_path)
+    assert snapshot is not None and snapshot.valid
+    assert snapshot.count == len(DYNAMICS) and snapshot.created_at == 1234.5
+    assert snapshot.etag == FeedSnapshot.build(DYNAMICS).etag
+    assert snapshot.dynamics == DYNAMICS
+    # 原子替换后只剩目标文件
+    assert os.listdir(os.path.dirname(snapshot_path)) == ["feed.bin"]
+
+
+def test_flipped_byte_fails_the_checksum(snapshot_path):
+    with open(snapshot_path, "r+b") as f:
+        f.seek(-5, os.SEEK_END)
+        byte = f.read(1)
+        f.seek(-5, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0x01]))
+    snapshot = read_snapshot_file(snapshot_path)
+    # 头部完好，body 在首次使用时校验失败；FeedCache 视其为空并重新抓取
+    assert snapshot is not None and not snapshot.valid
+    cache = FeedCache(snapshot=snapshot, loader=lambda: asyncio.sleep(0, DYNAMICS[:1]))
+    assert asyncio.run(cache.get()).dynamics == DYNAMICS[:1]
+
+
+def test_truncated_or_foreign_files_are_ignored(snapshot_path, tmp_path):
+    with open(snapshot_path, "r+b") as f:
+        f.truncate(os.path.getsize(snapshot_path) - 1)
+    assert read_snapshot_file(snapshot_path) is None
+
+    with open(snapshot_path, "wb") as f:
+        f.write(b"[]")
+    assert read_snapshot_file(snapshot_path) is None
+    assert read_snapshot_file(str(tmp_path / "missing.bin")) is None
+
+
+def test_failed_write_leaves_no_temporary_file(snapshot_path, tmp_path, monkeypatch):
+    def fail(src, dst):
+        raise OSError("磁盘已满")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_snapshot_file(FeedSnapshot.build(DYNAMICS[:1]), snapshot_path)
+    assert os.listdir(tmp_path) == ["feed.bin"]
+    monkeypatch.undo()
+    # 旧文件保持完整
+    assert read_snapshot_file(snapshot_path).dynamics == DYNAMICS
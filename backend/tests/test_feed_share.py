@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from core.feed_cache import FeedCache, FeedSnapshot
+from core.feed_share import LeaderLock, fcntl, load_shared_snapshot, publish_snapshot, shared_snapshot_stamp
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    return str(tmp_path / "poller.lock")
+
+
+@pytest.mark.skipif(fcntl is None, reason="没有 fcntl 时按单进程处理")
+def test_only_one_holder_becomes_leader(lock_path):
+    first, second = LeaderLock(lock_path), LeaderLock(lock_path)
+    try:
+        assert first.try_acquire() and first.is_leader
+        assert not second.try_acquire() and not second.is_leader
+        assert first.try_acquire()  # 已持有时再次获取仍为真
+
+        first.release()
+        assert not first.is_leader
+        assert second.try_acquire() and second.is_leader
+        assert not first.try_acquire()
+    finally:
+        first.release()
+        second.release()
+
+
+def test_follower_picks_up_new_versions(engine):
+    assert shared_snapshot_stamp(engine) == (0, 0)
+
+    first = publish_snapshot(FeedSnapshot.build([{"动态ID": "1"}], created_at=1000.0), engine)
+    assert first.version == 1 and shared_snapshot_stamp(engine) == (1, 1000)
+
+    # 非轮询 worker 在版本号变化时重新加载
+    follower = FeedCache(snapshot=load_shared_snapshot(engine))
+    assert follower.snapshot.version == 1 and follower.snapshot.etag == first.etag
+
+    second = publish_snapshot(FeedSnapshot.build([{"动态ID": "2"}, {"动态ID": "1"}], created_at=2000.0), engine)
+    version, updated_at = shared_snapshot_stamp(engine)
+    assert (version, updated_at) == (2, 2000) and version != follower.snapshot.version
+    follower.set_snapshot(load_shared_snapshot(engine))
+    assert follower.snapshot.version == 2 and follower.snapshot.etag == second.etag
+    assert follower.snapshot.dynamics == [{"动态ID": "2"}, {"动态ID": "1"}]
+
+
+def test_missing_and_stale_snapshots(engine):
+    assert load_shared_snapshot(engine) is None
+
+    published_at = time.time() - 3600
+    publish_snapshot(FeedSnapshot.build([{"动态ID": "1"}], created_at=published_at), engine)
+    shared = load_shared_snapshot(engine)
+    # 保留发布时间而不是加载时间，过期的共享快照在各 worker 中同样显示为过期
+    assert shared is not None and shared.created_at == int(published_at)
+    assert FeedCache(snapshot=shared, stale_after=600).state() == "stale"
+
+
+def test_follower_serves_its_own_cache_until_a_snapshot_is_published(client, engine, lock_path, monkeypatch):
+    import main
+
+    holder = LeaderLock(lock_path)
+    assert holder.try_acquire()
+    try:
+        monkeypatch.setattr(main, "feed_leader", LeaderLock(lock_path))
+        monkeypatch.setattr(main, "load_shared_snapshot", lambda: load_shared_snapshot(engine))
+        local = FeedSnapshot.build([{"动态ID": "本地"}])
+        monkeypatch.setattr(main.bilibili_cache, "snapshot", local)
+
+        assert asyncio.run(main.load_latest_dynamics()) is local
+        publish_snapshot(FeedSnapshot.build([{"动态ID": "共享"}]), engine)
+        assert asyncio.run(main.load_latest_dynamics()).dynamics == [{"动态ID": "共享"}]
+    finally:
+        holder.release()
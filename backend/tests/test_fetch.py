@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from bench.feed_stub import FEED_PATH, FeedStub
+from core import fetch
+from core.fetch import BilibiliClient
+
+
+@pytest.fixture
+def stub():
+    with FeedStub(items_per_uid=3) as server:
+        yield server
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """记录每次重试前的退避序号，并且不实际等待"""
+    attempts = []
+
+    def backoff(self, attempt):
+        attempts.append(attempt)
+        return 0
+
+    monkeypatch.setattr(BilibiliClient, "_backoff", backoff)
+    return attempts
+
+
+def call(stub, fn, **options):
+    async def run():
+        client = BilibiliClient(base_url=stub.url, **options)
+        try:
+            return await fn(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def get_feed(uid="1"):
+    return lambda client: client.get_json(FEED_PATH, params={"host_mid": uid}, headers={})
+
+
+def test_retries_5xx_with_backoff_until_success(stub, backoffs):
+    stub.fail_next = 2
+    data = call(stub, get_feed(), max_retries=3)
+    assert data["code"] == 0 and len(data["data"]["items"]) == 3
+    assert len(stub.requests) == 3
+    assert backoffs == [0, 1]
+
+
+def test_raises_after_retries_are_exhausted(stub, backoffs):
+    stub.fail_uids.add("1")
+    with pytest.raises(Exception, match="请求失败: 503"):
+        call(stub, get_feed(), max_retries=2)
+    assert len(stub.requests) == 3
+    assert backoffs == [0, 1]
+
+
+def test_does_not_retry_other_client_errors(stub, backoffs):
+    stub.fail_status = 404
+    stub.fail_next = 1
+    with pytest.raises(Exception, match="请求失败: 404"):
+        call(stub, get_feed(), max_retries=3)
+    assert len(stub.requests) == 1 and backoffs == []
+
+
+def test_retries_read_timeouts(stub, backoffs):
+    stub.delay = 0.3
+    with pytest.raises(Exception, match="ReadTimeout"):
+        call(stub, get_feed(), max_retries=1, read_timeout=0.05)
+    assert len(stub.requests) == 2 and backoffs == [0]
+
+
+def test_backoff_is_capped():
+    client = BilibiliClient(backoff_base=0.5, backoff_max=2)
+    for attempt in range(8):
+        assert 0 <= client._backoff(attempt) <= min(2, 0.5 * 2 ** attempt)
+
+
+def test_fan_out_returns_the_uids_that_succeeded(monkeypatch):
+    monkeypatch.setattr(fetch, "UID_TIMEOUT", 0.2)
+
+    async def fetch_one(uid):
+        if uid == "broken":
+            raise ValueError(uid)
+        if uid == "slow":
+            await asyncio.sleep(5)
+        return uid * 2
+
+    results = asyncio.run(fetch.fan_out(["a", "broken", "slow", "b"], fetch_one))
+    assert results == {"a": "aa", "b": "bb"}
+
+
+def test_fan_out_raises_when_every_uid_fails():
+    async def fetch_one(uid):
+        raise ValueError(uid)
+
+    with pytest.raises(ValueError, match="a"):
+        asyncio.run(fetch.fan_out(["a", "b"], fetch_one))
+    assert asyncio.run(fetch.fan_out([], fetch_one)) == {}
+
+
+def test_fetch_merges_the_uids_that_survive(stub, backoffs, monkeypatch):
+    monkeypatch.setenv("BILIBILI_COOKIE", "stub")
+    monkeypatch.setattr(fetch, "UID_TIMEOUT", 0.5)
+    stub.fail_uids.add("2")
+    stub.uid_delays["3"] = 1
+    dynamics = call(stub, lambda client: fetch.fetch_bilibili_dynamics(client, ["1", "2", "3"]), max_retries=1)
+    assert {dynamic["动态ID"] for dynamic in dynamics} == {item["id_str"] for item in stub.items("1")}
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from core.hashing import PasswordHasherPool, PasswordPoolSaturated
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_hash_and_verify_round_trip(workers):
+    """workers 为 1 时经 forkserver 子进程执行，0 时在线程池中执行"""
+    pool = PasswordHasherPool(workers=workers, queue_limit=4)
+
+    async def run():
+        hashed = await pool.hash("密码")
+        return (
+            hashed,
+            await pool.verify("密码", hashed),
+            await pool.verify("错误", hashed),
+            await pool.verify_and_update("密码", hashed),
+            await pool.verify_and_update("错误", hashed),
+        )
+
+    try:
+        hashed, valid, invalid, current, rejected = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert hashed.startswith("$pbkdf2-sha256$")
+    assert valid and not invalid
+    # 已是当前方案与参数，不需要升级
+    assert current == (True, None) and rejected == (False, None)
+    assert pool.pending == 0
+
+
+def test_rejects_beyond_queue_limit():
+    pool = PasswordHasherPool(workers=0, queue_limit=2)
+
+    async def run():
+        return await asyncio.gather(*(pool.hash("密码") for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    pool.shutdown()
+    assert [isinstance(result, PasswordPoolSaturated) for result in results] == [False, False, True]
+    assert pool.pending == 0
+
+
+def test_saturated_pool_returns_503(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "password_hasher", PasswordHasherPool(workers=0, queue_limit=0))
+    response = client.post("/auth/register", json={"username": "newcomer", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json() == {"detail": "服务繁忙，请稍后重试"}
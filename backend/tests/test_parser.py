@@ -0,0 +1,22 @@
+import json
+
+from bench.feed_stub import sample_items
+from core.parser import parse_dynamics
+from tests.parser_reference import parse_dynamic_items
+
+
+def test_matches_reference_implementation():
+    items = sample_items()
+    expected = parse_dynamic_items(items)
+    actual = [dynamic.to_dict() for dynamic in parse_dynamics(items)]
+    # 字段顺序也要一致：缓存文件与接口响应按此顺序输出
+    assert [list(dynamic.items()) for dynamic in actual] == [list(dynamic.items()) for dynamic in expected]
+
+
+def test_accepts_response_forms():
+    items = sample_items()
+    response = {"code": 0, "data": {"items": items}}
+    expected = [dynamic.to_dict() for dynamic in parse_dynamics(items)]
+    assert [dynamic.to_dict() for dynamic in parse_dynamics(response)] == expected
+    assert [dynamic.to_dict() for dynamic in parse_dynamics(json.dumps(response))] == expected
+    assert parse_dynamics({"code": 0, "data": None}) == []
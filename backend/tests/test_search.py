@@ -0,0 +1,97 @@
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+
+from bench.common import insert_tasks
+from core import search
+from core.database import query_plan
+from core.migrations import hot_queries, table_scans
+from core.search import highlight, search_tasks, snippet
+
+
+@pytest.fixture
+def corpus(engine, add_users):
+    add_users(1)
+    insert_tasks(engine, [
+        {"title": "数据库迁移", "description": "整理表结构", "tags": None},                    # 1 标题命中
+        {"title": "周报", "description": "本周完成数据库迁移脚本", "tags": None},              # 2 描述命中
+        {"title": "海报设计", "description": "活动宣传", "tags": "数据库"},                   # 3 标签命中
+        {"title": "数据库备份", "description": "每晚备份数据库", "tags": None, "status": "completed"},  # 4
+        {"title": "招新海报", "description": "社团招新", "tags": "宣传"},                     # 5
+        {"title": "视频剪辑", "description": "剪辑招新视频 <b>", "tags": "视频"},             # 6
+    ])
+
+
+def ids(items):
+    return [item["id"] for item in items]
+
+
+def test_ranks_title_above_tags_above_description(db, corpus):
+    items, _ = search_tasks(db, None, "数据库", 10, None, status="available")
+    # bm25 的列权重：标题 10、标签 5、描述 1
+    assert ids(items) == [1, 3, 2]
+
+
+def test_terms_must_all_match(db, corpus):
+    items, _ = search_tasks(db, None, "数据库 迁移脚本", 10, None)
+    assert ids(items) == [2]
+
+
+def test_status_filter(db, corpus):
+    items, _ = search_tasks(db, None, "数据库", 10, None, status="completed")
+    assert ids(items) == [4]
+
+
+def test_short_terms_fall_back_to_like_by_newest(db, corpus):
+    # 两个字的词不足以使用 trigram 索引，按 LIKE 过滤、按 id 倒序
+    items, _ = search_tasks(db, None, "招新", 10, None)
+    assert ids(items) == [6, 5]
+    assert all(item["title_highlight"] or item["snippet"] for item in items)
+
+
+def test_short_terms_only_search_the_newest_tasks(db, corpus, monkeypatch):
+    monkeypatch.setattr(search, "SHORT_TERM_WINDOW", 1)
+    items, _ = search_tasks(db, None, "招新", 10, None)
+    assert ids(items) == [6]
+    # 与索引词组合时先由 FTS 过滤，不受窗口限制
+    items, _ = search_tasks(db, None, "数据库 迁移", 10, None)
+    assert sorted(ids(items)) == [1, 2]
+
+
+def test_short_term_query_plan_is_a_rowid_range(db):
+    plan = query_plan(db, dict(hot_queries(db))["task_search_short"])
+    assert "SEARCH tasks USING INTEGER PRIMARY KEY (rowid>?)" in plan and not table_scans(plan), plan
+
+
+def test_mixed_terms_filter_fts_hits_with_like(db, corpus):
+    items, _ = search_tasks(db, None, "数据库 备份", 10, None)
+    assert ids(items) == [4]
+
+
+def test_like_fallback_escapes_wildcards(db, corpus):
+    items, _ = search_tasks(db, None, "%", 10, None)
+    assert items == []
+
+
+def test_pages_do_not_repeat(db, corpus):
+    seen, cursor = [], None
+    while True:
+        items, cursor = search_tasks(db, None, "数据库", 1, cursor)
+        seen += ids(items)
+        if not cursor:
+            break
+    assert seen == ids(search_tasks(db, None, "数据库", 10, None)[0])
+    assert len(seen) == len(set(seen)) == 4
+
+
+def test_rejects_empty_query_and_bad_cursor(db, corpus):
+    with pytest.raises(HTTPException) as exc:
+        search_tasks(db, None, "   ", 10, None)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        search_tasks(db, None, "数据库", 10, "不是游标")
+    assert exc.value.status_code == 400
+
+
+def test_highlight_escapes_html():
+    assert highlight("<b>数据库</b>", ["数据库"]) == "&lt;b&gt;<mark>数据库</mark>&lt;/b&gt;"
+    assert snippet("前" * 40 + "数据库" + "后" * 40, ["数据库"], context=2) == "…前前<mark>数据库</mark>后后…"
@@ -0,0 +1,48 @@
+import json
+
+import pytest  # pyright: ignore[reportMissingImports]
+
+from bench.common import insert_tasks
+from core import serialization, tasks
+from core.schemas import TaskResponse, UserPublic
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """分别用 orjson 与标准库回退路径编码"""
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("未安装 orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def response_model_json(model, payload):
+    """FastAPI 按 response_model 校验、转换后输出的 JSON"""
+    return json.loads(json.dumps(model.model_validate(payload).model_dump(mode="json")))
+
+
+def test_task_payload_matches_response_model(engine, db, add_users, encoder):
+    (publisher,) = add_users(1)
+    insert_tasks(engine, [
+        {"title": "有截止时间", "description": "描述", "deadline": "2030-01-01 12:00:00.000000", "tags": "设计,宣传"},
+        {"title": "带微秒", "description": "描述", "deadline": "2030-01-01 12:00:00.123456", "tags": "技术"},
+        {"title": "无截止时间", "description": "描述", "deadline": None, "tags": None},
+    ])
+    rows = tasks.task_rows(db).order_by("id").all()
+    payloads = [serialization.task_payload(row, index, index == 1) for index, row in enumerate(rows)]
+
+    body = json.loads(serialization.json_response(payloads).body)
+    expected = [response_model_json(TaskResponse, payload) for payload in payloads]
+    assert body == expected
+    # 键的顺序也与 TaskResponse 一致
+    assert [list(item) for item in body] == [list(item) for item in expected]
+    assert body[0]["publisher_name"] == publisher.nickname and body[2]["tags"] == []
+
+
+def test_user_payload_matches_response_model(add_users, encoder):
+    (user,) = add_users(1)
+    payload = serialization.user_payload(user)
+    body = json.loads(serialization.json_response(payload).body)
+    assert list(body.items()) == list(response_model_json(UserPublic, payload).items())
@@ -0,0 +1,112 @@
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+
+from core import sync, tasks
+from core.schemas import TaskCreate, TaskUpdate
+
+
+def body(title):
+    return TaskCreate(title=title, description="描述", type="team", max_accept_count=2)
+
+
+def ids(changes):
+    return [item["id"] for item in changes["tasks"]]
+
+
+def test_changes_since_a_revision(db, add_users):
+    organizer, member = add_users(2)
+    first = tasks.create_task(db, body("第一个"), organizer)["id"]
+    second = tasks.create_task(db, body("第二个"), organizer)["id"]
+    third = tasks.create_task(db, body("第三个"), organizer)["id"]
+
+    full = sync.task_changes(db, member, 0, 200)
+    assert ids(full) == [first, second, third] and full["deleted"] == []
+    assert full["revision"] == tasks.current_revision(db) and not full["has_more"]
+
+    since = full["revision"]
+    assert sync.task_changes(db, member, since, 200) == {
+        "revision": since, "has_more": False, "tasks": [], "deleted": [],
+    }
+
+    tasks.update_task(db, first, TaskUpdate(title="改名"), organizer)
+    tasks.accept_task(db, third, member)
+    changes = sync.task_changes(db, member, since, 200)
+    # 按版本号顺序：先改名的任务，再被接取的任务
+    assert ids(changes) == [first, third]
+    assert changes["tasks"][0]["title"] == "改名"
+    assert changes["tasks"][1]["is_accepted"] and changes["tasks"][1]["accepted_count"] == 1
+    assert sync.task_changes(db, organizer, since, 200)["tasks"][1]["is_accepted"] is False
+
+
+def test_deleted_tasks_leave_tombstones(db, add_users):
+    (organizer,) = add_users(1)
+    kept = tasks.create_task(db, body("保留"), organizer)["id"]
+    removed = tasks.create_task(db, body("删除"), organizer)["id"]
+    since = tasks.current_revision(db)
+
+    tasks.delete_task(db, removed, organizer)
+    changes = sync.task_changes(db, organizer, since, 200)
+    assert changes["tasks"] == [] and changes["deleted"] == [removed]
+    # 从头同步时已删除的任务不再出现，只留下墓碑
+    full = sync.task_changes(db, organizer, 0, 200)
+    assert ids(full) == [kept] and full["deleted"] == [removed]
+
+
+def test_pages_follow_revision_order(db, add_users):
+    (organizer,) = add_users(1)
+    created = [tasks.create_task(db, body(f"任务 {i}"), organizer)["id"] for i in range(5)]
+    tasks.delete_task(db, created[1], organizer)
+    tasks.update_task(db, created[0], TaskUpdate(priority=4), organizer)
+
+    pages, since = [], 0
+    while True:
+        changes = sync.task_changes(db, organizer, since, 2)
+        pages.append(changes)
+        assert len(changes["tasks"]) + len(changes["deleted"]) <= 2
+        since = changes["revision"]
+        if not changes["has_more"]:
+            break
+    assert since == tasks.current_revision(db)
+    assert [task_id for page in pages for task_id in ids(page)] == created[2:] + created[:1]
+    assert [task_id for page in pages for task_id in page["deleted"]] == [created[1]]
+
+
+def test_since_ahead_of_latest_is_gone(db, add_users, client, auth_headers):
+    (user,) = add_users(1)
+    latest = tasks.current_revision(db)
+    with pytest.raises(HTTPException) as exc:
+        sync.task_changes(db, user, latest + 1, 200)
+    assert exc.value.status_code == 410
+
+    response = client.get("/tasks/changes", params={"since": latest + 1}, headers=auth_headers(user))
+    assert response.status_code == 410 and response.json()["detail"] == "同步版本已失效，请重新获取完整列表"
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/tasks", {}),
+    ("/tasks", {"scope": "my"}),
+    ("/tasks/search", {"q": "任务"}),
+    ("/tasks/tags", {}),
+    ("/tasks/calendar", {"from": "2030-01-01", "to": "2030-01-31"}),
+])
+def test_lists_revalidate_with_etag(db, add_users, client, auth_headers, path, params):
+    owner, other = add_users(2)
+    headers, other_headers = auth_headers(owner), auth_headers(other)
+    tasks.create_task(db, body("已有任务"), owner)
+
+    response = client.get(path, params=params, headers=headers)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert etag == f'"tasks-{tasks.current_revision(db)}-{owner.id}"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    cached = client.get(path, params=params, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304 and cached.headers["ETag"] == etag and cached.content == b""
+    assert client.get(path, params=params, headers={**headers, "If-None-Match": f"W/{etag}"}).status_code == 304
+    # is_accepted 因人而异，其他用户的 ETag 不同
+    assert client.get(path, params=params, headers={**other_headers, "If-None-Match": etag}).status_code == 200
+
+    created = client.post("/tasks", json=body("新任务").model_dump(), headers=headers)
+    assert created.status_code == 200
+    refreshed = client.get(path, params=params, headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200 and refreshed.headers["ETag"] != etag
@@ -0,0 +1,131 @@
+import pytest  # pyright: ignore[reportMissingImports]
+from fastapi import HTTPException  # pyright: ignore[reportMissingImports]
+from sqlalchemy import text  # pyright: ignore[reportMissingImports]
+from sqlalchemy.exc import OperationalError  # pyright: ignore[reportMissingImports]
+
+from bench import common
+from core import models, tasks
+from core.database import SQLITE_PRAGMAS
+from core.schemas import TaskCreate
+from core.write_queue import WriteQueue, writer_engine
+
+
+@pytest.fixture
+def write_queue(engine):
+    queue_ = WriteQueue(writer_engine(str(engine.url)), window_ms=50)
+    yield queue_
+    queue_.shutdown()
+    queue_.engine.dispose()
+
+
+def body(title, capacity):
+    return TaskCreate(title=title, description="描述", type="team", max_accept_count=capacity, tags=["合并"])
+
+
+def workload(organizer, first, second):
+    """(fn, args) 序列；任务 id 按创建顺序为 1、2、3"""
+    return [
+        (tasks.create_task, (body("一", 1), organizer)),
+        (tasks.create_task, (body("二", 2), organizer)),
+        (tasks.create_task, (body("三", 2), organizer)),
+        (tasks.accept_task, (1, first)),
+        (tasks.accept_task, (1, second)),  # 已满
+        (tasks.accept_task, (2, first)),
+        (tasks.accept_task, (2, first)),  # 重复接取
+        (tasks.accept_task, (2, second)),
+        (tasks.complete_task, (2, first)),
+        (tasks.abandon_task, (3, first)),  # 尚未接取
+        (tasks.delete_task, (3, first)),  # 无权删除
+        (tasks.delete_task, (3, organizer)),
+        (tasks.accept_task, (3, first)),  # 已删除
+    ]
+
+
+def outcome(call):
+    try:
+        result = call()
+    except HTTPException as exc:
+        return exc.status_code, exc.detail
+    if isinstance(result, dict):
+        result = {key: value for key, value in result.items() if key != "created_at"}
+    return result
+
+
+def snapshot(target):
+    with target.connect() as conn:
+        return [
+            conn.execute(text(sql)).all()
+            for sql in (
+                "SELECT id, title, status, revision, tags FROM tasks ORDER BY id",
+                "SELECT task_id, user_id, status FROM task_acceptances ORDER BY task_id, user_id",
+                "SELECT task_id, revision FROM task_tombstones ORDER BY task_id",
+                "SELECT value FROM sync_revision",
+            )
+        ]
+
+
+def test_coalesced_writes_match_direct_writes(tmp_path, engine, write_queue):
+    direct_engine = common.migrated_engine(f"sqlite:///{tmp_path}/direct.db")
+    try:
+        users = common.add_users(engine, "organizer", "first", "second")
+        assert common.add_users(direct_engine, "organizer", "first", "second") == users
+
+        DirectSession = common.session_factory(direct_engine)
+        expected = []
+        for fn, args in workload(*users):
+            with DirectSession() as db:
+                expected.append(outcome(lambda: fn(db, *args)))
+
+        # 先全部提交再等待结果，写线程按到达顺序分组执行
+        futures = [write_queue.submit(fn, *args) for fn, args in workload(*users)]
+        actual = [outcome(future.result) for future in futures]
+
+        assert actual == expected
+        assert write_queue.writes == len(futures) and write_queue.commits < len(futures)
+        assert snapshot(engine) == snapshot(direct_engine)
+    finally:
+        direct_engine.dispose()
+
+
+def test_failed_write_only_rolls_back_itself(engine, session_factory, write_queue):
+    (organizer,) = common.add_users(engine, "organizer")
+
+    def write_then_fail(db, title):
+        # 已写入但未提交时抛出异常，与逐个提交时一样不应留下任何修改
+        db.add(models.Task(title=title, description="描述", publisher_id=organizer.id))
+        tasks.next_revision(db)
+        db.flush()
+        raise RuntimeError("模拟失败")
+
+    futures = [
+        write_queue.submit(tasks.create_task, body("保留一", 1), organizer),
+        write_queue.submit(write_then_fail, "撤销"),
+        write_queue.submit(tasks.create_task, body("保留二", 1), organizer),
+    ]
+    assert futures[0].result()["title"] == "保留一"
+    with pytest.raises(RuntimeError):
+        futures[1].result()
+    assert futures[2].result()["title"] == "保留二"
+    assert (write_queue.commits, write_queue.writes) == (1, 3)
+
+    with session_factory() as db:
+        assert [title for (title,) in db.query(models.Task.title).order_by(models.Task.id)] == ["保留一", "保留二"]
+        assert tasks.current_revision(db) == 2
+
+
+def test_locked_database_fails_the_group_and_keeps_the_writer(engine, session_factory):
+    (organizer,) = common.add_users(engine, "organizer")
+    queue_ = WriteQueue(writer_engine(str(engine.url), {**SQLITE_PRAGMAS, "busy_timeout": "50"}), window_ms=0)
+    try:
+        with engine.connect() as holder:
+            holder.exec_driver_sql("BEGIN IMMEDIATE")
+            with pytest.raises(OperationalError):
+                queue_.submit(tasks.create_task, body("被锁", 1), organizer).result(timeout=10)
+            holder.rollback()
+        assert queue_.submit(tasks.create_task, body("之后", 1), organizer).result(timeout=10)["title"] == "之后"
+    finally:
+        queue_.shutdown()
+        queue_.engine.dispose()
+
+    with session_factory() as db:
+        assert [title for (title,) in db.query(models.Task.title)] == ["之后"]
@@ -17,4 +17,5 @@ export interface BilibiliDynamic {
 	转发数: number
 	发布时间?: number // UNIX 秒级时间戳
 	link?: string
+	动态ID?: string
 }